@@ -0,0 +1,173 @@
+"""
+Measures the bot operations against the local mock site in a headless Firefox.
+
+Every operation of the betting flow (login, select_league, select_matches, place_bet, confirm_bets) is measured
+on league pages of every size: the wall time, the WebDriver round-trips and the peak RSS of the process tree.
+The results can be saved as a JSON baseline, and later runs compared with it; a regression exits with status 1.
+
+    python -m benchmarks.bench_bot --sizes 10 100 500 --save baseline.json
+    python -m benchmarks.bench_bot --compare baseline.json
+    python -m benchmarks.bench_bot --replay           # the in-process replay driver, no browser needed
+"""
+# Common Python library imports
+import argparse
+import json
+import os
+import resource
+import sys
+import time
+from datetime import date
+
+# Internal package imports
+from bots.core import get_firefox_driver
+from bots.utils import ObjectMaker
+from bots.profiler import DriverProfiler
+from bots.pinnacle.betting import BettingBot
+from bots.pinnacle.interface import league_paths
+from bots.pinnacle.replay import ReplayDriver
+from benchmarks.mock_site import MockSite
+
+OPERATIONS = ['login', 'select_league', 'select_matches', 'place_bet', 'confirm_bets']
+CREDENTIALS = ('bench', 'bench')
+
+
+def peak_rss_mb(pid=None):
+    """The sum of the peak resident set sizes of a process and its descendants, in MB.
+
+    The browser runs in child processes, so they are read from /proc. Elsewhere only this process is measured.
+    """
+    pid = pid or os.getpid()
+    if not os.path.isdir('/proc/%s' % pid):
+        # ru_maxrss is in KB on Linux and in bytes on macOS
+        scale = 1024.0 * 1024.0 if sys.platform == 'darwin' else 1024.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open('/proc/%s/stat' % entry) as f:
+                # The command name may contain spaces, the fields after it are fixed
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (IOError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    total, stack = 0, [pid]
+    while len(stack) > 0:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open('/proc/%s/status' % current) as f:
+                for line in f:
+                    if line.startswith('VmHWM:'):
+                        total += int(line.split()[1])
+        except IOError:
+            continue
+    return total / 1024.0
+
+def measure(results, operation, profiler, fnc):
+    start = time.perf_counter()
+    with profiler.cycle(operation):
+        value = fnc()
+    results[operation] = {
+        'wall': time.perf_counter() - start,
+        # Every protocol command is one round-trip to the browser
+        'round_trips': sum(entry['count'] for entry in profiler.totals(operation).values()) if profiler.enabled else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    return value
+
+def run_flow(site, replay=False, headless=True, profiler=None):
+    """Run the betting flow once on the mock site.
+
+    :return: dict of operation -> {'wall', 'round_trips', 'peak_rss_mb'}
+    """
+    # The replay driver has no wire protocol to count
+    profiler = profiler or DriverProfiler(enabled=not replay)
+    if replay:
+        pages = { site.main_page: site.render(False) }
+        pages.update({ site.league_url(league): site.render(False) for league in league_paths })
+        make_driver = ReplayDriver.factory(pages, credentials=CREDENTIALS, bankroll=site.bankroll)
+    else:
+        make_driver = ObjectMaker(**get_firefox_driver(headless=headless))
+
+    results = {}
+    if profiler.enabled:
+        make_driver = profiler.factory(make_driver)
+    bot = measure(results, 'login', profiler,
+                  lambda: BettingBot.connect(CREDENTIALS[0], CREDENTIALS[1], make_driver,
+                                             main_page=site.main_page, config={'mode': 'live'}))
+    try:
+        measure(results, 'select_league', profiler, lambda: bot.select_league('bundesliga'))
+        matches = measure(results, 'select_matches', profiler, lambda: bot.select_matches(date=date.today()))
+        assert len(matches) > 0, "The mock site has no matches today."
+        measure(results, 'place_bet', profiler, lambda: matches[0].bet_on('home', 1.0))
+        number_of_bets = measure(results, 'confirm_bets', profiler, bot.confirm_bets)
+        assert number_of_bets == 1, "The bet is not confirmed by the mock site."
+    finally:
+        bot.close()
+    return results
+
+def compare(results, baseline, tolerance, rss_tolerance, min_delta):
+    """:return: the list of the regressions of the results compared to the baseline"""
+    regressions = []
+    for size, operations in results.items():
+        for operation, result in operations.items():
+            base = baseline.get(size, {}).get(operation, None)
+            if base is None:
+                continue
+            name = "%s events %s" % (size, operation)
+            if result['wall'] > base['wall'] * (1.0 + tolerance) and result['wall'] - base['wall'] > min_delta:
+                regressions.append("%s: wall time %.3f s, baseline %.3f s" % (name, result['wall'], base['wall']))
+            if None not in (result['round_trips'], base['round_trips']) and result['round_trips'] > base['round_trips']:
+                regressions.append("%s: %s round-trips, baseline %s" % (name, result['round_trips'], base['round_trips']))
+            if result['peak_rss_mb'] > base['peak_rss_mb'] * (1.0 + rss_tolerance):
+                regressions.append("%s: peak RSS %.1f MB, baseline %.1f MB" % (name, result['peak_rss_mb'], base['peak_rss_mb']))
+    return regressions
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 100, 500])
+    arg_parser.add_argument('--replay', action='store_true', help="Use the in-process replay driver instead of Firefox.")
+    arg_parser.add_argument('--profile', action='store_true', help="Print the WebDriver calls per function of every run.")
+    arg_parser.add_argument('--save', help="Write the results as a JSON baseline.")
+    arg_parser.add_argument('--compare', help="Compare the results with a JSON baseline.")
+    arg_parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed relative increase of the wall times.")
+    arg_parser.add_argument('--rss-tolerance', type=float, default=0.2, help="Allowed relative increase of the peak RSS.")
+    arg_parser.add_argument('--min-delta', type=float, default=0.05, help="Wall time increase in seconds which is always allowed.")
+    args = arg_parser.parse_args()
+
+    results = {}
+    print("%-8s %-16s %10s %12s %14s" % ("events", "operation", "wall [s]", "round-trips", "peak RSS [MB]"))
+    for size in args.sizes:
+        profiler = DriverProfiler(enabled=not args.replay)
+        with MockSite(size, credentials=CREDENTIALS) as site:
+            results[str(size)] = run_flow(site, replay=args.replay, profiler=profiler)
+        if args.profile and profiler.enabled:
+            print(profiler.summary(limit=15))
+        for operation in OPERATIONS:
+            result = results[str(size)][operation]
+            print("%-8s %-16s %10.3f %12s %14.1f" % (size, operation, result['wall'],
+                                                      result['round_trips'] if result['round_trips'] is not None else '-',
+                                                      result['peak_rss_mb']))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'driver': 'replay' if args.replay else 'firefox', 'results': results}, f, indent=2, sort_keys=True)
+        print("Baseline saved to [%s]." % args.save)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        assert baseline['driver'] == ('replay' if args.replay else 'firefox'), "The baseline is measured with another driver."
+        regressions = compare(results, baseline['results'], args.tolerance, args.rss_tolerance, args.min_delta)
+        if len(regressions) > 0:
+            print("\nREGRESSIONS against [%s]:" % args.compare)
+            for regression in regressions:
+                print("  " + regression)
+            sys.exit(1)
+        print("\nNo regression against [%s]." % args.compare)
+
+
+if __name__ == '__main__':
+    main()
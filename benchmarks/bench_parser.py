@@ -0,0 +1,84 @@
+"""
+Compares the element-by-element WebDriver scrape with the offline lxml parser on saved league pages.
+
+    python -m benchmarks.bench_parser                 # both paths in a headless Firefox
+    python -m benchmarks.bench_parser --offline       # lxml parsing only, no browser needed
+"""
+# Common Python library imports
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+# Internal package imports
+from bots.core import get_firefox_driver
+from bots.utils import ObjectMaker
+from bots.pinnacle.interface import get_markets, get_bankroll, get_matches_with_dates, get_match, num_of_pending_bets
+from bots.pinnacle.parser import PageParser
+from benchmarks.pages import render_league_page, render_betslip_card
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'tests', 'fixtures')
+
+
+def write_fixtures(sizes, directory):
+    paths = {}
+    cards = [render_betslip_card("Bayern Munich", "Borussia Dortmund", "draw", 3.85, 5.0)]
+    for size in sizes:
+        path = os.path.join(directory, 'league_%d.html' % size)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_league_page(size, cards=cards, start=date(2025, 3, 1)))
+        paths[size] = path
+    return paths
+
+def timeit(fnc, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fnc()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def scrape_elements(driver):
+    get_markets(driver, None)
+    get_bankroll(driver)
+    num_of_pending_bets(driver)
+    return [ get_match(curr_date, match) for curr_date, matches in get_matches_with_dates(driver) for match in matches ]
+
+def scrape_parser(driver):
+    page = PageParser.from_driver(driver)
+    page.get_markets()
+    page.get_bankroll()
+    page.get_betslip()
+    return [ match for _, matches in page.get_matches_with_dates() for match in matches ]
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--offline', action='store_true', help="Only measure the lxml parser on the files.")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_fixtures(args.sizes, directory)
+        paths['fixture'] = os.path.join(FIXTURES_DIR, 'league_bundesliga.html')
+
+        driver = None if args.offline else ObjectMaker(**get_firefox_driver(headless=True))()
+        try:
+            print("%-10s %14s %14s %10s" % ("page", "elements [s]", "lxml [s]", "speedup"))
+            for name, path in paths.items():
+                if driver is None:
+                    parser_time = timeit(lambda: PageParser.from_file(path).get_matches_with_dates(), args.repeat)
+                    print("%-10s %14s %14.4f %10s" % (name, "-", parser_time, "-"))
+                    continue
+                driver.get('file://%s' % path)
+                element_time = timeit(lambda: scrape_elements(driver), args.repeat)
+                parser_time = timeit(lambda: scrape_parser(driver), args.repeat)
+                print("%-10s %14.4f %14.4f %9.1fx" % (name, element_time, parser_time, element_time / parser_time))
+        finally:
+            if driver is not None:
+                driver.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,149 @@
+"""
+Compares the default and the lean browser profiles on the local mock site.
+
+The mock site serves its pages with the resources of a real page: images, a web font, an autoplay video,
+animations and analytics scripts. Both profiles open the main page and every league page `--repeat` times; the
+wall time of `open_main_page` and `open_league`, the assets requested from the site and the peak RSS of the
+browser are printed for both, with the savings of the lean profile.
+
+Without a browser, `--inventory` fetches the main page and its resources over HTTP and prints the requests and
+the bytes served per kind of resource, with the ones the lean profile leaves out.
+
+    python -m benchmarks.bench_profile --browser firefox --events 100 --repeat 5
+    python -m benchmarks.bench_profile --browser chrome --asset-delay 0.1
+    python -m benchmarks.bench_profile --inventory
+"""
+# Common Python library imports
+import argparse
+import re
+import statistics
+import time
+from urllib.parse import urljoin, urlparse
+from urllib.request import urlopen
+
+# Pip package imports
+import lxml.html
+
+# Internal package imports
+from bots.core import get_firefox_driver, get_chrome_driver, BLOCKED_HOSTS
+from bots.utils import ObjectMaker
+from bots.pinnacle.interface import open_main_page, open_league, league_paths
+from benchmarks.bench_bot import peak_rss_mb
+from benchmarks.mock_site import MockSite
+
+PROFILES = ['default', 'lean']
+OPERATIONS = ['open_main_page', 'open_league']
+DRIVERS = {
+    'firefox': get_firefox_driver,
+    'chrome': get_chrome_driver,
+}
+# The kinds of resources the lean profiles do not load, the scripts of the blocked hosts are left out as well
+LEAN_SKIPPED = ('image', 'font', 'media')
+RESOURCE_XPATHS = [
+    ('image', '//img/@src'),
+    ('media', '//video/@src'),
+    ('script', '//script/@src'),
+]
+
+
+def timed(times, fnc):
+    start = time.perf_counter()
+    fnc()
+    times.append(time.perf_counter() - start)
+
+def run_profile(site, browser, lean, repeat, headless=True):
+    """Open the pages of the mock site in a new browser.
+
+    :return: dict of operation -> mean wall time, with the 'assets' requested and the 'peak_rss_mb' of the browser
+    """
+    site.asset_requests.clear()
+    driver = ObjectMaker(**DRIVERS[browser](headless=headless, lean=lean))()
+    times = { operation: [] for operation in OPERATIONS }
+    try:
+        for _ in range(repeat):
+            timed(times['open_main_page'], lambda: open_main_page(driver, site.main_page))
+            for league in league_paths:
+                timed(times['open_league'], lambda: open_league(driver, league, direct=True))
+        # The browser runs in the child processes of the driver service
+        rss = peak_rss_mb(driver.service.process.pid)
+    finally:
+        driver.quit()
+    results = { operation: statistics.mean(values) for operation, values in times.items() }
+    results['assets'] = sum(site.asset_requests.values())
+    results['peak_rss_mb'] = rss
+    return results
+
+def blocked_host(url):
+    host = urlparse(url).hostname or ''
+    return any(host == blocked or host.endswith('.' + blocked) for blocked in BLOCKED_HOSTS)
+
+def page_inventory(url):
+    """Fetch a page and its resources without a browser, the resources of other hosts are not fetched.
+
+    :return: list of (kind, url, bytes served), None bytes for the other hosts
+    """
+    with urlopen(url) as response:
+        page = response.read()
+    inventory = [ ('document', url, len(page)) ]
+    tree = lxml.html.fromstring(page)
+    resources = [ (kind, src) for kind, xpath in RESOURCE_XPATHS for src in tree.xpath(xpath) ]
+    resources.extend( ('font', src) for style in tree.xpath('//style/text()')
+                      for src in re.findall(r"@font-face[^}]*url\('([^']+)'\)", style) )
+    for kind, src in resources:
+        resource_url = urljoin(url, src)
+        if urlparse(resource_url).netloc != urlparse(url).netloc:
+            inventory.append( (kind, resource_url, None) )
+            continue
+        with urlopen(resource_url) as response:
+            inventory.append( (kind, resource_url, len(response.read())) )
+    return inventory
+
+def print_inventory(inventory):
+    print("%-10s %9s %14s %14s" % ("", "requests", "default [KB]", "lean [KB]"))
+    totals = [0, 0.0, 0.0]
+    for kind in ['document', 'image', 'font', 'media', 'script']:
+        resources = [ (url, size) for curr_kind, url, size in inventory if curr_kind == kind ]
+        served = sum(size or 0 for _, size in resources) / 1024.0
+        lean = 0.0 if kind in LEAN_SKIPPED else served
+        other_hosts = len([ url for url, size in resources if size is None ])
+        blocked = len([ url for url, size in resources if size is None and blocked_host(url) ])
+        note = " (%d of other hosts, %d blocked by lean)" % (other_hosts, blocked) if other_hosts > 0 else ""
+        print("%-10s %9d %14.1f %14.1f%s" % (kind, len(resources), served, lean, note))
+        totals = [totals[0] + len(resources), totals[1] + served, totals[2] + lean]
+    print("%-10s %9d %14.1f %14.1f %8s" % ("total", totals[0], totals[1], totals[2], saving(totals[1], totals[2])))
+
+def saving(default, lean):
+    return "%.0f%%" % (100.0 * (default - lean) / default) if default > 0 else '-'
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--browser', choices=sorted(DRIVERS), default='firefox')
+    arg_parser.add_argument('--events', type=int, default=100, help="Events of every league page.")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Loads of every page per profile.")
+    arg_parser.add_argument('--asset-delay', type=float, default=0.05, help="Seconds the mock site takes per asset.")
+    arg_parser.add_argument('--headful', action='store_true', help="Show the browser windows.")
+    arg_parser.add_argument('--inventory', action='store_true', help="Only fetch the resources of a page, no browser.")
+    args = arg_parser.parse_args()
+
+    if args.inventory:
+        with MockSite(args.events, assets=True) as site:
+            print_inventory(page_inventory(site.main_page))
+        return
+
+    results = {}
+    with MockSite(args.events, assets=True, asset_delay=args.asset_delay) as site:
+        for profile in PROFILES:
+            results[profile] = run_profile(site, args.browser, profile == 'lean', args.repeat, headless=not args.headful)
+
+    default, lean = results['default'], results['lean']
+    print("%-16s %12s %12s %8s" % ("", "default", "lean", "saving"))
+    for operation in OPERATIONS:
+        print("%-16s %10.3f s %10.3f s %8s" % (operation, default[operation], lean[operation],
+                                               saving(default[operation], lean[operation])))
+    print("%-16s %12s %12s %8s" % ("assets", default['assets'], lean['assets'], saving(default['assets'], lean['assets'])))
+    print("%-16s %9.1f MB %9.1f MB %8s" % ("peak RSS", default['peak_rss_mb'], lean['peak_rss_mb'],
+                                          saving(default['peak_rss_mb'], lean['peak_rss_mb'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Compares the memory footprint of the match types kept in large numbers: the `ParsedMatch` namedtuple of the
+offline parser, the `MatchSelection` of the bots and the detached `MatchRecord`.
+
+The matches are parsed from a rendered league page once; then `--count` objects of every type are built from
+them. The bytes allocated per object are measured with tracemalloc, the team names and the dates are shared with
+the parsed page and not counted. The pickled size per object is what a fleet worker sends to the parent process.
+
+    python -m benchmarks.bench_records --count 20000
+"""
+# Common Python library imports
+import argparse
+import gc
+import pickle
+import tracemalloc
+from datetime import date
+
+# Internal package imports
+from bots.pinnacle.betting import BettingBot
+from bots.pinnacle.parser import PageParser, ParsedMatch
+from bots.pinnacle.records import MatchRecord
+from benchmarks.pages import render_league_page
+
+LEAGUE = 'bundesliga'
+
+
+def parse_matches(num_events):
+    page = PageParser(render_league_page(num_events, start=date(2025, 3, 1)))
+    return [ match for _, matches in page.get_matches_with_dates() for match in matches ]
+
+def to_parsed(match):
+    return ParsedMatch(match.home, match.away, match.time, match.href, dict(match.odds), dict(match.states),
+                       dict(match.selected))
+
+def to_selection(match):
+    return BettingBot.MatchSelection(None, match.home, match.away, match.time, None, odds=dict(match.odds),
+                                     league=LEAGUE, href=match.href)
+
+def to_record(match):
+    return MatchRecord.from_dict(match._asdict(), LEAGUE)
+
+BUILDERS = [
+    ('ParsedMatch', to_parsed),
+    ('MatchSelection', to_selection),
+    ('MatchRecord', to_record),
+]
+
+def allocated_bytes(build, matches, count):
+    """:return: the bytes per object held by a list of `count` objects built by `build`"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [ build(matches[i % len(matches)]) for i in range(count) ]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return float(after - before) / count
+
+def pickled_bytes(build, matches):
+    return float(sum(len(pickle.dumps(build(match))) for match in matches)) / len(matches)
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--count', type=int, default=20000, help="Objects of every type.")
+    arg_parser.add_argument('--events', type=int, default=200, help="Events of the parsed league page.")
+    args = arg_parser.parse_args()
+
+    matches = parse_matches(args.events)
+    print("%-16s %14s %14s" % ("", "memory [B]", "pickled [B]"))
+    for name, build in BUILDERS:
+        # A MatchSelection holds the bot and the row element, it is not sent between processes
+        pickled = "%14.0f" % pickled_bytes(build, matches) if build is not to_selection else "%14s" % "-"
+        print("%-16s %14.0f %s" % (name, allocated_bytes(build, matches, args.count), pickled))
+
+
+if __name__ == '__main__':
+    main()
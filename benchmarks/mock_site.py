@@ -0,0 +1,267 @@
+"""
+A local HTTP server which serves the rendered Pinnacle pages, with a small script which plays the part of the
+site in a real browser: logging in, adding and removing betslip cards, typing the stakes and confirming the
+bets, which lowers the bankroll kept by the server.
+"""
+# Common Python library imports
+import json
+import os
+import threading
+import time
+from collections import Counter
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Internal package imports
+from bots.pinnacle.interface import league_paths
+from benchmarks.pages import render_league_page
+
+SESSION_COOKIE = 'mock-session'
+
+MOCK_SCRIPT = """<script>
+function post(path, payload) {
+    return fetch(path, {method: 'POST', credentials: 'same-origin', body: JSON.stringify(payload)}).then(function (r) { return r.json(); });
+}
+function renderBetslip(betslip) {
+    var cards = betslip.querySelectorAll('div[data-test-id="Betslip-Card"]');
+    var empty = betslip.querySelector('div[data-test-id="betslip-empty"]');
+    if (cards.length > 0 && empty) { empty.remove(); }
+    if (cards.length === 0 && !empty) {
+        betslip.insertAdjacentHTML('afterbegin', '<div data-test-id="betslip-empty">Your bet slip is empty</div>');
+    }
+    betslip.querySelector('button[data-test-id="Betslip-ConfirmBetButton"]').innerText = 'Place ' + cards.length + ' bets';
+}
+function addCard(anchor) {
+    var row = anchor.closest('div[data-test-id="Event.Row"]');
+    var info = row.querySelectorAll('a[data-test-id="Event.GameInfo"] > div');
+    var title = info[0].innerText.trim() + ' - ' + info[1].innerText.trim();
+    var betslip = document.querySelector('div[data-test-id="Betslip"]');
+    var button = betslip.querySelector('button[data-test-id="Betslip-ConfirmBetButton"]');
+    var card = document.createElement('div');
+    card.setAttribute('data-test-id', 'Betslip-Card');
+    card.innerHTML = '<div data-test-id="Betslip-SelectionDetails"><div data-test-id="SelectionDetails-Title"></div>' +
+        '<span>' + anchor.getAttribute('data-test-designation') + '</span><span>' + anchor.innerText.trim() + '</span><button>x</button></div>' +
+        '<div data-test-id="Betslip-StakeWinInput"><div data-label="Stake"><input value="" data-empty="true"></div>' +
+        '<div data-label="Win"><input value=""></div></div>';
+    var titleNode = card.querySelector('div[data-test-id="SelectionDetails-Title"]');
+    titleNode.setAttribute('alt', title);
+    titleNode.innerText = title;
+    card.mockAnchor = anchor;
+    betslip.insertBefore(card, button);
+    anchor.setAttribute('data-selected', 'true');
+    renderBetslip(betslip);
+}
+function removeCard(card) {
+    if (card.mockAnchor) { card.mockAnchor.setAttribute('data-selected', 'false'); }
+    var betslip = card.parentNode;
+    card.remove();
+    renderBetslip(betslip);
+}
+document.addEventListener('input', function (event) {
+    var input = event.target;
+    if (input.closest('div[data-label="Stake"]')) {
+        input.setAttribute('value', input.value);
+        input.setAttribute('data-empty', input.value.length > 0 ? 'false' : 'true');
+    }
+});
+document.addEventListener('click', function (event) {
+    var target = event.target;
+    if (target.closest('form') && target.tagName === 'BUTTON') {
+        event.preventDefault();
+        post('/mock/login', {'username': document.getElementById('username').value,
+                             'password': document.getElementById('password').value}).then(function (result) {
+            if (result.ok) { window.location.reload(); }
+        });
+        return;
+    }
+    var anchor = target.closest('a[data-test-designation]');
+    if (anchor) {
+        event.preventDefault();
+        if (anchor.getAttribute('data-test-state') !== 'open') { return; }
+        var cards = document.querySelectorAll('div[data-test-id="Betslip-Card"]');
+        for (var i = 0; i < cards.length; i++) {
+            if (cards[i].mockAnchor === anchor) { removeCard(cards[i]); return; }
+        }
+        addCard(anchor);
+        return;
+    }
+    if (target.closest('div[data-test-id="Betslip-SelectionDetails"]') && target.tagName === 'BUTTON') {
+        removeCard(target.closest('div[data-test-id="Betslip-Card"]'));
+        return;
+    }
+    if (target.closest('button[data-test-id="Betslip-ConfirmBetButton"]')) {
+        var stakes = [];
+        var cards = Array.prototype.slice.call(document.querySelectorAll('div[data-test-id="Betslip-Card"]'));
+        cards.forEach(function (card) {
+            var value = parseFloat(card.querySelector('div[data-label="Stake"] > input').value);
+            if (!isNaN(value) && value > 0) { stakes.push(value); removeCard(card); }
+        });
+        post('/mock/confirm', {'stakes': stakes}).then(function (result) {
+            var bankroll = document.querySelector('span[data-test-id="QuickCashier-BankRoll"]');
+            if (bankroll) { bankroll.innerText = 'EUR ' + result.bankroll.toFixed(2); }
+        });
+        return;
+    }
+    var market = target.closest('div.contentBlock ul li button');
+    if (market) {
+        document.querySelectorAll('div.contentBlock ul li button').forEach(function (b) { b.removeAttribute('data-selected'); });
+        market.setAttribute('data-selected', 'true');
+    }
+});
+</script>"""
+
+
+# The resources of a real page which the bot never reads: (path, content type, size in bytes)
+ASSETS = {
+    '/mock/assets/logo.png': ('image/png', 40 * 1024),
+    '/mock/assets/banner.jpg': ('image/jpeg', 250 * 1024),
+    '/mock/assets/font.woff2': ('font/woff2', 120 * 1024),
+    '/mock/assets/promo.webm': ('video/webm', 1024 * 1024),
+}
+TEAM_LOGOS = 24
+
+ASSETS_HEAD = """<style>
+@font-face { font-family: 'Mock'; src: url('/mock/assets/font.woff2') format('woff2'); }
+body { font-family: 'Mock', sans-serif; }
+@keyframes pulse { from { opacity: 0.2; } to { opacity: 1; } }
+div[data-test-id="Event.Row"] { animation: pulse 0.5s infinite alternate; }
+</style>
+<script async src="https://www.google-analytics.com/analytics.js"></script>
+<script async src="https://www.googletagmanager.com/gtm.js?id=GTM-MOCK"></script>
+"""
+
+
+def render_assets():
+    logos = ''.join('<img src="/mock/assets/team-%s.png" width="24" height="24">' % i for i in range(TEAM_LOGOS))
+    return ('<div><img src="/mock/assets/logo.png"><img src="/mock/assets/banner.jpg">%s'
+            '<video autoplay muted loop src="/mock/assets/promo.webm"></video></div>' % logos)
+
+
+class MockSite(object):
+    """Serves the main page and the league pages of `league_paths` with `num_events` events each.
+
+    :param credentials: (user, password) accepted by the login, None accepts any non empty pair
+    :param assets: add the images, the web font, the video, the animations and the analytics scripts of a real
+        page. The requests of every asset are counted in `asset_requests`.
+    :param asset_delay: seconds every asset takes to be served, the latency of a CDN
+    """
+
+    def __init__(self, num_events=40, bankroll=1000.0, credentials=None, host='127.0.0.1', port=0, assets=False,
+                 asset_delay=0.0, **kwargs):
+        self.num_events = num_events
+        self.bankroll = bankroll
+        self.credentials = credentials
+        self.assets = assets
+        self.asset_delay = asset_delay
+        self.asset_requests = Counter()
+        self.placed_stakes = []
+        self._render_kwargs = kwargs
+        self._server = ThreadingHTTPServer((host, port), MockHandler)
+        self._server.daemon_threads = True
+        self._server.site = self
+        self._thread = None
+        self._pages = {}
+
+    @property
+    def base_url(self):
+        return 'http://%s:%s' % self._server.server_address[:2]
+
+    @property
+    def main_page(self):
+        return self.base_url + '/en/'
+
+    def league_url(self, league):
+        return self.base_url + league_paths[league]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def render(self, logged_in):
+        # The events are the same on every request, only the header follows the session
+        page = render_league_page(self.num_events, logged_in=logged_in, bankroll=self.bankroll, **self._render_kwargs)
+        if self.assets:
+            page = page.replace('</head>', ASSETS_HEAD + '</head>').replace('<body>', '<body>\n' + render_assets())
+        return page.replace('</body>', MOCK_SCRIPT + '\n</body>')
+
+    def asset(self, path):
+        """:return: (content type, body) of an asset, None if it is not one"""
+        if path.startswith('/mock/assets/team-'):
+            path, content = '/mock/assets/logo.png', ASSETS['/mock/assets/logo.png']
+        elif path in ASSETS:
+            content = ASSETS[path]
+        else:
+            return None
+        self.asset_requests[path] += 1
+        if self.asset_delay > 0.0:
+            time.sleep(self.asset_delay)
+        content_type, size = content
+        return content_type, os.urandom(size)
+
+    def login(self, user, password):
+        if not user or not password:
+            return False
+        return self.credentials is None or (user, password) == tuple(self.credentials)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    pages = set(['/en', '/en/'] + list(league_paths.values()))
+
+    @property
+    def site(self):
+        return self.server.site
+
+    def _logged_in(self):
+        cookie = SimpleCookie(self.headers.get('Cookie', ''))
+        return SESSION_COOKIE in cookie
+
+    def _reply(self, status, body, content_type, headers=None):
+        if not isinstance(body, bytes):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        asset = self.site.asset(path) if self.site.assets else None
+        if path in MockHandler.pages:
+            self._reply(200, self.site.render(self._logged_in()), 'text/html; charset=utf-8')
+        elif asset is not None:
+            content_type, body = asset
+            self._reply(200, body, content_type, {'Cache-Control': 'max-age=3600'})
+        else:
+            self._reply(404, 'Not found', 'text/plain')
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.path == '/mock/login':
+            ok = self.site.login(payload.get('username'), payload.get('password'))
+            headers = {'Set-Cookie': '%s=1; Path=/' % SESSION_COOKIE} if ok else {}
+            self._reply(200, json.dumps({'ok': ok}), 'application/json', headers)
+        elif self.path == '/mock/confirm' and self._logged_in():
+            stakes = [ float(stake) for stake in payload.get('stakes', []) ]
+            self.site.placed_stakes.extend(stakes)
+            self.site.bankroll -= sum(stakes)
+            self._reply(200, json.dumps({'bankroll': self.site.bankroll}), 'application/json')
+        else:
+            self._reply(404, json.dumps({}), 'application/json')
+
+    def log_message(self, *args):
+        pass
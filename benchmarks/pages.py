@@ -0,0 +1,110 @@
+"""
+Renders pages with the same structure as the Pinnacle league pages, so the scraping paths can be measured
+without the live site. The markup only keeps what the XPaths in `bots.pinnacle.interface` rely on.
+"""
+# Common Python library imports
+from datetime import date, timedelta
+from itertools import cycle
+import random
+
+# Internal package imports
+from bots.pinnacle.interface import leagues, league_paths, markets_lookup
+
+TEAMS = [
+    "Bayern Munich", "Borussia Dortmund", "RB Leipzig", "Bayer Leverkusen", "Eintracht Frankfurt",
+    "VfL Wolfsburg", "Borussia Monchengladbach", "SC Freiburg", "TSG Hoffenheim", "FC Augsburg",
+    "VfB Stuttgart", "Werder Bremen", "FSV Mainz 05", "Union Berlin", "FC Koln", "Hertha Berlin",
+    "Schalke 04", "VfL Bochum",
+]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head><meta charset="utf-8"><title>Pinnacle</title></head>
+<body>
+<iframe id="fc_push_frame" src="about:blank"></iframe>
+<header>%(header)s</header>
+<div data-test-id="LeftSidebar-Favourites">%(favourites)s</div>
+<div class="contentBlock">
+<ul>%(markets)s</ul>
+<div class="_2n6st"><div>%(events)s</div></div>
+</div>
+<div data-test-id="Betslip">%(betslip)s</div>
+</body>
+</html>
+"""
+
+def render_date_bar(event_date):
+    label = "Today" if event_date == date.today() else event_date.strftime("%a, %b %d, %Y")
+    return '<div data-test-id="Events.DateBar"><span>%s</span></div>' % label
+
+def render_event_row(event_id, home, away, kickoff, odds, state='open'):
+    selections = "".join(
+        '<a data-test-designation="%s" data-test-state="%s" data-selected="false"><span>%.3f</span></a>' % (designation, state, value)
+        for designation, value in zip(['home', 'draw', 'away'], odds))
+    return ('<div data-test-id="Event.Row">'
+            '<div><a data-test-id="Event.GameInfo" href="/en/soccer/matchup/%(id)s"><div>%(home)s</div><div>%(away)s</div><div>%(time)s</div></a></div>'
+            '<div>%(selections)s</div>'
+            '<div><span>+%(more)s</span></div>'
+            '</div>') % {'id': event_id, 'home': home, 'away': away, 'time': kickoff, 'selections': selections, 'more': 40}
+
+def render_betslip_card(home, away, designation, odds, stake=None):
+    empty = 'true' if stake is None else 'false'
+    value = '' if stake is None else str(stake)
+    return ('<div data-test-id="Betslip-Card">'
+            '<div data-test-id="Betslip-SelectionDetails"><div data-test-id="SelectionDetails-Title" alt="%(home)s - %(away)s">%(home)s - %(away)s</div>'
+            '<span>%(designation)s</span><span>%(odds).3f</span><button>x</button></div>'
+            '<div data-test-id="Betslip-StakeWinInput"><div data-label="Stake"><input value="%(value)s" data-empty="%(empty)s"></div>'
+            '<div data-label="Win"><input value=""></div></div>'
+            '</div>') % {'home': home, 'away': away, 'designation': designation, 'odds': odds, 'value': value, 'empty': empty}
+
+def render_betslip(cards=()):
+    if len(cards) == 0:
+        content = '<div data-test-id="betslip-empty">Your bet slip is empty</div>'
+    else:
+        content = "".join(cards)
+    return '%s<button data-test-id="Betslip-ConfirmBetButton">Place %d bets</button>' % (content, len(cards))
+
+def render_header(logged_in=True, bankroll=1000.0):
+    if logged_in:
+        return '<span data-test-id="QuickCashier-BankRoll">EUR %.2f</span>' % bankroll
+    return ('<form><input id="username" type="text"><input id="password" type="password">'
+            '<button type="submit">Log in</button></form>')
+
+def render_favourites(base_url=""):
+    return "".join('<a data-gtm-id="%s" href="%s%s">%s</a>' % (gtm_id, base_url, league_paths[league], league)
+                   for league, gtm_id in leagues.items())
+
+def render_markets(selected='Main Markets'):
+    return "".join('<li><button%s>%s</button></li>' % (' data-selected="true"' if name == selected else '', name)
+                   for name in markets_lookup.keys())
+
+def generate_events(num_events, start=None, per_day=8, seed=0):
+    """Generate `num_events` fixtures spread over consecutive days starting at `start`.
+
+    :return: list of (date, [(event_id, home, away, kickoff, odds)]) tuples.
+    """
+    rnd = random.Random(seed)
+    start = start or date.today()
+    pairs = cycle([ (home, away) for home in TEAMS for away in TEAMS if home != away ])
+    days = []
+    for index in range(num_events):
+        if index % per_day == 0:
+            days.append( (start + timedelta(days=index // per_day), []) )
+        home, away = next(pairs)
+        kickoff = "%02d:%02d" % (12 + (index % per_day), 30 if index % 2 else 0)
+        odds = (round(rnd.uniform(1.2, 5.0), 3), round(rnd.uniform(2.8, 4.5), 3), round(rnd.uniform(1.2, 8.0), 3))
+        days[-1][1].append( (1000000 + index, home, away, kickoff, odds) )
+    return days
+
+def render_league_page(num_events=40, logged_in=True, bankroll=1000.0, cards=(), base_url="", **kwargs):
+    events = []
+    for event_date, rows in generate_events(num_events, **kwargs):
+        events.append(render_date_bar(event_date))
+        events.extend(render_event_row(*row) for row in rows)
+    return PAGE_TEMPLATE % {
+        'header': render_header(logged_in, bankroll),
+        'favourites': render_favourites(base_url),
+        'markets': render_markets(),
+        'events': "".join(events),
+        'betslip': render_betslip(cards),
+    }
@@ -1,3 +1,6 @@
 from bots import pinnacle
 from bots import core
-from bots import utils
\ No newline at end of file
+from bots import utils
+from bots import waits
+from bots import profiler
+from bots import resilience
@@ -1,5 +1,6 @@
 # Common Python library imports
 from datetime import date, timedelta
+import base64
 import time
 
 # Pip package imports
@@ -10,6 +11,73 @@ from loguru import logger
 DEFAULT_BOT_NAME = "undefined"
 DEFAULT_BOT_VERSION = "v0_1"
 
+# Analytics and advertising hosts blocked by the lean profiles, with their subdomains. The chat widget is not
+# blocked, the login waits for its frame.
+BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'hotjar.com',
+    'segment.io',
+    'segment.com',
+    'mixpanel.com',
+    'nr-data.net',
+    'newrelic.com',
+    'fullstory.com',
+    'optimizely.com',
+    'quantserve.com',
+    'scorecardresearch.com',
+)
+
+# The bot reads the text of the pages: no images, web fonts, media or animations, a memory only cache and no
+# speculative connections
+LEAN_FIREFOX_PREFERENCES = {
+    'permissions.default.image': 2,
+    'gfx.downloadable_fonts.enabled': False,
+    'browser.display.use_document_fonts': 0,
+    'media.autoplay.default': 5,
+    'media.autoplay.blocking_policy': 2,
+    'media.preload.default': 0,
+    'image.animation_mode': 'none',
+    'ui.prefersReducedMotion': 1,
+    'toolkit.cosmeticAnimations.enabled': False,
+    'browser.cache.disk.enable': False,
+    'browser.cache.memory.enable': True,
+    'browser.cache.memory.capacity': 65536,
+    'browser.sessionhistory.max_total_viewers': 0,
+    'network.http.max-persistent-connections-per-server': 8,
+    'network.http.speculative-parallel-limit': 0,
+    'network.prefetch-next': False,
+    'network.dns.disablePrefetch': True,
+    'privacy.trackingprotection.enabled': True,
+    'dom.ipc.processCount': 2,
+    'fission.autostart': False,
+}
+
+LEAN_CHROME_ARGUMENTS = [
+    '--blink-settings=imagesEnabled=false',
+    '--disable-remote-fonts',
+    '--autoplay-policy=user-gesture-required',
+    '--force-prefers-reduced-motion',
+    '--disk-cache-size=67108864',
+    '--media-cache-size=1',
+    '--dns-prefetch-disable',
+    '--disable-background-networking',
+    '--disable-extensions',
+    '--renderer-process-limit=2',
+]
+
+LEAN_CHROME_PREFERENCES = {
+    'profile.managed_default_content_settings.images': 2,
+    'profile.default_content_setting_values.notifications': 2,
+}
+
+# A closed port, the requests to the blocked hosts fail at once instead of waiting for the network
+BLOCKED_PROXY = 'PROXY 127.0.0.1:9'
+
 class IBot(object):
 
     config = {
@@ -29,7 +97,41 @@ class IBot(object):
 
 
 
+def blocking_pac(blocked_hosts=BLOCKED_HOSTS):
+    """:return: a proxy auto-config script which sends the requests of the blocked hosts to a closed port"""
+    script = """function FindProxyForURL(url, host) {
+    var blocked = [%s];
+    for (var i = 0; i < blocked.length; i++) {
+        if (host == blocked[i] || dnsDomainIs(host, '.' + blocked[i])) { return '%s'; }
+    }
+    return 'DIRECT';
+}""" % (', '.join("'%s'" % host for host in blocked_hosts), BLOCKED_PROXY)
+    return 'data:application/x-ns-proxy-autoconfig;base64,' + base64.b64encode(script.encode('utf-8')).decode('ascii')
+
+def lean_firefox_preferences(blocked_hosts=BLOCKED_HOSTS):
+    """The preferences of the lean Firefox profile. The blocked hosts are set with a proxy auto-config script,
+    which replaces the proxy settings of the profile; no host is blocked with an empty `blocked_hosts`.
+    """
+    preferences = dict(LEAN_FIREFOX_PREFERENCES)
+    if len(blocked_hosts) > 0:
+        preferences['network.proxy.type'] = 2
+        preferences['network.proxy.autoconfig_url'] = blocking_pac(blocked_hosts)
+    return preferences
+
+def lean_chrome_arguments(blocked_hosts=BLOCKED_HOSTS):
+    """The command line arguments of the lean Chrome, the blocked hosts are never resolved."""
+    arguments = list(LEAN_CHROME_ARGUMENTS)
+    if len(blocked_hosts) > 0:
+        rules = ', '.join("MAP %s ~NOTFOUND, MAP *.%s ~NOTFOUND" % (host, host) for host in blocked_hosts)
+        arguments.append('--host-resolver-rules=%s' % rules)
+    return arguments
+
 def get_firefox_driver(**kwargs):
+    """:return: the arguments of an ObjectMaker of a Firefox driver.
+
+    :param lean: do not load the resources the bot never reads: images, web fonts, media, animations and the
+        `blocked_hosts`
+    """
     from selenium.webdriver.firefox.options import Options
 
     driver_path = kwargs.get('driver_path', "")
@@ -38,6 +140,9 @@ def get_firefox_driver(**kwargs):
     profile = kwargs.get('profile', webdriver.FirefoxProfile())
     options.headless = kwargs.get('headless', False)
     profile.set_preference('intl.accept_languages', 'en')
+    if kwargs.get('lean', False):
+        for name, value in lean_firefox_preferences(kwargs.get('blocked_hosts', BLOCKED_HOSTS)).items():
+            profile.set_preference(name, value)
 
     args = {
         'service_log_path': log_path,
@@ -51,12 +156,18 @@ def get_firefox_driver(**kwargs):
     return args
 
 def get_chrome_driver(**kwargs):
+    """:return: the arguments of an ObjectMaker of a Chrome driver, see `get_firefox_driver` for `lean`"""
     from selenium.webdriver.chrome.options import Options
 
     driver_path = kwargs.get('driver_path', "")
     log_path = kwargs.get('log_path', "./log/webdriver.log")
     options = kwargs.get('options', Options())
     options.headless = kwargs.get('headless', False)
+    if kwargs.get('lean', False):
+        for argument in lean_chrome_arguments(kwargs.get('blocked_hosts', BLOCKED_HOSTS)):
+            options.add_argument(argument)
+        # The prefs of the given options are kept
+        options.add_experimental_option('prefs', { **options.experimental_options.get('prefs', {}), **LEAN_CHROME_PREFERENCES })
 
     args = {
         'service_log_path': log_path,
@@ -1 +1,3 @@
-from .betting import BettingBot
\ No newline at end of file
+from .betting import BettingBot
+from .async_betting import AsyncBettingBot
+from .api import ApiBettingBot
\ No newline at end of file
@@ -0,0 +1,300 @@
+# Common Python library imports
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Pip package imports
+from loguru import logger
+import requests
+from requests.adapters import HTTPAdapter
+
+# Internal package imports
+from bots.core import IBot
+from bots.utils import get_nested, convert_datetime
+from bots.resilience import get_policy, CircuitOpenError
+from bots.pinnacle.betting import BettingBot
+from bots.pinnacle.names import AliasTable, MatchIndex
+
+API_URL = 'https://guest.api.arcadia.pinnacle.com/0.1'
+
+league_ids = {
+    "premier-league": 1980,
+    "laliga": 2196,
+    "bundesliga": 1842,
+    "serie-a": 2436,
+    "ligue-1": 2036,
+}
+
+def american_to_decimal(price):
+    """Convert an american price (e.g. -150, +230) to decimal odds."""
+    if price is None:
+        return None
+    price = float(price)
+    return round(1.0 + (price / 100.0 if price > 0 else 100.0 / abs(price)), 3)
+
+def convert_start_time(text):
+    """The start time of a matchup, in UTC without the timezone."""
+    return datetime.strptime(text[:19], '%Y-%m-%dT%H:%M:%S')
+
+def get_session(pool_size=10, api_key=None):
+    """HTTP session which keeps `pool_size` connections alive per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers.update({'Accept': 'application/json', 'Content-Type': 'application/json'})
+    if api_key is not None:
+        session.headers['X-API-Key'] = api_key
+    return session
+
+def parse_matches(matchups, markets):
+    """Join the matchups and the straight markets of a league into match dicts.
+
+    The match dicts have the same keys as the ones of `get_events_snapshot`, and the 'id' of the matchup.
+    Only the full-time money line gives the odds of a match.
+    """
+    odds = {}
+    states = {}
+    for market in markets:
+        if market.get('type') != 'moneyline' or market.get('period', 0) != 0 or market.get('isAlternate', False):
+            continue
+        prices = { price['designation']: american_to_decimal(price.get('price')) for price in market.get('prices', []) }
+        odds[market['matchupId']] = prices
+        states[market['matchupId']] = { designation: market.get('status', 'open') for designation in prices }
+
+    matches = []
+    for matchup in matchups:
+        if matchup.get('type') != 'matchup' or matchup.get('parent') is not None:
+            # Specials and the periods of a matchup
+            continue
+        participants = { participant['alignment']: participant['name'] for participant in matchup.get('participants', []) }
+        if 'home' not in participants or 'away' not in participants:
+            continue
+        matches.append({
+            'id': matchup['id'],
+            'home': participants['home'],
+            'away': participants['away'],
+            'time': convert_start_time(matchup['startTime']),
+            'href': None,
+            'odds': odds.get(matchup['id'], {}),
+            'states': states.get(matchup['id'], {}),
+            'selected': None,
+            'match_element': None,
+        })
+    return sorted(matches, key=lambda match: match['time'])
+
+
+class ApiClient(object):
+    """JSON client of the sportsbook API over one pooled keep-alive session.
+
+    :param base_url: root of the API, a local stub server in the tests
+    """
+
+    def __init__(self, base_url=API_URL, api_key=None, pool_size=10, timeout=10.0):
+        self._base_url = base_url.rstrip('/')
+        self._timeout = timeout
+        self._session = get_session(pool_size=pool_size, api_key=api_key)
+        self._token = None
+
+    @property
+    def logged_in(self):
+        return self._token is not None
+
+    def get(self, path, **params):
+        response = self._session.get(self._base_url + path, params=params, timeout=self._timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def post(self, path, payload):
+        response = self._session.post(self._base_url + path, json=payload, timeout=self._timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def login(self, user, password):
+        self._token = self.post('/sessions', {'username': user, 'password': password})['token']
+        self._session.headers['X-Session'] = self._token
+
+    def matchups(self, league_id):
+        return self.get('/leagues/%s/matchups' % league_id)
+
+    def straight_markets(self, league_id):
+        return self.get('/leagues/%s/markets/straight' % league_id)
+
+    def balance(self):
+        return float(self.get('/wallet/balance')['amount'])
+
+    def close(self):
+        self._session.close()
+
+
+class ApiBettingBot(IBot):
+    """Read-only betting bot on the HTTP API, without a browser.
+
+    It has the scanning surface of `BettingBot`: `select_league`, `select_matches`, `select_matches_in_leagues`,
+    `bankroll`, and the main market odds of the selected matches. The matches cannot be bet on.
+    """
+
+    class MatchSelection(BettingBot.MatchSelection):
+
+        def bet_on(self, market_choice, stake, **kwargs):
+            assert False, "The matches of the API backend are read-only."
+
+    name = "Pinnacle API Bot"
+    slug = "pinnacle-api-bot"
+    version = "v0_1"
+
+    default_config = {
+        'default_league': 'bundesliga',
+        'mode': 'test',
+        'api_url': API_URL,
+        'api_key': None,
+        # Kept alive connections, and the threads of `select_matches_in_leagues`
+        'pool_size': 10,
+        'timeout': 10.0,
+        # JSON file of the team name aliases used by the name filters
+        'team_aliases_path': None,
+        # Per-operation overrides of the retry budgets, see bots.resilience.default_policies
+        'retry_policies': {},
+    }
+
+    def __init__(self, client, *args, **kwargs):
+        kwargs['config'] = { **ApiBettingBot.default_config, **kwargs.get('config', {}) }
+
+        m_kwargs = {**{
+            'name': ApiBettingBot.name,
+            'slug': ApiBettingBot.slug,
+            'version': ApiBettingBot.version
+        }, **kwargs}
+
+        super(ApiBettingBot, self).__init__(*args, **m_kwargs)
+
+        logger.info("Initializing %s in [%s] mode." % (self.name, self._get_config('mode')))
+        self._client = client
+        self._league = self._get_config('default_league')
+        self._aliases = AliasTable(self._get_config('team_aliases_path'))
+
+    def _get_config(self, *args):
+        return get_nested(self._config, *args)
+
+    @staticmethod
+    def login(user, password, **kwargs):
+        policy = get_policy('login', get_nested(kwargs, 'config', 'retry_policies'))
+        return policy.run(ApiBettingBot.connect, user, password, **kwargs)
+
+    def policy(self, name):
+        """The retry policy of an operation, with the overrides of the config."""
+        return get_policy(name, self._get_config('retry_policies'))
+
+    @staticmethod
+    def connect(user, password, **kwargs):
+        """A single login attempt, `login` retries it. Without a user only the public data can be read."""
+        user = os.getenv('PINNACLE_USER', user)
+        password = os.getenv('PINNACLE_PASSWORD', password)
+        config = { **ApiBettingBot.default_config, **kwargs.get('config', {}) }
+        client = ApiClient(base_url=config['api_url'],
+                           api_key=os.getenv('PINNACLE_API_KEY', config['api_key']),
+                           pool_size=config['pool_size'],
+                           timeout=config['timeout'])
+        try:
+            if user:
+                logger.debug('Logging in.')
+                client.login(user, password)
+        except Exception as err:
+            logger.error(err)
+            client.close()
+            raise
+        bot = ApiBettingBot(client, username=user, password=password, **kwargs)
+        bot.select_league(kwargs.get('league', config['default_league']))
+        return bot
+
+    def close(self):
+        self._client.close()
+
+    @property
+    def bankroll(self):
+        assert self._client.logged_in, "The bankroll needs a logged in session."
+        return self._client.balance()
+
+    @property
+    def aliases(self):
+        return self._aliases
+
+    def select_league(self, league):
+        assert league in league_ids, "[%s] is not a known league." % league
+        self._league = league
+        logger.info("League: [%s] selected." % league)
+
+    def get_matches(self, league=None):
+        """:return: the match dicts of a league, the selected one by default"""
+        league_id = league_ids[league or self._league]
+        return parse_matches(self._client.matchups(league_id), self._client.straight_markets(league_id))
+
+    def select_matches(self, **kwargs):
+        """:param kwargs: the filters of `BettingBot.select_matches`, with `limit` and `first`"""
+        return self._select_matches(self._league, **kwargs)
+
+    def select_records(self, **kwargs):
+        """The matches of `select_matches` as detached MatchRecords."""
+        return [ match.record for match in self.select_matches(**kwargs) ]
+
+    def _select_matches(self, league, **kwargs):
+        selected_date = kwargs.get('date', None)
+        home = kwargs.get('home', None)
+        away = kwargs.get('away', None)
+        name_matcher = kwargs.get('match_names', None)
+
+        matches = self.get_matches(league)
+        if selected_date is not None:
+            selected_date = convert_datetime(selected_date)
+            matches = [ match for match in matches if match['time'].date() == selected_date ]
+        if home is not None or away is not None:
+            if name_matcher is None:
+                matches = MatchIndex(matches, aliases=self._aliases).find(home=home, away=away)
+            else:
+                matches = [ match for match in matches
+                            if (home is None or name_matcher(home, match['home'])) and (away is None or name_matcher(away, match['away'])) ]
+
+        if kwargs.get('first', False):
+            return self._to_selection(matches[0], league) if len(matches) > 0 else None
+        result_list = [ self._to_selection(match, league) for match in matches[:kwargs.get('limit', None)] ]
+        logger.debug('For Date: [%s] Home: [%s] Away: [%s] - [%s] of match found.' % (selected_date, home, away, len(result_list)))
+        return result_list
+
+    def select_matches_in_leagues(self, leagues, concurrent=True, **kwargs):
+        """Read the matches of several leagues, concurrently over the pooled connections.
+
+        :param kwargs: the filters of `select_matches`
+        :return: the merged list of matches, every match is tagged with its league. A league which fails within
+            its 'league_scrape' policy is left out.
+        """
+        policy = self.policy('league_scrape')
+
+        def scrape(league):
+            try:
+                return policy.scoped(league).run(self._select_matches, league, **kwargs)
+            except CircuitOpenError as err:
+                logger.info("League [%s] skipped: %s" % (league, err))
+            except Exception as err:
+                logger.error("League [%s] failed: %s" % (league, err))
+            return []
+
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=self._get_config('pool_size')) as executor:
+                results = list(executor.map(scrape, leagues))
+        else:
+            results = [ scrape(league) for league in leagues ]
+        result_list = [ match for matches in results for match in matches ]
+        logger.info("[%s] matches found in leagues %s." % (len(result_list), list(leagues)))
+        return result_list
+
+    def _to_selection(self, match, league):
+        selection = ApiBettingBot.MatchSelection(self,
+                                                 home=match['home'],
+                                                 away=match['away'],
+                                                 match_date=match['time'],
+                                                 html_content=None,
+                                                 odds=match['odds'],
+                                                 league=league,
+                                                 href=match['href'])
+        selection.matchup_id = match['id']
+        return selection
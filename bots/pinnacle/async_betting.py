@@ -0,0 +1,107 @@
+# Common Python library imports
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.utils import get_nested
+from bots.resilience import get_policy
+from bots.pinnacle.betting import BettingBot
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor = None
+
+def get_executor(max_workers=DEFAULT_MAX_WORKERS):
+    """The bounded executor shared by the async bots which are created without their own executor."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bots-driver')
+    return _executor
+
+
+class AsyncBettingBot(object):
+    """Coroutine facade of `BettingBot`.
+
+    The blocking driver calls run on a bounded executor, so one event loop can drive several bots. The calls
+    of one bot are serialized, because a webdriver session cannot be used from two threads at once. The
+    retries back off with `asyncio.sleep` instead of blocking a thread.
+    """
+
+    def __init__(self, bot, executor=None):
+        self._bot = bot
+        self._executor = executor or get_executor()
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def login(cls, user, password, webdriver, executor=None, **kwargs):
+        executor = executor or get_executor()
+
+        async def connect():
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, functools.partial(BettingBot.connect, user, password, webdriver, **kwargs))
+
+        policy = get_policy('login', get_nested(kwargs, 'config', 'retry_policies'))
+        return cls(await policy.run_async(connect), executor=executor)
+
+    async def _run(self, fnc, *args, **kwargs):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fnc, *args, **kwargs))
+
+    @property
+    def bot(self):
+        return self._bot
+
+    @property
+    def markets(self):
+        return self._bot.markets
+
+    @property
+    def selected_market(self):
+        return self._bot.selected_market
+
+    @property
+    def bankroll(self):
+        return self._bot.bankroll
+
+    @property
+    def placed_bets(self):
+        return self._bot.placed_bets
+
+    @property
+    def pending_bets(self):
+        return self._bot.pending_bets
+
+    def policy(self, name):
+        return get_policy(name, get_nested(getattr(self._bot, '_config', None), 'retry_policies'))
+
+    async def select_league(self, league):
+        return await self.policy('select_league').scoped(league).run_async(self._run, self._bot.select_league_once, league)
+
+    async def select_market(self, market):
+        return await self._run(self._bot.select_market, market)
+
+    async def select_matches(self, **kwargs):
+        return await self._run(self._bot.select_matches, **kwargs)
+
+    async def select_matches_in_leagues(self, leagues, **kwargs):
+        return await self._run(self._bot.select_matches_in_leagues, leagues, **kwargs)
+
+    async def bet_on(self, match, market_choice, stake, **kwargs):
+        return await self._run(match.bet_on, market_choice, stake, **kwargs)
+
+    async def place_bet(self, market_choice, match_info, odds, stake):
+        return await self._run(self._bot.place_bet, market_choice, match_info, odds, stake)
+
+    async def clear_bets(self):
+        return await self._run(self._bot.clear_bets)
+
+    async def confirm_bets(self):
+        return await self._run(self._bot.confirm_bets)
+
+    async def close(self):
+        return await self._run(self._bot.close)
@@ -0,0 +1,124 @@
+# Common Python library imports
+from collections import OrderedDict, namedtuple
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.utils import safe_cast
+from bots.pinnacle.interface import BETSLIP_CARD_XPATH, STAKE_INPUT_XPATH
+
+# Number of cards and the sum of the stakes on the betslip
+BetslipChecksum = namedtuple('BetslipChecksum', ['count', 'total_stake'])
+
+BETSLIP_CHECKSUM_SCRIPT = """
+var cards = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var total = 0.0;
+for (var i = 0; i < cards.snapshotLength; i++) {
+    var input = document.evaluate(arguments[1], cards.snapshotItem(i), null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    var value = input ? parseFloat(input.value) : NaN;
+    if (!isNaN(value)) { total += value; }
+}
+return [cards.snapshotLength, total];
+"""
+
+def betslip_title(match):
+    """The title of the betslip card of a match."""
+    return "%s - %s" % (match.home, match.away)
+
+def get_betslip_checksum(driver):
+    """Read the checksum of the betslip with one script execution."""
+    count, total_stake = driver.execute_script(BETSLIP_CHECKSUM_SCRIPT, BETSLIP_CARD_XPATH, STAKE_INPUT_XPATH)
+    return BetslipChecksum(int(count), safe_cast(total_stake, float, 0.0))
+
+def checksum_of_record(record):
+    """The checksum of a `BetslipRecord` of the page parser."""
+    return BetslipChecksum(len(record.cards), sum(card.stake for card in record.cards if card.stake is not None))
+
+
+class Betslip(object):
+    """In-memory model of the betslip, keyed by the card title and the market choice.
+
+    The model is updated on every add, remove and stake change, so the number of bets and the sum of the stakes
+    are answered without reading the page. `reconcile` compares the model with the checksum of the page.
+
+    :param tolerance: allowed difference of the stake sums, per bet
+    """
+
+    def __init__(self, tolerance=0.01):
+        self._tolerance = tolerance
+        self._entries = OrderedDict()
+        self._total_stake = 0.0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __iter__(self):
+        return iter(self._entries.values())
+
+    @staticmethod
+    def key(market_choice, match):
+        return (betslip_title(match), market_choice.lower())
+
+    @property
+    def total_stake(self):
+        return self._total_stake
+
+    @property
+    def checksum(self):
+        return BetslipChecksum(len(self._entries), self._total_stake)
+
+    def get(self, market_choice, match):
+        return self._entries.get(Betslip.key(market_choice, match), None)
+
+    def add(self, market_choice, match, odds, stake):
+        """Add a bet, or update the stake and odds of the same selection."""
+        key = Betslip.key(market_choice, match)
+        previous = self._entries.get(key, None)
+        if previous is not None:
+            self._total_stake -= previous['stake']
+        entry = {
+            'market': market_choice,
+            'match': match,
+            'odds': odds,
+            'stake': stake
+        }
+        self._entries[key] = entry
+        self._total_stake += stake
+        return entry
+
+    def set_stake(self, market_choice, match, stake):
+        entry = self._entries[Betslip.key(market_choice, match)]
+        self._total_stake += stake - entry['stake']
+        entry['stake'] = stake
+
+    def remove(self, market_choice, match):
+        entry = self._entries.pop(Betslip.key(market_choice, match), None)
+        if entry is not None:
+            self._total_stake -= entry['stake']
+        if len(self._entries) == 0:
+            # Do not carry the rounding errors over
+            self._total_stake = 0.0
+        return entry
+
+    def clear(self):
+        self._entries.clear()
+        self._total_stake = 0.0
+
+    def values(self):
+        return list(self._entries.values())
+
+    def reconcile(self, checksum):
+        """Compare the model with the checksum of the page.
+
+        :param checksum: `BetslipChecksum`, see `get_betslip_checksum` and `checksum_of_record`
+        :return: True if the page and the model have the same number of bets and sum of stakes
+        """
+        in_sync = checksum.count == len(self._entries) and \
+                  abs(checksum.total_stake - self._total_stake) <= self._tolerance * max(1, checksum.count)
+        if not in_sync:
+            logger.warning("The betslip is out of sync. [Page: %s], [Model: %s]" % (tuple(checksum), tuple(self.checksum)))
+        return in_sync
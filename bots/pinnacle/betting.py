@@ -3,6 +3,9 @@ import time
 import re
 import os
 import difflib
+import threading
+from collections import namedtuple
+from itertools import islice
 from datetime import datetime, date, time
 
 # Pip package imports
@@ -11,8 +14,25 @@ import pandas as pd
 
 # Internal package imports
 from bots.core import get_firefox_driver, IBot
-from bots.utils import get_nested, convert_datetime, retry
+from bots.utils import get_nested, convert_datetime
+from bots.resilience import get_policy, LoggedOutError
 from bots.pinnacle.interface import *
+from bots.pinnacle.parser import PageParser
+from bots.pinnacle.tabs import LeagueTabs
+from bots.pinnacle.session import SessionCache
+from bots.pinnacle.ledger import BetLedger
+from bots.pinnacle.names import AliasTable, MatchIndex
+from bots.pinnacle.stream import OddsStream
+from bots.pinnacle.betslip import Betslip, get_betslip_checksum
+from bots.pinnacle.matchcache import MatchCache
+from bots.pinnacle.records import MatchRecord
+from bots.pinnacle.staking import allocate_stakes, limits_from_config, limit_stake
+
+# The cheaply read team names of an event of the page, the match details are extracted only for the hits
+EventNames = namedtuple('EventNames', ['home', 'away', 'date', 'event'])
+# A scrape of a league page: the (date, [match]) list, the function which extracts the match details, the one
+# which reads only the team names, and the name indexes of the dates, built on their first query
+ScrapedEvents = namedtuple('ScrapedEvents', ['all_matches', 'extract', 'names', 'indexes'])
 
 def match_names(name, list_of_names):
     import difflib
@@ -21,6 +41,9 @@ def match_names(name, list_of_names):
         return True
     return False
 
+# The 'lxml' scrape mode parses a copy of the page, its matches have no event row to click
+READ_ONLY_MATCH = "The matches of the 'lxml' scrape mode are read-only, use the 'element' or 'snapshot' mode to place bets."
+
 class BettingBot(IBot):
 
     class MatchSelection(object):
@@ -31,7 +54,13 @@ class BettingBot(IBot):
             self.away = away
             self.date = match_date
             self._content = html_content
-            self.cancel_fnc = None
+            self.odds = kwargs.get('odds', {})
+            self.league = kwargs.get('league', None)
+            # Window handle of the tab the match was scraped from
+            self.window = kwargs.get('window', None)
+            self.href = kwargs.get('href', None)
+            # market choice -> function which removes the betslip card of the bet
+            self._cancel_fncs = {}
 
         def __del__(self):
             # TODO: shall we clear if its possible?
@@ -47,16 +76,32 @@ class BettingBot(IBot):
         def html(self):
             return self._content
 
+        @property
+        def record(self):
+            """The detached MatchRecord of the match."""
+            return MatchRecord.from_selection(self)
+
         def bet_on(self, market_choice, stake, **kwargs):
+            assert self._content is not None, READ_ONLY_MATCH
+            self._parent._switch_window(self.window)
             return self._parent.selected_market.bet_on(market_choice, self, stake, **kwargs)
 
-        def clear(self):
-            if self.cancel_fnc is not None:
+        def set_cancel(self, market_choice, cancel_fnc):
+            self._cancel_fncs[market_choice.lower()] = cancel_fnc
+
+        def clear(self, market_choice=None):
+            """Remove the bets of the match, or only the one of `market_choice`, from the betslip and its model."""
+            choices = [ market_choice.lower() ] if market_choice is not None else list(self._cancel_fncs.keys())
+            for choice in choices:
+                cancel_fnc = self._cancel_fncs.pop(choice, None)
+                if cancel_fnc is None:
+                    continue
                 try:
-                    self.cancel_fnc()
+                    cancel_fnc()
                 except Exception as err:
-                    # Supress the 'element not attached to the DOM' error
-                    pass
+                    # Supress the 'element not attached to the DOM' error, the card is not there any more
+                    continue
+                self._parent._remove_pending(choice, self)
 
     name = "Pinnacle Betting Bot"
     slug = "pinnacle-betting-bot"
@@ -70,6 +115,31 @@ class BettingBot(IBot):
         'max_sum_stake': 9999.0,
         'min_bankroll_percent': 0.4,
         'max_stake_percent': 0.6,
+        # 'snapshot' reads the whole event list with one script execution, 'element' walks the DOM row by row,
+        # 'lxml' parses the page source offline. The 'lxml' mode is read-only, its matches cannot be bet on.
+        'scrape_mode': 'snapshot',
+        # Per-action timeouts of the waits, see bots.waits.Waiter.default_timeouts
+        'wait_timeouts': {},
+        # Shrink the timeouts to the learned p95 latencies of the actions
+        'adaptive_waits': False,
+        # SQLite file of the placed bets ledger, None keeps the ledger in memory
+        'ledger_path': None,
+        'ledger_flush_every': 100,
+        # JSON file of the team name aliases used by the name filters
+        'team_aliases_path': None,
+        # Per-operation overrides of the retry budgets, see bots.resilience.default_policies
+        'retry_policies': {},
+        # Seconds a league page of `select_matches_in_leagues` is given to load
+        'league_timeout': 10,
+        # 'url' loads the league pages by their URL, 'sidebar' clicks the favourite links
+        'league_navigation': 'sidebar',
+        # Seconds a scraped match list of a league is reused, 0 scrapes the page on every query
+        'match_cache_ttl': 0,
+        # Seconds between the background reads of the current league page, None disables them
+        'match_refresh_interval': None,
+        # Stakes of `place_value_bets`: 'kelly' or 'proportional', see bots.pinnacle.staking.allocate_stakes
+        'staking_method': 'kelly',
+        'kelly_fraction': 0.25,
     }
 
     def __init__(self, driver, *args, **kwargs):
@@ -85,24 +155,48 @@ class BettingBot(IBot):
 
         logger.info("Initializing %s in [%s] mode." % (self.name, self._get_config('mode')))
 
+        # The waiter of `connect` keeps the latencies of the login
+        self._waiter = getattr(driver, '_waiter', None) or use_waiter(driver, self._get_config('wait_timeouts'),
+                                                                    adaptive=self._get_config('adaptive_waits'))
         self._driver = driver
         # Get the markets
         try:
-            self.markets = get_markets(driver, self)
-            # Get the selected market
-            self.selected_market = get_selected_market(driver, self.markets)
-            # Get the current bankroll
-            bankroll = get_bankroll(driver)
+            if self._get_config('scrape_mode') == 'lxml':
+                # Everything is read from one copy of the page source
+                page = PageParser.from_driver(driver, wait_xpath=MARKETS_XPATH)
+                self.markets = build_markets([ market.name for market in page.get_markets() ], self)
+                selected = page.get_selected_market()
+                self.selected_market = getattr(self.markets, selected.slug, None) if selected is not None else None
+                bankroll = page.get_bankroll()
+            else:
+                self.markets = get_markets(driver, self)
+                # Get the selected market
+                self.selected_market = get_selected_market(driver, self.markets)
+                # Get the current bankroll
+                bankroll = get_bankroll(driver)
         except Exception as err:
             logger.error(err)
             raise
         else:
-            self._pending_bets = []
-            self._placed_bets = pd.DataFrame()
+            self._pending_bets = Betslip()
+            self._placed_bets = BetLedger(self._get_config('ledger_path'), flush_every=self._get_config('ledger_flush_every'))
             self._bankroll = bankroll
             self._calculated_bankroll = bankroll
             self._sum_stakes = 0.0
             self._starting_bankroll = bankroll
+            self._tabs = None
+            self._session_cache = kwargs.get('session_cache', None)
+            self._aliases = AliasTable(self._get_config('team_aliases_path'))
+            self._league = kwargs.get('league', self._get_config('default_league'))
+            # Guards the navigation against the background refresh of the match lists
+            self._lock = threading.RLock()
+            self._match_cache = MatchCache(ttl=self._get_config('match_cache_ttl'))
+            if self._get_config('match_refresh_interval') is not None:
+                self.start_match_refresh(self._get_config('match_refresh_interval'))
+            # Optional budget shared by several bots, see bots.pinnacle.fleet.StakeBudget
+            self._budget = kwargs.get('budget', None)
+            if self._budget is not None:
+                self._budget.start(bankroll)
 
     def __del__(self):
         try:
@@ -112,39 +206,79 @@ class BettingBot(IBot):
 
     @property
     def placed_bets(self):
+        return self._placed_bets.to_frame()
+
+    @property
+    def ledger(self):
         return self._placed_bets
 
     @property
     def pending_bets(self):
+        return self._pending_bets.values()
+
+    @property
+    def betslip(self):
         return self._pending_bets
 
     @property
     def bankroll(self):
         return self._calculated_bankroll
 
+    @property
+    def wait_stats(self):
+        return self._waiter.stats()
+
     @staticmethod
-    @retry(Exception, tries=3, delay=2, backoff=4, logger=logger)
     def login(user, password, webdriver, **kwargs):
+        policy = get_policy('login', get_nested(kwargs, 'config', 'retry_policies'))
+        return policy.run(BettingBot.connect, user, password, webdriver, **kwargs)
 
+    def policy(self, name):
+        """The retry policy of an operation, with the overrides of the config."""
+        return get_policy(name, self._get_config('retry_policies'))
+
+    @staticmethod
+    def connect(user, password, webdriver, **kwargs):
+        """A single login attempt, `login` retries it.
+
+        With a `session_cache` (a SessionCache or a path) the cached session is restored first, and the
+        credentials are only used when it is missing, expired or rejected. The `main_page` URL replaces the
+        main page of the site, e.g. with a local mock site.
+        """
         # Get the keys from environment variables
         user = os.getenv('PINNACLE_USER', user)
         password = os.getenv('PINNACLE_PASSWORD', password)
+        session_cache = kwargs.get('session_cache', None)
+        main_page = kwargs.get('main_page', None)
+        config = { **BettingBot.default_config, **kwargs.get('config', {}) }
+        if isinstance(session_cache, str):
+            session_cache = kwargs['session_cache'] = SessionCache(session_cache)
 
         # Init webdriver
         driver = webdriver()
+        use_waiter(driver, config['wait_timeouts'], adaptive=config['adaptive_waits'])
+        restored = False
         try:
             # Open the main page
             logger.debug('Opening main page.')
-            open_main_page(driver)
-            # Perform login
-            logger.debug('Logging in.')
-            login(driver, user=user, password=password)
+            open_main_page(driver, main_page)
+            restored = session_cache is not None and session_cache.restore(driver, main_page)
+            if not restored:
+                # Perform login
+                logger.debug('Logging in.')
+                login(driver, user=user, password=password)
+                if session_cache is not None:
+                    session_cache.save(driver)
             # Open the default league page
-            open_league(driver, kwargs.get('league', 'bundesliga'))
+            open_league(driver, kwargs.get('league', config['default_league']), direct=config['league_navigation'] == 'url')
             # Make sure we are still logged in
-            assert is_logged_in(driver), "Something went wrong after login. The website is logged off."
+            if not is_logged_in(driver):
+                raise LoggedOutError("Something went wrong after login. The website is logged off.")
         except Exception as err:
             logger.error(err)
+            if restored:
+                # Do not restore the same session on the next attempt
+                session_cache.clear()
             driver.close()
             raise
         else:
@@ -152,6 +286,9 @@ class BettingBot(IBot):
 
 
     def close(self):
+        self.stop_match_refresh()
+        self.close_tabs()
+        self._placed_bets.close()
         if self._driver is not None:
             try:
                 logger.debug('Closing the webdriver.')
@@ -159,18 +296,28 @@ class BettingBot(IBot):
             except Exception as err:
                 logger.error(err)
 
-    @retry(ConnectionError, tries=3, delay=5, backoff=2)
     def select_league(self, league):
+        return self.policy('select_league').scoped(league).run(self.select_league_once, league)
+
+    def select_league_once(self, league):
+        """A single attempt to select the league, `select_league` retries it."""
         assert self._driver is not None, "webdriver is not opened."
+        with self._lock:
+            self._open_league(league)
+
+    def _open_league(self, league):
         try:
             if not is_logged_in(self._driver):
                 uname = self._username
                 pwd = self._password
                 logger.debug('Trying to log in ...')
                 login(self._driver, user=uname, password=pwd)
+                if self._session_cache is not None:
+                    self._session_cache.save(self._driver)
 
             logger.debug('Opening league [%s].' % league)
-            open_league(self._driver, league)
+            open_league(self._driver, league, direct=self._get_config('league_navigation') == 'url')
+            self._league = league
         except Exception as err:
             logger.error(err)
             raise
@@ -178,7 +325,7 @@ class BettingBot(IBot):
             # Check login
             if not is_logged_in(self._driver):
                 logger.warning("Something went wrong after login. The website is logged off.")
-                raise ConnectionError
+                raise LoggedOutError("The website is logged off.")
             logger.info("League: [%s] selected." % league)
 
 
@@ -187,38 +334,216 @@ class BettingBot(IBot):
         logger.debug('Selecting market [%s].' % market)
         if self.selected_market != market:
             assert select_market(self._driver, market), "The market was not selected."
+            self.selected_market = market
+            # The odds of the cached match lists belong to the other market
+            self._match_cache.invalidate()
             logger.info("Market [%s] selected." % market)
         return self.selected_market
 
+    @property
+    def aliases(self):
+        return self._aliases
+
+    @property
+    def league(self):
+        return self._league
+
+    @property
+    def match_cache(self):
+        return self._match_cache
+
+    def start_match_refresh(self, interval):
+        """Read the match list of the current league page every `interval` seconds in the background."""
+        self._match_cache.start_refresh(lambda: self._league, self._read_events, interval, self._lock,
+                                        version=lambda: PageCache.of(self._driver).page_version)
+
+    def stop_match_refresh(self):
+        self._match_cache.stop_refresh()
+
     def select_matches(self, **kwargs):
+        """Select the matches of the current league page. The page is read again only when its cached match
+        list is older than the 'match_cache_ttl' config.
+
+        :param kwargs: the filters `date`, `home`, `away` and `match_names`, and `limit` to stop after that many
+            matches, or `first` to return only the first match or None
+        """
+        return self._select_matches(self._league, **kwargs)
+
+    def iter_matches(self, **kwargs):
+        """The matches of `select_matches` as a generator, the page is read only as far as it is consumed."""
+        return self._iter_matches(self._league, **kwargs)
+
+    def select_records(self, **kwargs):
+        """The matches of `select_matches` as detached MatchRecords, without a MatchSelection per match."""
+        league = self._league
+        records = self._iter_matches(league, build=lambda details: MatchRecord.from_dict(details, league), **kwargs)
+        return list(islice(records, kwargs.get('limit', None)))
+
+    def rehydrate(self, record):
+        """The actionable MatchSelection of a MatchRecord, found on the page of its league.
+
+        :return: the MatchSelection, or None if the event is not on the page any more
+        """
+        if record.league is not None and record.league != self._league:
+            self.select_league(record.league)
+        for match in self.iter_matches(date=record.kickoff, home=record.home, away=record.away):
+            if match.record.key == record.key:
+                match.league = record.league
+                return match
+        logger.warning("[%s] is not found on the page." % (record,))
+        return None
+
+    def _select_matches(self, league, **kwargs):
+        matches = self._iter_matches(league, **kwargs)
+        if kwargs.get('first', False):
+            return next(matches, None)
+        result_list = list(islice(matches, kwargs.get('limit', None)))
+        logger.debug('For Date: [%s] Home: [%s] Away: [%s] - [%s] of match found.' % (kwargs.get('date', None), kwargs.get('home', None),
+                                                                                  kwargs.get('away', None), len(result_list)))
+        return result_list
+
+    def _iter_matches(self, league, build=None, **kwargs):
         assert self._driver is not None, "webdriver is not opened."
-        result_list = []
+        build = build or self._to_selection
         selected_date = kwargs.get('date', None)
         home = kwargs.get('home', None)
         away = kwargs.get('away', None)
-        name_matcher = kwargs.get('match_names', match_names)
-
-        all_matches = get_matches_with_dates(self._driver)
-        if selected_date is None and home is None and away is None:
-            matches = get_matches(all_matches)
-        elif selected_date is not None:
-            if home is not None or away is not None:
-                matches = self._select_matches_by_date_name(selected_date, home, away, all_matches, name_matcher)
-            else:
-                matches = self._select_matches_by_date(selected_date, all_matches)
+        name_matcher = kwargs.get('match_names', None)
+
+        scraped = self._scrape_events(league)
+        if home is None and away is None:
+            events = ( (curr_date, match) for curr_date, matches in self._filter_dates(scraped.all_matches, selected_date) for match in matches )
+        elif name_matcher is None:
+            # The name index of the scrape answers the name filters
+            events = ( (event.date, event.event) for event in self._name_index(scraped, selected_date).find(home=home, away=away) )
         else:
-            matches = self._select_matches_by_name(home, away, all_matches, name_matcher)
+            events = ( (event.date, event.event) for event in self._event_names(scraped.all_matches, scraped.names, selected_date)
+                       if (home is None or name_matcher(home, event.home)) and (away is None or name_matcher(away, event.away)) )
 
-        for match in matches:
-            result_list.append( BettingBot.MatchSelection(self,
-                                               home=match['home'],
-                                               away=match['away'],
-                                               match_date=match['time'],
-                                               html_content=match['match_element']) )
+        for curr_date, match in events:
+            details = scraped.extract(curr_date, match)
+            if len(details) > 0:
+                yield build(details)
 
-        logger.debug('For Date: [%s] Home: [%s] Away: [%s] - [%s] of match found.' % (selected_date, home, away, len(result_list)))
+    @staticmethod
+    def _filter_dates(all_matches, selected_date):
+        """The (date, [match]) groups of the selected date, decided on the dates before any match is read."""
+        if selected_date is None:
+            return all_matches
+        selected_date = convert_datetime(selected_date)
+        return [ (curr_date, matches) for curr_date, matches in all_matches if curr_date == selected_date ]
+
+    def _event_names(self, all_matches, names, selected_date):
+        for curr_date, matches in self._filter_dates(all_matches, selected_date):
+            for match in matches:
+                home, away = names(curr_date, match)
+                if home is not None:
+                    yield EventNames(home, away, curr_date, match)
+
+    def _name_index(self, scraped, selected_date):
+        """The MatchIndex of the matches of a date, or of all dates, built once per scrape."""
+        key = convert_datetime(selected_date) if selected_date is not None else None
+        index = scraped.indexes.get(key, None)
+        if index is None:
+            index = MatchIndex(self._event_names(scraped.all_matches, scraped.names, selected_date), aliases=self._aliases)
+            scraped.indexes[key] = index
+        return index
+
+    def resolve_fixtures(self, fixtures, **kwargs):
+        """Find many (home, away) fixtures in one scrape of the league page.
+
+        :param kwargs: `date` to restrict the matches to one day
+        :return: a MatchSelection, or None if not found, for every fixture in order
+        """
+        assert self._driver is not None, "webdriver is not opened."
+        scraped = self._scrape_events()
+        selections = []
+        for event in self._name_index(scraped, kwargs.get('date', None)).resolve(fixtures):
+            details = scraped.extract(event.date, event.event) if event is not None else {}
+            selections.append(self._to_selection(details) if len(details) > 0 else None)
+        return selections
+
+    def _to_selection(self, match):
+        return BettingBot.MatchSelection(self,
+                                         home=match['home'],
+                                         away=match['away'],
+                                         match_date=match['time'],
+                                         html_content=match['match_element'],
+                                         odds=match.get('odds', {}),
+                                         href=match.get('href', None))
+
+    def _scrape_events(self, league=None):
+        """:return: the ScrapedEvents of the page"""
+        with self._lock:
+            # The cached elements belong to one window and one load of its page
+            return self._match_cache.get(league or self._league, self._read_events, PageCache.of(self._driver).page_version)
+
+    def _read_events(self):
+        scrape_mode = self._get_config('scrape_mode')
+        if scrape_mode == 'snapshot':
+            # The snapshot already holds the parsed match details
+            all_matches = get_events_snapshot(self._driver)
+            extract = lambda curr_date, match: match
+            names = lambda curr_date, match: (match['home'], match['away'])
+        elif scrape_mode == 'lxml':
+            all_matches = PageParser.from_driver(self._driver, wait_xpath=CONTENT_BLOCK_XPATH).get_matches_with_dates()
+            extract = lambda curr_date, match: dict(match._asdict(), match_element=None)
+            names = lambda curr_date, match: (match.home, match.away)
+        else:
+            # Only the date bars are read here, the rows of a date when they are needed
+            all_matches = get_date_rows(self._driver)
+            extract = get_match
+            names = get_match_names
+        return ScrapedEvents(all_matches, extract, names, {})
+
+    def select_matches_in_leagues(self, leagues, concurrent=True, **kwargs):
+        """Scrape the matches of several leagues, every league in its own tab of this session.
+
+        :param concurrent: load every league tab before reading the first one. With False the tabs are opened
+            and read one after the other.
+        :param kwargs: the filters of `select_matches`
+        :return: the merged list of matches, every match is tagged with its league and tab. A league page which
+            fails within its 'league_scrape' policy is skipped, and left out of the next scans until its
+            circuit breaker resets.
+        """
+        assert self._driver is not None, "webdriver is not opened."
+        if self._tabs is None:
+            self._tabs = LeagueTabs(self._driver, direct=self._get_config('league_navigation') == 'url')
+
+        def scrape(league):
+            matches = self._select_matches(league, **kwargs)
+            for match in matches:
+                match.league = league
+                match.window = self._driver.current_window_handle
+            return matches
+
+        with self._lock:
+            results = self._tabs.scrape(leagues, scrape, concurrent=concurrent, policy=self.policy('league_scrape'),
+                                        timeout=self._get_config('league_timeout'))
+        result_list = [ match for league in leagues for match in results.get(league, []) ]
+        logger.info("[%s] matches found in leagues %s." % (len(result_list), list(results.keys())))
         return result_list
 
+    def stream_odds(self, interval=1.0, duration=None, callback=None):
+        """Stream the odds, state and event row changes of the current league page.
+
+        :param callback: called with every change event. Without a callback a generator of the events is returned.
+        """
+        assert self._driver is not None, "webdriver is not opened."
+        # The drains wait for the match refresh and the tab scans, which navigate the same driver
+        stream = OddsStream(self._driver, lock=self._lock)
+        if callback is None:
+            return stream.events(interval=interval, duration=duration)
+        stream.watch(callback, interval=interval, duration=duration)
+
+    def close_tabs(self):
+        if self._tabs is not None:
+            self._tabs.close()
+
+    def _switch_window(self, handle):
+        if handle is not None and self._driver.current_window_handle != handle:
+            switch_window(self._driver, handle)
+
     def place_bet(self, market_choice, match_info, odds, stake):
         assert self._driver is not None, "webdriver is not opened."
         assert self._sum_stakes + stake < self._get_config('max_sum_stake'), "Maximum sum of stakes reached. Change the config if you want to contine"
@@ -226,47 +551,160 @@ class BettingBot(IBot):
         assert bankroll_percent > self._get_config('min_bankroll_percent'), "The minimum percentage of the bankroll is reached. Change the config if you want to contine"
 
         try:
-            if self._get_config('mode') == 'live':
-                max_stake = self._calculated_bankroll * self._get_config('max_stake_percent')
-                stake = min(stake, max_stake)
-                # Calculate the min/max stake
-                stake = min(self._get_config('max_stake'), max(self._get_config('min_stake'), stake))
-                match_info.cancel_fnc = place_bet(self._driver, match_info, stake)
-            else:
-                match_info.cancel_fnc = place_bet(self._driver, match_info, stake)
-
-            logger.info('Bet placed %s with Stake: [%s] Odds: [%s]' % (str(match_info), stake, odds))
-            # Store the placed bets
-            self._placed_bets = self._placed_bets.append({
-                'time': match_info.date,
-                'home': match_info.home,
-                'away': match_info.away,
-                'stake': stake,
-                'odds': odds,
-                'choice': market_choice
-            }, ignore_index=True)
-            # Append the pending bets
-            self._pending_bets.append({
-                'market': market_choice,
-                'match': match_info,
-                'odds': odds,
-                'stake': stake
-            })
-            self._sum_stakes += stake
-            self._calculated_bankroll -= stake
+            stake = self._limit_stake(stake, self._calculated_bankroll)
+            if self._budget is not None:
+                # The limits shared with the other bots of the fleet
+                stake = self._budget.reserve(stake)
+                assert stake > 0, "The stake is refused by the budget of the fleet."
+            try:
+                match_info.set_cancel(market_choice, place_bet(self._driver, match_info, stake))
+            except Exception:
+                if self._budget is not None:
+                    self._budget.release(stake)
+                raise
+
+            self._record_bet(market_choice, match_info, odds, stake)
         except Exception as err:
             logger.error(err)
             raise
 
+    def place_bets(self, selections):
+        """Place several bets with one pass over the betslip.
+
+        Every selection is clicked first, then the betslip is read once, the cards are mapped to the matches by
+        their title and selection and all stakes are filled and checked together. The stake limits of the config
+        apply to every bet and to the batch: if any bet of the batch breaks a limit, nothing is placed. If the
+        batch fails, the cards of its clicked selections are removed from the betslip again.
+
+        :param selections: list of (match, market_choice, stake)
+        :return: the placed stakes, in the order of the selections
+        """
+        assert self._driver is not None, "webdriver is not opened."
+        if len(selections) == 0:
+            return []
+        windows = set(match.window for match, _, _ in selections)
+        assert len(windows) == 1, "The matches of a batch have to be in the same tab."
+        assert all(match.html is not None for match, _, _ in selections), READ_ONLY_MATCH
+
+        # Apply the limits as if the bets were placed one after the other
+        stakes = []
+        sum_stakes, bankroll = self._sum_stakes, self._calculated_bankroll
+        for match, market_choice, stake in selections:
+            assert sum_stakes + stake < self._get_config('max_sum_stake'), "Maximum sum of stakes reached. Change the config if you want to contine"
+            assert bankroll / self._starting_bankroll > self._get_config('min_bankroll_percent'), "The minimum percentage of the bankroll is reached. Change the config if you want to contine"
+            stake = self._limit_stake(stake, bankroll)
+            stakes.append(stake)
+            sum_stakes += stake
+            bankroll -= stake
+
+        reserved = []
+        clicked = []
+        try:
+            if self._budget is not None:
+                # The limits shared with the other bots of the fleet
+                for stake in stakes:
+                    granted = self._budget.reserve(stake)
+                    assert granted > 0, "The stake is refused by the budget of the fleet."
+                    reserved.append(granted)
+                stakes = list(reserved)
+            self._switch_window(windows.pop())
+            odds = []
+            for match, market_choice, _ in selections:
+                # Counted before the click, a failed check after it still leaves a card
+                clicked.append( (match, market_choice) )
+                odds.append(self.selected_market.select(market_choice, match))
+            cancel_fncs = place_bets(self._driver, [ (match, market_choice, stake) for (match, market_choice, _), stake in zip(selections, stakes) ])
+        except Exception as err:
+            logger.error(err)
+            for stake in reserved:
+                self._budget.release(stake)
+            if len(clicked) > 0:
+                try:
+                    remove_betslip_cards(self._driver, clicked)
+                except Exception as clear_err:
+                    logger.error(clear_err)
+            raise
+
+        for (match, market_choice, _), odd, stake, cancel_fnc in zip(selections, odds, stakes, cancel_fncs):
+            match.set_cancel(market_choice, cancel_fnc)
+            self._record_bet(market_choice.lower(), match, odd, stake)
+        return stakes
+
+    def allocate_stakes(self, candidates, method=None, kelly_fraction=None):
+        """Allocate the stakes of candidate bets together, within the stake limits of the config.
+
+        :param candidates: list of (match, market_choice, probability), the probability of the model
+        :return: numpy array of the stakes, 0 for the candidates not to bet on. The candidates without odds, e.g.
+            a closed selection, get no stake.
+        """
+        odds = [ match.odds.get(market_choice.lower(), None) for match, market_choice, _ in candidates ]
+        missing = [ str(match) for (match, _, _), odd in zip(candidates, odds) if odd is None ]
+        # The 'element' scrape mode does not read the odds, none of its matches can be staked
+        assert len(candidates) == 0 or len(missing) < len(candidates), "None of the candidates has odds, the 'element' scrape mode does not read them."
+        if len(missing) > 0:
+            logger.warning("[%s] candidates have no odds, they get no stake: %s" % (len(missing), missing))
+        odds = [ odd or 0.0 for odd in odds ]
+        probabilities = [ probability for _, _, probability in candidates ]
+        return allocate_stakes(odds, probabilities, self._calculated_bankroll, self._starting_bankroll,
+                               limits_from_config(self._config), sum_stakes=self._sum_stakes,
+                               method=method if method is not None else self._get_config('staking_method'),
+                               kelly_fraction=kelly_fraction if kelly_fraction is not None else self._get_config('kelly_fraction'))
+
+    def place_value_bets(self, candidates, **kwargs):
+        """Place the candidate bets which get a stake from `allocate_stakes`, one batch per tab.
+
+        :param kwargs: `method` and `kelly_fraction` of `allocate_stakes`
+        :return: list of the placed (match, market_choice, stake)
+        """
+        stakes = self.allocate_stakes(candidates, **kwargs)
+        batches = {}
+        for (match, market_choice, _), stake in zip(candidates, stakes):
+            if stake > 0.0:
+                batches.setdefault(match.window, []).append( (match, market_choice, float(stake)) )
+        placed = []
+        for selections in batches.values():
+            placed.extend( (match, market_choice, stake) for (match, market_choice, _), stake in zip(selections, self.place_bets(selections)) )
+        logger.info("[%s] of [%s] candidate bets placed." % (len(placed), len(candidates)))
+        return placed
+
+    def _limit_stake(self, stake, bankroll):
+        if self._get_config('mode') == 'live':
+            # The same limits as the ones of `allocate_stakes`
+            stake = limit_stake(stake, bankroll, limits_from_config(self._config))
+        return stake
+
+    def _record_bet(self, market_choice, match_info, odds, stake):
+        logger.info('Bet placed %s with Stake: [%s] Odds: [%s]' % (str(match_info), stake, odds))
+        # Store the placed bets
+        self._placed_bets.append(time=match_info.date,
+                                 home=match_info.home,
+                                 away=match_info.away,
+                                 stake=stake,
+                                 odds=odds,
+                                 choice=market_choice)
+        # Add to the pending bets
+        self._pending_bets.add(market_choice, match_info, odds, stake)
+        self._sum_stakes += stake
+        self._calculated_bankroll -= stake
+
+    def _remove_pending(self, market_choice, match_info):
+        """Remove a bet from the pending bets, its stake is given back to the budget of the fleet."""
+        entry = self._pending_bets.remove(market_choice, match_info)
+        if entry is not None and self._budget is not None:
+            self._budget.release(entry['stake'])
+        return entry
+
     def clear_bets(self):
         try:
-            for match_info in self._pending_bets:
+            for match_info in self._pending_bets.values():
                 match = match_info['match']
                 logger.debug("Clearing bet for: %s" % str(match))
                 match.clear()
-            self._pending_bets = []
         except Exception as err:
             logger.error(err)
+        # The bets whose card could not be removed, the betslip is force cleared below
+        for entry in self._pending_bets.values():
+            self._remove_pending(entry['market'], entry['match'])
         try:
             # Try to force clear all pending bets.
             logger.debug("Force clearing bets.")
@@ -287,18 +725,21 @@ class BettingBot(IBot):
 
         try:
             confirmed_bets = get_confirmed_bets(self._driver)
-            pending_bets = num_of_pending_bets(self._driver)
+            checksum = get_betslip_checksum(self._driver)
+            pending_bets = checksum.count
         except Exception as err:
             logger.error(err)
             raise
         else:
             # The number of placed bets has to be match exactly
-            assert confirmed_bets == pending_bets == calculated_peding_bets, "Bets are not placed correctly. There is a mismatch in the number of bets. [Confirmed: %s], [Pending: %s], [Calculated: %s]" % (confirmed_bets, pending_bets, calculated_peding_bets)
+            assert self._pending_bets.reconcile(checksum) and confirmed_bets == pending_bets == calculated_peding_bets, "Bets are not placed correctly. There is a mismatch in the number of bets. [Confirmed: %s], [Pending: %s], [Calculated: %s]" % (confirmed_bets, pending_bets, calculated_peding_bets)
             number_of_bets = pending_bets
             try:
                 mode = self._get_config('mode')
                 if mode == 'live':
                     confirm_bet(self._driver)
+                    # The confirmed bets are not pending any more, their stakes stay in the budget of the fleet
+                    self._pending_bets.clear()
                 else:
                     pass
                 logger.info('[%s] Bets are placed correctly.' % mode)
@@ -314,47 +755,5 @@ class BettingBot(IBot):
             self._calculated_bankroll = bankroll
         return number_of_bets
 
-    def _select_matches_by_date(self, selected_date, event_date_list):
-        selected_date = convert_datetime(selected_date)
-        for curr_date, matches in event_date_list:
-            if curr_date == selected_date:
-                return [ get_match(curr_date, match) for match in matches ]
-        return []
-
-    def _select_matches_by_name(self, home, away, event_date_list, matcher):
-        res_list = []
-        for curr_date, matches in event_date_list:
-            for match in matches:
-                details = get_match(curr_date, match)
-                if home is not None and away is not None:
-                    if matcher(home, details['home']) and matcher(away, details['away']):
-                        res_list.append(details)
-                elif home is not None:
-                    if matcher(home, details['home']):
-                        res_list.append(details)
-                else:
-                    if matcher(away, details['away']):
-                        res_list.append(details)
-        return res_list
-
-    def _select_matches_by_date_name(self, selected_date, home, away, event_date_list, matcher):
-        res_list = []
-        selected_date = convert_datetime(selected_date)
-        for curr_date, matches in event_date_list:
-            if curr_date == selected_date:
-                for match in matches:
-                    details = get_match(curr_date, match)
-                    if home is not None and away is not None:
-                        if matcher(home, details['home']) and matcher(away, details['away']):
-                            res_list.append(details)
-                    elif home is not None:
-                        if matcher(home, details['home']):
-                            res_list.append(details)
-                    else:
-                        if matcher(away, details['away']):
-                            res_list.append(details)
-            return res_list
-
-
     def _get_config(self, *args):
         return get_nested(self._config, *args)
\ No newline at end of file
@@ -0,0 +1,195 @@
+# Common Python library imports
+import multiprocessing as mp
+import queue
+import time
+import traceback
+from collections import namedtuple
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.core import get_firefox_driver
+from bots.utils import ObjectMaker, split
+from bots.pinnacle.betting import BettingBot
+from bots.pinnacle.records import MatchRecord
+
+LeagueResult = namedtuple('LeagueResult', ['worker', 'league', 'matches', 'bets', 'error'])
+WorkerDone = namedtuple('WorkerDone', ['worker', 'error'])
+
+
+class StakeBudget(object):
+    """Stake and bankroll limits shared by every worker of a fleet.
+
+    The counters live in shared memory of the coordinator process, so every bot of the fleet reserves its
+    stakes from the same budget. The limits are the same keys as in `BettingBot.default_config`, and as in
+    `BettingBot._limit_stake` the stakes are only clamped in 'live' mode.
+    """
+
+    def __init__(self, config=None, ctx=mp):
+        config = { **BettingBot.default_config, **(config or {}) }
+        self._live = config['mode'] == 'live'
+        self._min_stake = config['min_stake']
+        self._max_stake = config['max_stake']
+        self._max_sum_stake = config['max_sum_stake']
+        self._min_bankroll_percent = config['min_bankroll_percent']
+        self._max_stake_percent = config['max_stake_percent']
+        self._lock = ctx.Lock()
+        self._starting_bankroll = ctx.Value('d', 0.0, lock=False)
+        self._sum_stakes = ctx.Value('d', 0.0, lock=False)
+
+    def start(self, bankroll):
+        # The first bot which logs in sets the starting bankroll of the account
+        with self._lock:
+            if self._starting_bankroll.value <= 0.0:
+                self._starting_bankroll.value = bankroll
+
+    @property
+    def sum_stakes(self):
+        return self._sum_stakes.value
+
+    @property
+    def bankroll(self):
+        return self._starting_bankroll.value - self._sum_stakes.value
+
+    def reserve(self, stake):
+        """Reserve a stake from the budget.
+
+        :return: the granted stake, clamped to the stake limits, or 0.0 if the bet is not allowed
+        """
+        with self._lock:
+            starting = self._starting_bankroll.value
+            bankroll = starting - self._sum_stakes.value
+            if starting <= 0.0 or bankroll / starting <= self._min_bankroll_percent:
+                logger.warning("The minimum percentage of the bankroll of the fleet is reached.")
+                return 0.0
+            if self._live:
+                stake = min(stake, bankroll * self._max_stake_percent)
+                stake = min(self._max_stake, max(self._min_stake, stake))
+            # The clamped stake is the one added to the sum
+            if self._sum_stakes.value + stake >= self._max_sum_stake:
+                logger.warning("Maximum sum of stakes of the fleet is reached.")
+                return 0.0
+            self._sum_stakes.value += stake
+            return stake
+
+    def release(self, stake):
+        """Give back the stake of a bet which is removed before it is placed, only the placed bets keep theirs."""
+        with self._lock:
+            self._sum_stakes.value = max(0.0, self._sum_stakes.value - stake)
+
+
+def to_record(match, league=None):
+    return MatchRecord.from_selection(match, league)
+
+def run_worker(worker, leagues, user, password, driver_kwargs, bot_kwargs, strategy, budget, results, stop_event,
+               interval, cycles):
+    """Entry point of a worker process. It owns one browser and scrapes its shard of the leagues."""
+    bot = None
+    try:
+        webdriver = ObjectMaker(**get_firefox_driver(**driver_kwargs))
+        bot = BettingBot.login(user=user, password=password, webdriver=webdriver, budget=budget,
+                               league=leagues[0], **bot_kwargs)
+        cycle = 0
+        while not stop_event.is_set() and (cycles is None or cycle < cycles):
+            started = time.monotonic()
+            for league in leagues:
+                if stop_event.is_set():
+                    break
+                try:
+                    bot.select_league(league)
+                    matches = bot.select_matches()
+                    bets = []
+                    if strategy is not None:
+                        for match, market_choice, stake in strategy(league, matches):
+                            match.bet_on(market_choice, stake)
+                            bets.append( (to_record(match, league), market_choice, stake) )
+                        bot.confirm_bets()
+                    results.put(LeagueResult(worker, league, [ to_record(match, league) for match in matches ], bets, None))
+                except Exception as err:
+                    logger.error(err)
+                    results.put(LeagueResult(worker, league, [], [], traceback.format_exc()))
+            cycle += 1
+            stop_event.wait(max(0.0, interval - (time.monotonic() - started)))
+    except Exception as err:
+        logger.error(err)
+        results.put(WorkerDone(worker, traceback.format_exc()))
+    else:
+        results.put(WorkerDone(worker, None))
+    finally:
+        if bot is not None:
+            bot.close()
+
+
+class Fleet(object):
+    """Runs `num_workers` processes, each with its own BettingBot, over a sharded list of leagues.
+
+    The workers stream picklable `LeagueResult` items back to the coordinator, and every bet is reserved from
+    one `StakeBudget` so `max_sum_stake` and the bankroll limits hold for the fleet as a whole.
+
+    :param strategy: optional picklable callable ``strategy(league, matches)`` which returns
+        ``(match, market_choice, stake)`` tuples to bet on. Without a strategy the fleet only scrapes.
+    """
+
+    def __init__(self, leagues, num_workers, user, password, driver_kwargs=None, config=None, strategy=None,
+                 interval=60.0, cycles=1, start_method=None):
+        self._ctx = mp.get_context(start_method)
+        self._shards = [ shard for shard in split(list(leagues), num_workers) if len(shard) > 0 ]
+        self._user = user
+        self._password = password
+        self._driver_kwargs = { 'headless': True, **(driver_kwargs or {}) }
+        self._config = config or {}
+        self._strategy = strategy
+        self._interval = interval
+        self._cycles = cycles
+        self._budget = StakeBudget(self._config, ctx=self._ctx)
+        self._results = self._ctx.Queue()
+        self._stop_event = self._ctx.Event()
+        self._workers = []
+
+    @property
+    def shards(self):
+        return list(self._shards)
+
+    @property
+    def budget(self):
+        return self._budget
+
+    def start(self):
+        for worker, leagues in enumerate(self._shards):
+            process = self._ctx.Process(target=run_worker, name="bot-worker-%s" % worker,
+                                        args=(worker, leagues, self._user, self._password, self._driver_kwargs,
+                                              {'config': self._config}, self._strategy, self._budget,
+                                              self._results, self._stop_event, self._interval, self._cycles))
+            process.daemon = True
+            process.start()
+            self._workers.append(process)
+            logger.info("Worker [%s] started with leagues %s." % (worker, leagues))
+
+    def results(self, poll_interval=1.0):
+        """Yield the results of the workers until every worker is finished."""
+        if len(self._workers) == 0:
+            self.start()
+        running = len(self._workers)
+        while running > 0:
+            try:
+                item = self._results.get(timeout=poll_interval)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self._workers):
+                    logger.error("Every worker exited without reporting.")
+                    break
+                continue
+            if isinstance(item, WorkerDone):
+                running -= 1
+                if item.error is not None:
+                    logger.error("Worker [%s] failed: %s" % (item.worker, item.error))
+                continue
+            yield item
+
+    def stop(self, timeout=30):
+        self._stop_event.set()
+        for process in self._workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
@@ -4,6 +4,7 @@ import re
 import difflib
 import traceback
 from datetime import datetime, date, time
+from urllib.parse import urljoin
 
 # Pip package imports
 from loguru import logger
@@ -13,7 +14,27 @@ from selenium.webdriver.support import expected_conditions as EC
 
 # Internal package imports
 from bots.core import get_firefox_driver, IBot
-from bots.utils import ObjectMaker, Factory
+from bots.utils import ObjectMaker, Factory, safe_cast
+from bots.pinnacle.pagecache import PageCache, MarketButton, LeagueAnchor
+from bots.waits import Waiter, element_present, element_absent, attribute_equals, element_count_changed, dom_stable, all_of, url_starts_with
+
+# The waits of a driver without a waiter of its own go through this waiter, the waiters of the bots are copies
+# of it, see `use_waiter`
+waiter = Waiter()
+
+
+def use_waiter(driver, timeouts=None, **kwargs):
+    """Give a driver its own copy of the shared waiter, updated with the `timeouts` and the waiter options.
+
+    :return: the new waiter, it keeps the latencies of the waits on this driver only
+    """
+    driver._waiter = waiter.copy(timeouts, **kwargs)
+    return driver._waiter
+
+def waiter_of(driver):
+    """:return: the waiter of a driver, or of the driver of an element"""
+    driver = getattr(driver, 'parent', driver)
+    return getattr(driver, '_waiter', waiter)
 
 
 class Struct(object):
@@ -39,6 +60,13 @@ class MarketChoice(object):
     def bet_on(self, market_choice, match, stake, **kwargs):
         pass
 
+    def select(self, market_choice, match):
+        """Click the selection on the page without placing the bet.
+
+        :return: the odds of the selection
+        """
+        pass
+
 
 class MainMarket(MarketChoice):
 
@@ -63,20 +91,24 @@ class MainMarket(MarketChoice):
             except Exception as err:
                 logger.error(err)
 
-        selected.click()
-        stime.sleep(1)
         assert selected is not None, "Selection [%s] cannot be made." % choice
+        selected.click()
+        waiter_of(match.html).wait('select_selection', match.html, attribute_equals(selected, 'data-selected', 'true'), required=False)
         assert selected.get_attribute('data-selected').strip() == 'true', "Selection [%s] was not recognized" % choice
         return float(selected.text.strip())
 
 
-    def bet_on(self, market_choice, match, stake, **kwargs):
+    def select(self, market_choice, match):
         market_choice = market_choice.lower()
         assert market_choice in MainMarket.market_choices, "[%s] invalid market choice for [%s]" % (market_choice, self.name)
         if market_choice in ['home', 'draw', 'away']:
-            odds = self._home_draw_away(market_choice, match)
+            return self._home_draw_away(market_choice, match)
         else:
             assert False, "[%s] not implemented" % market_choice
+
+    def bet_on(self, market_choice, match, stake, **kwargs):
+        market_choice = market_choice.lower()
+        odds = self.select(market_choice, match)
         # Placing the bet
         return self._parent.place_bet(market_choice, match, odds, stake)
 
@@ -124,12 +156,40 @@ leagues = {
     "ligue-1": "sports_nav_favourite_France - Ligue 1",
 }
 
+# The paths of the league pages, relative to the site of the session
+league_paths = {
+    "premier-league": "/en/soccer/england-premier-league/matchups",
+    "laliga": "/en/soccer/spain-la-liga/matchups",
+    "bundesliga": "/en/soccer/germany-bundesliga/matchups",
+    "serie-a": "/en/soccer/italy-serie-a/matchups",
+    "ligue-1": "/en/soccer/france-ligue-1/matchups",
+}
+
+MARKETS_XPATH = '//div[contains(@class, "contentBlock")]//ul//li//button'
+# The parent of the date bars and the event rows, and its children
+EVENTS_CONTAINER_XPATH = '//div[@class="contentBlock"]/div[@class="_2n6st"]/div'
+CONTENT_BLOCK_XPATH = EVENTS_CONTAINER_XPATH + '/div'
+GAME_INFO_XPATH = './/a[@data-test-id="Event.GameInfo"]/div'
+BANKROLL_XPATH = '//span[@data-test-id="QuickCashier-BankRoll"]'
+BETSLIP_CARD_XPATH = '//div[@data-test-id="Betslip"]//div[@data-test-id="Betslip-Card"]'
+SELECTION_DETAILS_XPATH = './/div[@data-test-id="Betslip-SelectionDetails"]'
+SELECTION_TITLE_XPATH = './/div[@data-test-id="SelectionDetails-Title"]'
+STAKE_INPUT_XPATH = './/div[@data-test-id="Betslip-StakeWinInput"]//div[@data-label="Stake"]/input'
+CONFIRM_BUTTON_XPATH = '//button[@data-test-id="Betslip-ConfirmBetButton"]'
+BETSLIP_XPATH = '//div[@data-test-id="Betslip"]'
+LOGIN_BUTTON_XPATH = '//button[contains(text(), "Log in")]'
+
 def wait_for_element(driver, xpath, timeout=10):
     WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.XPATH, xpath)))
 
+def load_page(driver, url):
+    """Load a URL in the current window, the cached elements of the window belong to the previous page."""
+    PageCache.of(driver).invalidate()
+    driver.get(url)
+
 def open_page(driver, url):
     try:
-        driver.get(url)
+        load_page(driver, url)
         WebDriverWait(driver, 40).until(EC.presence_of_element_located((By.ID, 'fc_push_frame')))
     except Exception as err:
         tb = traceback.format_exc()
@@ -144,10 +204,11 @@ def login(driver, user, password):
         user_input.send_keys(user)
         password_input.clear()
         password_input.send_keys(password)
-        button = driver.find_element_by_xpath('//button[contains(text(), "Log in")]')
+        button = driver.find_element_by_xpath(LOGIN_BUTTON_XPATH)
         button.click()
-        stime.sleep(7)
-        WebDriverWait(driver, 40).until(EC.presence_of_element_located((By.ID, 'fc_push_frame')))
+        # Logged in when the login button is gone and the page is loaded again
+        waiter_of(driver).wait('login', driver, all_of(element_absent(LOGIN_BUTTON_XPATH), element_present('//*[@id="fc_push_frame"]')))
+        PageCache.of(driver).invalidate()
     except Exception as err:
         tb = traceback.format_exc()
         logger.error(tb)
@@ -155,35 +216,44 @@ def login(driver, user, password):
 
 def is_logged_in(driver):
     try:
-        button = driver.find_element_by_xpath('//button[contains(text(), "Log in")]')
+        button = driver.find_element_by_xpath(LOGIN_BUTTON_XPATH)
         return False
     except Exception:
         return True
 
-def open_main_page(driver):
-    main_page = "https://www.pinnacle.com/en/"
-    open_page(driver, main_page)
+MAIN_PAGE_URL = "https://www.pinnacle.com/en/"
+
+def open_main_page(driver, main_page=None):
+    open_page(driver, main_page or MAIN_PAGE_URL)
+
+def parse_bankroll(bankroll):
+    bankroll = re.findall(r"(\d+.\d+)", bankroll)[0]
+    return float(bankroll)
 
 def get_bankroll(driver):
-    bankroll_xpath = '//span[@data-test-id="QuickCashier-BankRoll"]'
-    wait_for_element(driver, bankroll_xpath)
+    wait_for_element(driver, BANKROLL_XPATH)
     try:
-        bankroll = driver.find_element_by_xpath(bankroll_xpath).text
-        bankroll = re.findall(r"(\d+.\d+)", bankroll)[0]
-        bankroll = float(bankroll)
+        bankroll = parse_bankroll(driver.find_element_by_xpath(BANKROLL_XPATH).text)
     except Exception as err:
         tb = traceback.format_exc()
         logger.error(tb)
         return 0.0
     return bankroll
 
+def get_market_buttons(driver):
+    """:return: the MarketButtons of the page, resolved once per navigation"""
+    def resolve():
+        wait_for_element(driver, MARKETS_XPATH)
+        return [ MarketButton(market, market.text.strip(), market.get_attribute('data-selected') == 'true')
+                 for market in driver.find_elements_by_xpath(MARKETS_XPATH) ]
+    return PageCache.of(driver).get('markets', resolve)
+
 def get_markets(driver, parent):
-    markets_xpath = '//div[contains(@class, "contentBlock")]//ul//li//button'
-    wait_for_element(driver, markets_xpath)
-    markets = driver.find_elements_by_xpath(markets_xpath)
+    return build_markets([ market.label for market in get_market_buttons(driver) ], parent)
+
+def build_markets(market_names, parent):
     enum_dict = {}
-    for market in markets:
-        market_text = market.text.strip()
+    for market_text in market_names:
         if market_text in markets_lookup:
             market_slug = markets_lookup[market_text]
             try:
@@ -198,69 +268,122 @@ def get_markets(driver, parent):
     return Struct(**enum_dict)
 
 def get_selected_market(driver, markets_dict):
-    markets_xpath = '//div[contains(@class, "contentBlock")]//ul//li//button'
-    wait_for_element(driver, markets_xpath)
     try:
-        markets = driver.find_elements_by_xpath(markets_xpath)
+        markets = get_market_buttons(driver)
     except Exception as err:
         tb = traceback.format_exc()
         logger.error(tb)
         raise
     else:
         for market in markets:
-            try:
-                selected = market.get_attribute('data-selected')
-            except Exception as err:
-                # If attribute not present, thats ok. Only the selected market has it
-                continue
-            else:
-                if selected == 'true':
-                    market_text = market.text.strip()
-                    slug = markets_lookup[market_text]
-                    return markets_dict.get(slug)
+            # Only the selected market has the attribute
+            if market.selected:
+                slug = markets_lookup[market.label]
+                return markets_dict.get(slug)
 
 def select_market(driver, selection):
     assert isinstance(selection, MarketChoice)
-    market_xpath = '//div[contains(@class, "contentBlock")]//ul//li//button'
-    wait_for_element(driver, market_xpath)
-    markets = driver.find_elements_by_xpath(market_xpath)
+    markets = get_market_buttons(driver)
     for market in markets:
-        if market.text.strip() == selection.name:
-            market.click()
-            stime.sleep(1)
+        if market.label == selection.name:
+            market.element.click()
+            selected_xpath = '%s[@data-selected="true"][normalize-space(.)="%s"]' % (MARKETS_XPATH, selection.name)
+            waits = waiter_of(driver)
+            waits.wait('select_market', driver, all_of(element_present(selected_xpath), dom_stable(CONTENT_BLOCK_XPATH, waits.quiet_period)))
+            # The buttons stay, only their selected state changes
+            PageCache.of(driver).set('markets', [ each._replace(selected=each.label == selection.name) for each in markets ])
             return True
     return False
 
-def open_league(driver, league):
+FAVORITES_XPATH = '//div[@data-test-id="LeftSidebar-Favourites"]'
+
+def get_league_anchor(driver, league):
+    """:return: the LeagueAnchor of a league in the favourites sidebar, resolved once per navigation"""
+    def resolve():
+        wait_for_element(driver, FAVORITES_XPATH)
+        anchor = driver.find_element_by_xpath('%s//a[@data-gtm-id="%s"]' % (FAVORITES_XPATH, leagues[league]))
+        return LeagueAnchor(anchor, anchor.get_attribute('href'))
+    return PageCache.of(driver).get(('league_anchor', league), resolve)
+
+def get_league_url(driver, league, direct=False):
+    """:param direct: build the URL from `league_paths` instead of reading the sidebar link"""
+    if direct:
+        return urljoin(driver.current_url, league_paths[league])
+    return get_league_anchor(driver, league).href
+
+def switch_window(driver, handle):
+    PageCache.of(driver).switch_window(handle)
+
+OPEN_TAB_SCRIPT = "window.open(arguments[0], '_blank');"
+
+def open_league_tab(driver, league, direct=False):
+    """Open the league page in a new window of the same session.
+
+    :return: the window handle of the new tab. The current window is not changed.
+    """
+    try:
+        url = get_league_url(driver, league, direct=direct)
+        handles = set(driver.window_handles)
+        driver.execute_script(OPEN_TAB_SCRIPT, url)
+        new_handles = [ handle for handle in driver.window_handles if handle not in handles ]
+        assert len(new_handles) == 1, "The tab of league [%s] was not opened." % league
+        return new_handles[0]
+    except Exception as err:
+        tb = traceback.format_exc()
+        logger.error(tb)
+        raise
+
+def open_league(driver, league, direct=False):
+    """Open the page of a league.
+
+    :param direct: load the league page by its URL instead of clicking the sidebar link. The page is not
+        loaded again if it is already open.
+    """
+    if direct:
+        return open_league_page(driver, league)
+    try:
+        selected_favorites = get_league_anchor(driver, league)
+        href = selected_favorites.href
+        selected_favorites.element.click()
+        # The click navigates to the league page
+        PageCache.of(driver).invalidate()
+        waits = waiter_of(driver)
+        condition = dom_stable(CONTENT_BLOCK_XPATH, waits.quiet_period)
+        if href:
+            condition = all_of(url_starts_with(href), condition)
+        waits.wait('open_league', driver, condition)
+    except Exception as err:
+        tb = traceback.format_exc()
+        logger.error(tb)
+        raise
+
+def open_league_page(driver, league):
     try:
-        favorites_xpath = '//div[@data-test-id="LeftSidebar-Favourites"]'
-        wait_for_element(driver, favorites_xpath)
-        selected_favorites = driver.find_element_by_xpath('//div[@data-test-id="LeftSidebar-Favourites"]//a[@data-gtm-id="%s"]' % leagues[league])
-        selected_favorites.click()
-        stime.sleep(4)
+        current_url = driver.current_url
+        url = urljoin(current_url, league_paths[league])
+        if current_url == url:
+            logger.debug("League [%s] is already open." % league)
+            return
+        load_page(driver, url)
+        waits = waiter_of(driver)
+        waits.wait('open_league', driver, all_of(element_present(CONTENT_BLOCK_XPATH), dom_stable(CONTENT_BLOCK_XPATH, waits.quiet_period)))
     except Exception as err:
         tb = traceback.format_exc()
         logger.error(tb)
         raise
-    #open_page(driver, leagues[league])
 
 def get_matches_with_dates(driver):
     def convert_date(content):
-        from datetime import date,datetime
         try:
-            date_txt = content.text.strip()
-            if date_txt.lower() == "today":
-                return date.today()
-            return datetime.strptime(date_txt, "%a, %b %d, %Y").date()
+            return convert_date_text(content.text)
         except Exception:
             return None
 
     date_evenets_list = []
     actual_date_list = []
     actual_date = None
-    content_block_xpath = '//div[@class="contentBlock"]/div[@class="_2n6st"]/div/div'
-    wait_for_element(driver, content_block_xpath)
-    content_block = driver.find_elements_by_xpath(content_block_xpath)
+    wait_for_element(driver, CONTENT_BLOCK_XPATH)
+    content_block = driver.find_elements_by_xpath(CONTENT_BLOCK_XPATH)
     for content in content_block:
         attrib = content.get_attribute('data-test-id')
         if "Events.DateBar" == attrib:
@@ -272,11 +395,148 @@ def get_matches_with_dates(driver):
             actual_date_list.append(content)
     return date_evenets_list
 
+DATE_BAR_XPATH = CONTENT_BLOCK_XPATH + '[@data-test-id="Events.DateBar"]'
+EVENT_ROW_XPATH = CONTENT_BLOCK_XPATH + '[@data-test-id="Event.Row"]'
+
+class DateRows(object):
+    """The event rows under the `position`-th date bar, found with one query on the first use."""
+
+    def __init__(self, driver, position):
+        self._driver = driver
+        self._position = position
+        self._rows = None
+
+    def _find(self):
+        if self._rows is None:
+            self._rows = self._driver.find_elements_by_xpath('%s[count(preceding::div[@data-test-id="Events.DateBar"])=%d]' % (EVENT_ROW_XPATH, self._position))
+        return self._rows
+
+    def __iter__(self):
+        return iter(self._find())
+
+    def __len__(self):
+        return len(self._find())
+
+def get_date_rows(driver):
+    """The same (date, rows) list as `get_matches_with_dates`, but only the date bars are read. The rows of a
+    date are looked up when they are iterated, so the rows of the other dates are never touched.
+    """
+    wait_for_element(driver, CONTENT_BLOCK_XPATH)
+    date_rows = []
+    for position, date_bar in enumerate(driver.find_elements_by_xpath(DATE_BAR_XPATH), 1):
+        try:
+            curr_date = convert_date_text(date_bar.text)
+        except Exception:
+            curr_date = None
+        date_rows.append( (curr_date, DateRows(driver, position)) )
+    return date_rows
+
+def get_match_names(curr_date, match):
+    """:return: (home, away) of an event row, with fewer calls than `get_match`. (None, None) if not found."""
+    try:
+        elements = match.find_elements_by_xpath(GAME_INFO_XPATH)
+        return elements[0].text.strip(), elements[1].text.strip()
+    except Exception as err:
+        logger.error(err)
+        return None, None
+
+# Walks the event list of the content block inside the browser, so the whole league page is read with one
+# WebDriver round-trip instead of several calls per row.
+EVENTS_SNAPSHOT_SCRIPT = """
+var content = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var result = [];
+var group = null;
+for (var i = 0; i < content.snapshotLength; i++) {
+    var node = content.snapshotItem(i);
+    var attrib = node.getAttribute('data-test-id');
+    if (attrib === 'Events.DateBar') {
+        group = {'date': node.innerText.trim(), 'events': []};
+        result.push(group);
+    } else if (attrib === 'Event.Row' && group !== null) {
+        var link = node.querySelector('a[data-test-id="Event.GameInfo"]');
+        var info = node.querySelectorAll('a[data-test-id="Event.GameInfo"] > div');
+        var blocks = node.querySelectorAll(':scope > div');
+        var selections = [];
+        if (blocks.length > 1) {
+            var anchors = blocks[1].querySelectorAll(':scope > a');
+            for (var j = 0; j < anchors.length; j++) {
+                selections.push({
+                    'designation': (anchors[j].getAttribute('data-test-designation') || '').trim(),
+                    'state': anchors[j].getAttribute('data-test-state'),
+                    'selected': anchors[j].getAttribute('data-selected'),
+                    'odds': anchors[j].innerText.trim()
+                });
+            }
+        }
+        group.events.push({
+            'element': node,
+            'href': link ? link.getAttribute('href') : null,
+            'info': Array.prototype.map.call(info, function (e) { return e.innerText.trim(); }),
+            'selections': selections
+        });
+    }
+}
+return result;
+"""
+
+def convert_date_text(date_txt):
+    try:
+        date_txt = date_txt.strip()
+        if date_txt.lower() == "today":
+            return date.today()
+        return datetime.strptime(date_txt, "%a, %b %d, %Y").date()
+    except Exception:
+        return None
+
+def get_events_snapshot(driver):
+    """Read every date bar and event row of the current league page with a single script execution.
+
+    :return: list of (date, [match]) tuples. Every match is a dict with the same keys as `get_match` returns,
+        extended with the 'href' of the event and the 'odds', 'states' and 'selected' dicts keyed by the
+        selection designation (home, draw, away).
+    """
+    wait_for_element(driver, CONTENT_BLOCK_XPATH)
+    snapshot = driver.execute_script(EVENTS_SNAPSHOT_SCRIPT, CONTENT_BLOCK_XPATH)
+
+    date_events_list = []
+    for group in snapshot or []:
+        curr_date = convert_date_text(group['date'])
+        matches = []
+        for event in group['events']:
+            res = get_snapshot_match(curr_date, event)
+            if len(res.keys()) > 0:
+                matches.append(res)
+        date_events_list.append( (curr_date, matches) )
+    return date_events_list
+
+def get_snapshot_match(curr_date, event):
+    try:
+        info = event['info']
+        i_time = info[2].split(':')
+        odds, states, selected = {}, {}, {}
+        for selection in event['selections']:
+            designation = selection['designation']
+            odds[designation] = safe_cast(selection['odds'], float)
+            states[designation] = selection['state']
+            selected[designation] = selection['selected'] == 'true'
+        return {
+            'home': info[0],
+            'away': info[1],
+            'time': datetime.combine(curr_date, time(int(i_time[0]), int(i_time[1]))),
+            'match_element': event['element'],
+            'href': event['href'],
+            'odds': odds,
+            'states': states,
+            'selected': selected,
+        }
+    except Exception as err:
+        logger.error(err)
+        return {}
+
 def get_match(curr_date, match):
     try:
-        match_xpath  = './/a[@data-test-id="Event.GameInfo"]/div'
-        wait_for_element(match, match_xpath)
-        elements = match.find_elements_by_xpath(match_xpath)
+        wait_for_element(match, GAME_INFO_XPATH)
+        elements = match.find_elements_by_xpath(GAME_INFO_XPATH)
         s_time = elements[2].text.strip()
         i_time = s_time.split(':')
         return {
@@ -310,28 +570,24 @@ def get_matches(date_events_list):
 
 def num_of_pending_bets(driver):
     try:
-        betslip = driver.find_element_by_xpath('//div[@data-test-id="Betslip"]')
-        cards = betslip.find_elements_by_xpath('//div[@data-test-id="Betslip-Card"]')
+        betslip = driver.find_element_by_xpath(BETSLIP_XPATH)
+        cards = betslip.find_elements_by_xpath(BETSLIP_CARD_XPATH)
         return len(cards)
     except Exception:
         return 0
 
 def place_bet(driver, match_info, stake):
-    card_xpath = '//div[@data-test-id="Betslip"]//div[@data-test-id="Betslip-Card"]'
-    wait_for_element(driver, card_xpath)
-    cards = driver.find_elements_by_xpath(card_xpath)
+    wait_for_element(driver, BETSLIP_CARD_XPATH)
+    cards = driver.find_elements_by_xpath(BETSLIP_CARD_XPATH)
 
     selected_details = None
     selected_stake_input = None
     for card in cards:
         alt_name = "%s - %s" % (match_info.home, match_info.away)
-        details_xpath = './/div[@data-test-id="Betslip-SelectionDetails"]'
-        title_xpath = './/div[@data-test-id="SelectionDetails-Title"]'
-
-        wait_for_element(card, details_xpath)
-        details = card.find_element_by_xpath(details_xpath)
-        wait_for_element(card, title_xpath)
-        title = details.find_element_by_xpath(title_xpath).get_attribute('alt').strip()
+        wait_for_element(card, SELECTION_DETAILS_XPATH)
+        details = card.find_element_by_xpath(SELECTION_DETAILS_XPATH)
+        wait_for_element(card, SELECTION_TITLE_XPATH)
+        title = details.find_element_by_xpath(SELECTION_TITLE_XPATH).get_attribute('alt').strip()
         if title == alt_name:
             selected_details = details
             selected_stake_input = card.find_element_by_xpath('.//div[@data-test-id="Betslip-StakeWinInput"]')
@@ -341,29 +597,128 @@ def place_bet(driver, match_info, stake):
     stake_input = selected_stake_input.find_element_by_xpath('//div[@data-label="Stake"]/input')
     stake_input.clear()
     stake_input.send_keys(str(stake))
-    # Wait 1000 ms before checking
-    stime.sleep(1)
+    waiter_of(driver).wait('stake_input', driver, attribute_equals(stake_input, 'data-empty', 'false'), required=False)
     assert stake_input.get_attribute('data-empty') == 'false', "Input stake is not recognized"
 
     x_button = selected_details.find_element_by_xpath('./button')
     return lambda : x_button.click()
 
+# Reads every betslip card with one script execution
+BETSLIP_CARDS_SCRIPT = """
+var cards = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+var result = [];
+for (var i = 0; i < cards.snapshotLength; i++) {
+    var card = cards.snapshotItem(i);
+    var details = card.querySelector('div[data-test-id="Betslip-SelectionDetails"]');
+    var title = details ? details.querySelector('div[data-test-id="SelectionDetails-Title"]') : null;
+    var selection = details ? details.querySelector(':scope > span') : null;
+    result.push({
+        'title': title ? (title.getAttribute('alt') || '').trim() : null,
+        'selection': selection ? selection.innerText.trim() : null,
+        'stake_input': card.querySelector('div[data-test-id="Betslip-StakeWinInput"] div[data-label="Stake"] > input'),
+        'button': details ? details.querySelector(':scope > button') : null
+    });
+}
+return result;
+"""
+
+ALL_STAKES_SET_SCRIPT = """
+return arguments[0].every(function (input) { return input.getAttribute('data-empty') === 'false'; });
+"""
+
+def get_betslip_cards(driver):
+    """:return: list of dicts with the 'title', the 'selection' text, the 'stake_input' and the remove 'button' of
+        every card
+    """
+    wait_for_element(driver, BETSLIP_CARD_XPATH)
+    return driver.execute_script(BETSLIP_CARDS_SCRIPT, BETSLIP_CARD_XPATH) or []
+
+def card_designation(card, match_info):
+    """:return: the designation (home, draw, away) of a betslip card, from its selection text which is the
+        designation or the picked team, or None if it is not recognized
+    """
+    selection = (card.get('selection', None) or '').strip().lower()
+    if selection in MainMarket.market_choices:
+        return selection
+    if selection == match_info.home.lower():
+        return 'home'
+    if selection == match_info.away.lower():
+        return 'away'
+    return None
+
+def index_betslip_cards(cards, match_infos):
+    """:return: dict of (title, designation) -> [card], a card with an unknown designation is keyed by None"""
+    teams = { "%s - %s" % (match_info.home, match_info.away): match_info for match_info in match_infos }
+    cards_by_key = {}
+    for card in cards:
+        match_info = teams.get(card['title'], None)
+        designation = card_designation(card, match_info) if match_info is not None else None
+        cards_by_key.setdefault((card['title'], designation), []).append(card)
+    return cards_by_key
+
+def pop_betslip_card(cards_by_key, match_info, market_choice):
+    """:return: the card of a selection from `index_betslip_cards`, or None"""
+    alt_name = "%s - %s" % (match_info.home, match_info.away)
+    for key in ( (alt_name, market_choice.lower()), (alt_name, None) ):
+        cards = cards_by_key.get(key, [])
+        if len(cards) > 0:
+            return cards.pop(0)
+    return None
+
+def place_bets(driver, bets):
+    """Fill the stakes of several selected bets with one read of the betslip.
+
+    The cards are mapped to the bets by their title and their selection, so several markets of one match get
+    their own stakes.
+
+    :param bets: list of (match_info, market_choice, stake), the selections of the matches are already clicked
+    :return: the cancel function of every bet, in the order of `bets`
+    """
+    cards_by_key = index_betslip_cards(get_betslip_cards(driver), [ match_info for match_info, _, _ in bets ])
+
+    selected = []
+    for match_info, market_choice, stake in bets:
+        card = pop_betslip_card(cards_by_key, match_info, market_choice)
+        assert card is not None and card['stake_input'] is not None, "Betting choice [%s - %s: %s] is not selected properly" % (match_info.home, match_info.away, market_choice)
+        card['stake_input'].clear()
+        card['stake_input'].send_keys(str(stake))
+        selected.append(card)
+
+    stake_inputs = [ card['stake_input'] for card in selected ]
+    recognized = waiter_of(driver).wait('stake_input', driver, lambda d: d.execute_script(ALL_STAKES_SET_SCRIPT, stake_inputs), required=False)
+    assert recognized, "Input stakes are not recognized"
+    return [ (lambda button=card['button']: button.click()) for card in selected ]
+
+def remove_betslip_cards(driver, selections):
+    """Remove the cards of the clicked selections from the betslip, the other cards are kept.
+
+    :param selections: list of (match_info, market_choice)
+    """
+    if len(driver.find_elements_by_xpath('//div[@data-test-id="betslip-empty"]')) > 0:
+        return
+    cards_by_key = index_betslip_cards(get_betslip_cards(driver), [ match_info for match_info, _ in selections ])
+    for match_info, market_choice in selections:
+        card = pop_betslip_card(cards_by_key, match_info, market_choice)
+        if card is None or card['button'] is None:
+            logger.warning("No betslip card of [%s - %s: %s] to remove." % (match_info.home, match_info.away, market_choice))
+            continue
+        try:
+            card['button'].click()
+        except Exception as err:
+            logger.error(err)
+
 def force_clear_bets(driver):
-    try:
-        empty = driver.find_element_by_xpath('//div[@data-test-id="betslip-empty"]')
-    except Exception:
+    if len(driver.find_elements_by_xpath('//div[@data-test-id="betslip-empty"]')) > 0:
         # Bet slip is empty
-        pass
+        return
     else:
         # Bet slip is not empty
-        card_xpath = '//div[@data-test-id="Betslip"]//div[@data-test-id="Betslip-Card"]'
-        wait_for_element(driver, card_xpath)
-        cards = driver.find_elements_by_xpath(card_xpath)
+        wait_for_element(driver, BETSLIP_CARD_XPATH)
+        cards = driver.find_elements_by_xpath(BETSLIP_CARD_XPATH)
         for card in cards:
             try:
-                details_xpath = './/div[@data-test-id="Betslip-SelectionDetails"]'
-                wait_for_element(driver, details_xpath)
-                details = card.find_element_by_xpath(details_xpath)
+                wait_for_element(driver, SELECTION_DETAILS_XPATH)
+                details = card.find_element_by_xpath(SELECTION_DETAILS_XPATH)
                 x_button = details.find_element_by_xpath('./button')
                 x_button.click()
             except Exception as err:
@@ -371,20 +726,17 @@ def force_clear_bets(driver):
 
 def get_placed_stakes(driver):
     stakes = 0
-    try:
-        empty = driver.find_element_by_xpath('//div[@data-test-id="betslip-empty"]')
-    except Exception:
+    if len(driver.find_elements_by_xpath('//div[@data-test-id="betslip-empty"]')) > 0:
+        # Bet slip is empty
         return stakes
     else:
         # Bet slip is not empty
-        card_xpath = '//div[@data-test-id="Betslip"]//div[@data-test-id="Betslip-Card"]'
-        wait_for_element(driver, card_xpath)
-        cards = driver.find_elements_by_xpath(card_xpath)
+        wait_for_element(driver, BETSLIP_CARD_XPATH)
+        cards = driver.find_elements_by_xpath(BETSLIP_CARD_XPATH)
         for card in cards:
             try:
-                stake_input_xpath = './/div[@data-test-id="Betslip-StakeWinInput"]//div[@data-label="Stake"]/input'
-                wait_for_element(driver, stake_input_xpath)
-                stake_input = card.find_element_by_xpath(stake_input_xpath)
+                wait_for_element(driver, STAKE_INPUT_XPATH)
+                stake_input = card.find_element_by_xpath(STAKE_INPUT_XPATH)
                 value = stake_input.get_attribute('value')
                 stakes += float(value)
             except Exception as err:
@@ -392,12 +744,12 @@ def get_placed_stakes(driver):
         return stakes
 
 def get_confirmed_bets(driver):
-    # Sleep 1.5 sec before checking the button info
-    stime.sleep(1.5)
+    # The button text follows the betslip with a delay
+    waits = waiter_of(driver)
+    waits.wait('betslip_settle', driver, dom_stable(BETSLIP_XPATH, waits.quiet_period), required=False)
     try:
-        button_xpath = '//button[@data-test-id="Betslip-ConfirmBetButton"]'
-        wait_for_element(driver, button_xpath)
-        button = driver.find_element_by_xpath(button_xpath)
+        wait_for_element(driver, CONFIRM_BUTTON_XPATH)
+        button = driver.find_element_by_xpath(CONFIRM_BUTTON_XPATH)
         confirmed_bets = button.text.strip()
         confirmed_bets = re.findall(r"(\d+)", confirmed_bets)
         return int(confirmed_bets[0])
@@ -408,13 +760,14 @@ def get_confirmed_bets(driver):
 
 def confirm_bet(driver):
     try:
-        button_xpath = '//button[@data-test-id="Betslip-ConfirmBetButton"]'
-        wait_for_element(driver, button_xpath)
-        button = driver.find_element_by_xpath(button_xpath)
+        wait_for_element(driver, CONFIRM_BUTTON_XPATH)
+        button = driver.find_element_by_xpath(CONFIRM_BUTTON_XPATH)
+        num_of_cards = len(driver.find_elements_by_xpath(BETSLIP_CARD_XPATH))
         button.click()
     except Exception as err:
         tb = traceback.format_exc()
         logger.error(tb)
         raise
     else:
-        stime.sleep(10)
+        # The accepted bets are removed from the betslip
+        waiter_of(driver).wait('confirm_bet', driver, element_count_changed(BETSLIP_CARD_XPATH, num_of_cards), required=False)
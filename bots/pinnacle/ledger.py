@@ -0,0 +1,114 @@
+# Common Python library imports
+import sqlite3
+from datetime import datetime, date
+
+# Pip package imports
+from loguru import logger
+import pandas as pd
+
+
+class BetLedger(object):
+    """Append-optimised ledger of the placed bets.
+
+    New bets are collected in a columnar buffer and flushed to SQLite in batches, so appending a bet does not copy
+    the earlier ones. The DataFrame is only built when it is read, and cached until the next append. The table is
+    indexed by time, team and market choice for the queries of long sessions.
+
+    :param path: the SQLite database file. Without a path the ledger is kept in memory.
+    :param flush_every: number of buffered bets which triggers a flush
+    """
+
+    columns = ['time', 'home', 'away', 'stake', 'odds', 'choice']
+
+    def __init__(self, path=None, flush_every=100):
+        self._path = path or ':memory:'
+        self._flush_every = flush_every
+        self._buffer = { column: [] for column in BetLedger.columns }
+        self._frame = None
+        self._conn = sqlite3.connect(self._path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bets (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                time TEXT, home TEXT, away TEXT, stake REAL, odds REAL, choice TEXT
+            );
+            CREATE INDEX IF NOT EXISTS bets_time ON bets (time);
+            CREATE INDEX IF NOT EXISTS bets_home ON bets (home);
+            CREATE INDEX IF NOT EXISTS bets_away ON bets (away);
+            CREATE INDEX IF NOT EXISTS bets_choice ON bets (choice);
+        """)
+        self._stored = self._conn.execute("SELECT COUNT(*) FROM bets").fetchone()[0]
+
+    def __len__(self):
+        return self._stored + len(self._buffer['time'])
+
+    def append(self, time, home, away, stake, odds, choice):
+        self._buffer['time'].append(self._to_text(time))
+        self._buffer['home'].append(home)
+        self._buffer['away'].append(away)
+        self._buffer['stake'].append(float(stake))
+        self._buffer['odds'].append(float(odds))
+        self._buffer['choice'].append(choice)
+        self._frame = None
+        if len(self._buffer['time']) >= self._flush_every:
+            self.flush()
+
+    def flush(self):
+        num_of_rows = len(self._buffer['time'])
+        if num_of_rows == 0:
+            return
+        rows = zip(*[ self._buffer[column] for column in BetLedger.columns ])
+        with self._conn:
+            self._conn.executemany("INSERT INTO bets (time, home, away, stake, odds, choice) VALUES (?, ?, ?, ?, ?, ?)", rows)
+        self._stored += num_of_rows
+        self._buffer = { column: [] for column in BetLedger.columns }
+        logger.debug("[%s] bets flushed to the ledger." % num_of_rows)
+
+    def to_frame(self):
+        if self._frame is None:
+            self._frame = self._read("SELECT time, home, away, stake, odds, choice FROM bets ORDER BY id", [])
+        return self._frame
+
+    def query(self, start=None, end=None, team=None, home=None, away=None, choice=None):
+        """Select bets by the indexed columns. `start` and `end` are inclusive, `team` matches home or away."""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("time >= ?")
+            params.append(self._to_text(start))
+        if end is not None:
+            conditions.append("time <= ?")
+            params.append(self._to_text(end, end_of_day=True))
+        if team is not None:
+            conditions.append("(home = ? OR away = ?)")
+            params.extend([team, team])
+        if home is not None:
+            conditions.append("home = ?")
+            params.append(home)
+        if away is not None:
+            conditions.append("away = ?")
+            params.append(away)
+        if choice is not None:
+            conditions.append("choice = ?")
+            params.append(choice)
+        where = (" WHERE " + " AND ".join(conditions)) if len(conditions) > 0 else ""
+        return self._read("SELECT time, home, away, stake, odds, choice FROM bets%s ORDER BY id" % where, params)
+
+    def close(self):
+        try:
+            self.flush()
+            self._conn.close()
+        except Exception as err:
+            logger.error(err)
+
+    def _read(self, sql, params):
+        self.flush()
+        frame = pd.read_sql_query(sql, self._conn, params=params)
+        frame['time'] = pd.to_datetime(frame['time'])
+        return frame
+
+    @staticmethod
+    def _to_text(value, end_of_day=False):
+        if isinstance(value, datetime):
+            return value.isoformat(sep=' ')
+        if isinstance(value, date):
+            return value.isoformat() + (" 23:59:59.999999" if end_of_day else "")
+        return str(value)
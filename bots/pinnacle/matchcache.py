@@ -0,0 +1,97 @@
+# Common Python library imports
+import threading
+import time
+import traceback
+
+# Pip package imports
+from loguru import logger
+
+
+class MatchCache(object):
+    """The scraped match lists of the leagues, fresh for `ttl` seconds after they are read.
+
+    The strategies of one cycle query the same league pages several times, the queries within the TTL are
+    answered from memory. With `start_refresh` a daemon thread reads the league of the current page again
+    every `interval` seconds, so the queries find a fresh list without waiting for the browser.
+
+    A match list holds the elements of the page it was read from, so every list is stored with the `version`
+    of that page, e.g. `PageCache.page_version`, and a query from another window or page load reads it again.
+
+    :param ttl: seconds a match list is used, 0 disables the cache
+    """
+
+    def __init__(self, ttl=5.0, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._lists = {}
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+        self._stop = threading.Event()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return self.ttl is not None and self.ttl > 0
+
+    def get(self, league, load, version=None):
+        """:return: the match list of a league, `load()` reads it if it is missing, expired or of another version"""
+        if not self.enabled or league is None:
+            return load()
+        with self._lock:
+            entry = self._lists.get(league, None)
+            if entry is not None and self._clock() - entry[0] < self.ttl and entry[1] == version:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        return self.put(league, load(), version)
+
+    def put(self, league, matches, version=None):
+        if self.enabled and league is not None:
+            with self._lock:
+                self._lists[league] = (self._clock(), version, matches)
+        return matches
+
+    def age(self, league):
+        """:return: seconds since the match list of a league was read, None if it is not cached"""
+        with self._lock:
+            entry = self._lists.get(league, None)
+        return self._clock() - entry[0] if entry is not None else None
+
+    def invalidate(self, league=None):
+        with self._lock:
+            if league is None:
+                self._lists.clear()
+            else:
+                self._lists.pop(league, None)
+
+    def start_refresh(self, current_league, load, interval, lock, version=lambda: None):
+        """Read the league of the current page every `interval` seconds in a daemon thread.
+
+        :param current_league: returns the league of the current page, or None
+        :param load: reads the match list of the current page
+        :param lock: held while reading, the same lock guards the navigation of the bot
+        :param version: returns the version of the current page
+        """
+        self.stop_refresh()
+        self._stop.clear()
+
+        def refresh():
+            while not self._stop.wait(interval):
+                try:
+                    with lock:
+                        league = current_league()
+                        if league is not None:
+                            self.put(league, load(), version())
+                except Exception as err:
+                    tb = traceback.format_exc()
+                    logger.error(tb)
+
+        self._refresh_thread = threading.Thread(target=refresh, name='bots-match-refresh', daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self):
+        if self._refresh_thread is not None:
+            self._stop.set()
+            self._refresh_thread.join()
+            self._refresh_thread = None
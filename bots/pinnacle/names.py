@@ -0,0 +1,174 @@
+# Common Python library imports
+import difflib
+import json
+import os
+import re
+import unicodedata
+from collections import defaultdict
+
+# Pip package imports
+from loguru import logger
+
+
+# Tokens which do not tell teams apart
+STOP_TOKENS = {'fc', 'cf', 'sc', 'ac', 'afc', 'cd', 'sv', 'club', 'calcio'}
+
+default_aliases = {
+    'atl madrid': 'atletico madrid',
+    'man utd': 'manchester united',
+    'man united': 'manchester united',
+    'man city': 'manchester city',
+    'gladbach': 'borussia monchengladbach',
+    'psg': 'paris saint germain',
+    'inter': 'inter milan',
+}
+
+def normalize(name):
+    name = unicodedata.normalize('NFKD', name).encode('ascii', 'ignore').decode('ascii').lower()
+    tokens = [ token for token in re.split(r"[^a-z0-9]+", name) if len(token) > 0 ]
+    return " ".join(token for token in tokens if token not in STOP_TOKENS) or " ".join(tokens)
+
+def ngrams(text, n=3):
+    padded = " %s " % text
+    return { padded[i:i + n] for i in range(max(1, len(padded) - n + 1)) }
+
+
+class AliasTable(object):
+    """Maps the alternative names of a team to one canonical name, e.g. "Atl. Madrid" to "Atletico Madrid".
+
+    The table is stored as JSON of normalized names, when a path is given.
+    """
+
+    def __init__(self, path=None, aliases=None):
+        self._path = path
+        self._aliases = dict(default_aliases)
+        if path is not None and os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self._aliases.update(json.load(f))
+        for alias, name in (aliases or {}).items():
+            self.add(alias, name)
+
+    def add(self, alias, name):
+        self._aliases[normalize(alias)] = normalize(name)
+
+    def canonical(self, normalized_name):
+        return self._aliases.get(normalized_name, normalized_name)
+
+    def save(self, path=None):
+        path = path or self._path
+        assert path is not None, "No path is given for the alias table."
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self._aliases, f, indent=2, sort_keys=True)
+
+
+class TeamNameIndex(object):
+    """Character n-gram index of team names.
+
+    A lookup only scores the names which share n-grams with the query, and runs `SequenceMatcher` on the few
+    best of them, so its cost does not grow with the number of indexed names.
+
+    :param cutoff: the minimum similarity ratio of a match, the same as the cutoff of `match_names`
+    """
+
+    def __init__(self, aliases=None, n=3, cutoff=0.7, max_candidates=5):
+        self._aliases = aliases if aliases is not None else AliasTable()
+        self._n = n
+        self._cutoff = cutoff
+        self._max_candidates = max_candidates
+        self._names = []
+        self._ids = {}
+        self._grams = []
+        self._postings = defaultdict(list)
+
+    def __len__(self):
+        return len(self._names)
+
+    def key(self, name):
+        return self._aliases.canonical(normalize(name))
+
+    def add(self, name):
+        """Add a name to the index and return its id. Names with the same canonical form share an id."""
+        key = self.key(name)
+        if key in self._ids:
+            return self._ids[key]
+        name_id = len(self._names)
+        grams = ngrams(key, self._n)
+        self._names.append(key)
+        self._grams.append(len(grams))
+        self._ids[key] = name_id
+        for gram in grams:
+            self._postings[gram].append(name_id)
+        return name_id
+
+    def lookup(self, name):
+        """:return: list of (name id, score) of the matching names, the best first"""
+        key = self.key(name)
+        if key in self._ids:
+            return [ (self._ids[key], 1.0) ]
+        grams = ngrams(key, self._n)
+        counts = defaultdict(int)
+        for gram in grams:
+            for name_id in self._postings.get(gram, ()):
+                counts[name_id] += 1
+        # Dice coefficient of the n-gram sets selects the candidates
+        candidates = sorted(counts.keys(), key=lambda i: -2.0 * counts[i] / (len(grams) + self._grams[i]))
+        result = []
+        for name_id in candidates[:self._max_candidates]:
+            score = difflib.SequenceMatcher(None, key, self._names[name_id]).ratio()
+            if score >= self._cutoff:
+                result.append( (name_id, score) )
+        return sorted(result, key=lambda item: -item[1])
+
+
+def _get(item, field):
+    return item[field] if isinstance(item, dict) else getattr(item, field)
+
+class MatchIndex(object):
+    """Index of a match list by the home and away team names.
+
+    Built once per scrape, it answers many home/away queries against the same matches. The matches can be the
+    match dicts of the interface or any object with `home` and `away` attributes.
+    """
+
+    def __init__(self, matches, aliases=None, **kwargs):
+        self._matches = list(matches)
+        self._names = TeamNameIndex(aliases=aliases, **kwargs)
+        self._home = defaultdict(list)
+        self._away = defaultdict(list)
+        for position, match in enumerate(self._matches):
+            self._home[self._names.add(_get(match, 'home'))].append(position)
+            self._away[self._names.add(_get(match, 'away'))].append(position)
+
+    def __len__(self):
+        return len(self._matches)
+
+    def _positions(self, name, side):
+        positions = set()
+        for name_id, _ in self._names.lookup(name):
+            positions.update(side.get(name_id, ()))
+        return positions
+
+    def find(self, home=None, away=None):
+        """:return: the matches whose home and/or away team matches the names, in the original order"""
+        positions = None
+        if home is not None:
+            positions = self._positions(home, self._home)
+        if away is not None:
+            away_positions = self._positions(away, self._away)
+            positions = away_positions if positions is None else positions & away_positions
+        if positions is None:
+            return list(self._matches)
+        return [ self._matches[position] for position in sorted(positions) ]
+
+    def resolve(self, fixtures):
+        """Resolve many (home, away) fixtures in one call.
+
+        :return: the matching match of every fixture, or None if it is not found or ambiguous
+        """
+        result = []
+        for home, away in fixtures:
+            found = self.find(home=home, away=away)
+            if len(found) != 1:
+                logger.debug("Fixture [%s - %s] resolved to [%s] matches." % (home, away, len(found)))
+            result.append(found[0] if len(found) == 1 else None)
+        return result
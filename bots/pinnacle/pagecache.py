@@ -0,0 +1,94 @@
+# Common Python library imports
+from collections import namedtuple
+
+# Pip package imports
+from loguru import logger
+from selenium.common.exceptions import WebDriverException
+
+# A market tab button of the league page
+MarketButton = namedtuple('MarketButton', ['element', 'label', 'selected'])
+# A favourite league link of the sidebar
+LeagueAnchor = namedtuple('LeagueAnchor', ['element', 'href'])
+
+
+class PageCache(object):
+    """Elements and their metadata resolved on the current page of every window of a driver.
+
+    An entry is resolved once per navigation: the navigation helpers of `bots.pinnacle.interface` call
+    `invalidate`, which drops the entries of the current window, and a cached entry is checked with one call on its first element before it is reused, so a page
+    which swapped its DOM is resolved again. The window switches of the package go through `switch_window`,
+    which keeps the entries of every window apart.
+
+    Every invalidation of a window counts as a new page load, `page_version` tells whether the elements read
+    from a window are still the ones of its page.
+    """
+
+    def __init__(self, driver):
+        self._driver = driver
+        self._window = driver.current_window_handle
+        self._scopes = {}
+        self._loads = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def of(driver):
+        """The cache of a driver, created on the first use."""
+        cache = getattr(driver, '_page_cache', None)
+        if cache is None:
+            cache = driver._page_cache = PageCache(driver)
+        return cache
+
+    @property
+    def _entries(self):
+        return self._scopes.setdefault(self._window, {})
+
+    def switch_window(self, handle):
+        """Switch the driver to a window, the entries of the other windows are kept."""
+        self._driver.switch_to.window(handle)
+        self._window = handle
+
+    @property
+    def page_version(self):
+        """(window handle, page load number) of the current page"""
+        return self._driver.current_window_handle, self._loads.get(self._window, 0)
+
+    def invalidate(self, key=None):
+        """Forget one entry, or every entry of the current window after a navigation."""
+        if key is None:
+            self._entries.clear()
+            self._loads[self._window] = self._loads.get(self._window, 0) + 1
+        else:
+            self._entries.pop(key, None)
+
+    def close_window(self, handle):
+        self._scopes.pop(handle, None)
+        self._loads.pop(handle, None)
+
+    def get(self, key, resolve):
+        """:return: the cached value of `key`, or the value of `resolve()` if missing or detached.
+
+        The value is a list of, or a single, namedtuple whose first field is the element checked.
+        """
+        entries = self._entries
+        value = entries.get(key, None)
+        if value and self._attached(value):
+            self.hits += 1
+            return value
+        self.misses += 1
+        value = entries[key] = resolve()
+        return value
+
+    def set(self, key, value):
+        self._entries[key] = value
+
+    @staticmethod
+    def _attached(value):
+        element = value[0].element if isinstance(value, list) else value.element
+        try:
+            # Any call on a detached element raises
+            element.is_enabled()
+        except WebDriverException as err:
+            logger.debug("Cached element is detached: %s" % err.__class__.__name__)
+            return False
+        return True
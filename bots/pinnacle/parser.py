@@ -0,0 +1,133 @@
+# Common Python library imports
+import re
+import traceback
+from collections import namedtuple
+from datetime import datetime, time
+
+# Pip package imports
+from loguru import logger
+import lxml.html
+
+# Internal package imports
+from bots.utils import safe_cast
+from bots.pinnacle.interface import (
+    MARKETS_XPATH, CONTENT_BLOCK_XPATH, GAME_INFO_XPATH, BANKROLL_XPATH, BETSLIP_CARD_XPATH,
+    SELECTION_TITLE_XPATH, STAKE_INPUT_XPATH, CONFIRM_BUTTON_XPATH, markets_lookup, convert_date_text,
+    parse_bankroll, wait_for_element
+)
+
+ParsedMatch = namedtuple('ParsedMatch', ['home', 'away', 'time', 'href', 'odds', 'states', 'selected'])
+MarketRecord = namedtuple('MarketRecord', ['name', 'slug', 'selected'])
+BetslipCard = namedtuple('BetslipCard', ['title', 'stake', 'empty'])
+BetslipRecord = namedtuple('BetslipRecord', ['cards', 'confirmed_bets'])
+
+
+def element_text(element):
+    # Selenium returns the rendered text, which has the whitespaces collapsed
+    return " ".join(element.text_content().split())
+
+
+class PageParser(object):
+    """Offline parser of a Pinnacle page.
+
+    The page source is fetched once and every query runs on the lxml tree with the same XPaths as the
+    functions in `bots.pinnacle.interface`, so no WebDriver round-trip is made after construction.
+    """
+
+    def __init__(self, page_source):
+        self._tree = lxml.html.fromstring(page_source)
+
+    @classmethod
+    def from_driver(cls, driver, wait_xpath=None):
+        if wait_xpath is not None:
+            wait_for_element(driver, wait_xpath)
+        return cls(driver.page_source)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    @property
+    def tree(self):
+        return self._tree
+
+    def get_markets(self):
+        markets = []
+        for market in self._tree.xpath(MARKETS_XPATH):
+            market_text = element_text(market)
+            markets.append(MarketRecord(name=market_text,
+                                        slug=markets_lookup.get(market_text),
+                                        selected=market.get('data-selected') == 'true'))
+        return markets
+
+    def get_selected_market(self):
+        for market in self.get_markets():
+            if market.selected:
+                return market
+        return None
+
+    def get_matches_with_dates(self):
+        date_events_list = []
+        actual_date_list = None
+        for content in self._tree.xpath(CONTENT_BLOCK_XPATH):
+            attrib = content.get('data-test-id')
+            if "Events.DateBar" == attrib:
+                actual_date = convert_date_text(element_text(content))
+                actual_date_list = []
+                date_events_list.append( (actual_date, actual_date_list) )
+            elif "Event.Row" == attrib and actual_date_list is not None:
+                match = self.get_match(actual_date, content)
+                if match is not None:
+                    actual_date_list.append(match)
+        return date_events_list
+
+    def get_match(self, curr_date, match):
+        try:
+            elements = match.xpath(GAME_INFO_XPATH)
+            i_time = element_text(elements[2]).split(':')
+            odds, states, selected = {}, {}, {}
+            blocks = match.xpath('./div')
+            if len(blocks) > 1:
+                for selection in blocks[1].xpath('./a'):
+                    designation = (selection.get('data-test-designation') or '').strip()
+                    odds[designation] = safe_cast(element_text(selection), float)
+                    states[designation] = selection.get('data-test-state')
+                    selected[designation] = selection.get('data-selected') == 'true'
+            link = match.xpath('.//a[@data-test-id="Event.GameInfo"]')
+            return ParsedMatch(home=element_text(elements[0]),
+                              away=element_text(elements[1]),
+                              time=datetime.combine(curr_date, time(int(i_time[0]), int(i_time[1]))),
+                              href=link[0].get('href') if len(link) > 0 else None,
+                              odds=odds,
+                              states=states,
+                              selected=selected)
+        except Exception as err:
+            logger.error(err)
+            return None
+
+    def get_bankroll(self):
+        try:
+            return parse_bankroll(element_text(self._tree.xpath(BANKROLL_XPATH)[0]))
+        except Exception as err:
+            tb = traceback.format_exc()
+            logger.error(tb)
+            return 0.0
+
+    def get_betslip(self):
+        cards = []
+        for card in self._tree.xpath(BETSLIP_CARD_XPATH):
+            title = card.xpath(SELECTION_TITLE_XPATH)
+            stake_input = card.xpath(STAKE_INPUT_XPATH)
+            stake = safe_cast(stake_input[0].get('value'), float) if len(stake_input) > 0 else None
+            cards.append(BetslipCard(title=title[0].get('alt', '').strip() if len(title) > 0 else None,
+                                     stake=stake,
+                                     empty=len(stake_input) == 0 or stake_input[0].get('data-empty') != 'false'))
+        confirmed_bets = None
+        button = self._tree.xpath(CONFIRM_BUTTON_XPATH)
+        if len(button) > 0:
+            confirmed_bets = safe_cast(next(iter(re.findall(r"(\d+)", element_text(button[0]))), None), int)
+        return BetslipRecord(cards=cards, confirmed_bets=confirmed_bets)
+
+    def num_of_pending_bets(self):
+        return len(self._tree.xpath(BETSLIP_CARD_XPATH))
@@ -0,0 +1,220 @@
+# Common Python library imports
+import os
+import time
+from array import array
+from glob import glob
+
+# Pip package imports
+from loguru import logger
+import numpy as np
+
+# Internal package imports
+from bots.pinnacle.interface import MainMarket
+
+# Fixed-width record of one odds observation, 20 bytes
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('league', '<u2'),
+    ('match', '<u4'),
+    ('market', 'u1'),
+    ('selection', 'u1'),
+    ('odds', '<f4'),
+])
+
+MARKETS = ['main_market']
+SELECTIONS = MainMarket.market_choices
+
+
+def match_key(home, away, kickoff):
+    """The string which identifies a match in the recorder."""
+    return "%s|%s|%s" % (home, away, kickoff.isoformat() if kickoff is not None else "")
+
+
+class Dictionary(object):
+    """Append-only string dictionary, one string per line. The id of a string is its line number."""
+
+    def __init__(self, path):
+        self._path = path
+        self._ids = {}
+        self._values = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._ids[line.rstrip('\n')] = len(self._values)
+                    self._values.append(line.rstrip('\n'))
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __len__(self):
+        return len(self._values)
+
+    def encode(self, value, add=True):
+        value_id = self._ids.get(value)
+        if value_id is None and add:
+            assert '\n' not in value, "Dictionary values cannot contain new lines."
+            value_id = len(self._values)
+            self._ids[value] = value_id
+            self._values.append(value)
+            self._file.write(value + '\n')
+            self._file.flush()
+        return value_id
+
+    def decode(self, value_id):
+        return self._values[value_id]
+
+    def close(self):
+        self._file.close()
+
+
+class OddsRecorder(object):
+    """Odds time-series stored in fixed-width, memory-mapped segment files.
+
+    Every segment is a preallocated file of `segment_size` records, and appending writes straight into the
+    mapped memory. The number of records of every segment is saved in 'counts.txt' after every append, so the
+    records already written to the mapped files are not lost if the process dies before `flush`. The league and
+    match strings are dictionary encoded. `segments` returns views of the mapped files without copying;
+    `history` copies the rows of a match, read through an in-memory index of the match -> segment -> offsets,
+    built when the recorder is opened and kept up to date by the appends.
+    """
+
+    def __init__(self, directory, segment_size=1 << 20):
+        self._directory = directory
+        self._segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._leagues = Dictionary(os.path.join(directory, 'leagues.txt'))
+        self._matches = Dictionary(os.path.join(directory, 'matches.txt'))
+        self._segments = []
+        self._counts = []
+        # match id -> {segment number: array of offsets}
+        self._index = {}
+        paths = sorted(glob(os.path.join(directory, 'segment-*.bin')))
+        counts = self._read_counts()
+        assert len(counts) == len(paths), "The record counts of the segments in [%s] are missing." % directory
+        for path, count in zip(paths, counts):
+            # The existing segments keep their size, only the new ones are `segment_size` long
+            self._segments.append(np.memmap(path, dtype=RECORD_DTYPE, mode='r+'))
+            self._counts.append(count)
+            self._index_records(len(self._segments) - 1, 0, count)
+        if len(self._segments) == 0:
+            self._add_segment()
+
+    @property
+    def _counts_path(self):
+        return os.path.join(self._directory, 'counts.txt')
+
+    def _read_counts(self):
+        if not os.path.exists(self._counts_path):
+            return []
+        with open(self._counts_path, 'r') as f:
+            return [ int(line) for line in f if len(line.strip()) > 0 ]
+
+    def _write_counts(self):
+        tmp_path = self._counts_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(''.join('%d\n' % count for count in self._counts))
+        os.replace(tmp_path, self._counts_path)
+
+    def _index_records(self, segment_no, start, stop):
+        """Add the records [start, stop) of a segment to the match index."""
+        if stop <= start:
+            return
+        match_ids = np.asarray(self._segments[segment_no]['match'][start:stop])
+        order = np.argsort(match_ids, kind='stable')
+        sorted_ids = match_ids[order]
+        bounds = np.flatnonzero(np.diff(sorted_ids)) + 1
+        offsets = (order + start).astype(np.uint32)
+        for ids, group in zip(np.split(sorted_ids, bounds), np.split(offsets, bounds)):
+            segment_offsets = self._index.setdefault(int(ids[0]), {})
+            segment_offsets.setdefault(segment_no, array('I')).frombytes(group.tobytes())
+
+    def __len__(self):
+        return sum(self._counts)
+
+    def _add_segment(self):
+        path = os.path.join(self._directory, 'segment-%05d.bin' % len(self._segments))
+        self._segments.append(np.memmap(path, dtype=RECORD_DTYPE, mode='w+', shape=(self._segment_size,)))
+        self._counts.append(0)
+        self._write_counts()
+        logger.debug("Odds segment [%s] created." % path)
+
+    def record(self, league, match, market, selection, odds, timestamp=None):
+        self.record_many(league, [match], [market], [selection], [odds], timestamp=timestamp)
+
+    def record_many(self, league, matches, markets, selections, odds, timestamp=None):
+        """Append the observations of one league. `matches`, `markets`, `selections` and `odds` are parallel."""
+        num_of_records = len(odds)
+        # A new league gets the next id, which has to fit the league field of the records
+        assert self._leagues.encode(league, add=False) is not None or len(self._leagues) <= np.iinfo(RECORD_DTYPE['league']).max, \
+            "Too many leagues for the league field of the records."
+        league_id = self._leagues.encode(league)
+        records = np.empty(num_of_records, dtype=RECORD_DTYPE)
+        records['timestamp'] = timestamp if timestamp is not None else time.time()
+        records['league'] = league_id
+        records['match'] = [ self._matches.encode(match) for match in matches ]
+        records['market'] = [ MARKETS.index(market) for market in markets ]
+        records['selection'] = [ SELECTIONS.index(selection) for selection in selections ]
+        records['odds'] = odds
+        written = 0
+        while written < num_of_records:
+            count = self._counts[-1]
+            if count == len(self._segments[-1]):
+                self._add_segment()
+                count = 0
+            chunk = min(num_of_records - written, len(self._segments[-1]) - count)
+            self._segments[-1][count:count + chunk] = records[written:written + chunk]
+            self._counts[-1] = count + chunk
+            self._index_records(len(self._segments) - 1, count, count + chunk)
+            written += chunk
+        # The counts are written after the records they count
+        self._write_counts()
+
+    def record_matches(self, league, matches, timestamp=None, market='main_market'):
+        """Record the odds of scraped matches, anything with `home`, `away`, `date` and an `odds` dict."""
+        keys, designations, odds = [], [], []
+        for match in matches:
+            key = match_key(match.home, match.away, match.date)
+            for designation, value in match.odds.items():
+                if designation in SELECTIONS and value is not None:
+                    keys.append(key)
+                    designations.append(designation)
+                    odds.append(value)
+        if len(odds) > 0:
+            self.record_many(league, keys, [market] * len(odds), designations, odds, timestamp=timestamp)
+        return len(odds)
+
+    def flush(self):
+        for segment in self._segments:
+            segment.flush()
+        # The counts are written after the records they count
+        self._write_counts()
+
+    def close(self):
+        self.flush()
+        self._leagues.close()
+        self._matches.close()
+
+    def segments(self):
+        """:return: the used part of every segment, views of the mapped files"""
+        return [ segment[:count] for segment, count in zip(self._segments, self._counts) ]
+
+    def history(self, match, selection=None):
+        """:return: a copy of the records of one match in time order, or an empty array if the match is unknown.
+
+        The rows of a match are spread over its segments, so they are gathered into a new array; `segments` reads
+        the records without copying.
+        """
+        match_id = self._matches.encode(match, add=False)
+        if match_id is None or match_id not in self._index:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        parts = []
+        for segment_no, offsets in self._index[match_id].items():
+            rows = self._segments[segment_no][np.frombuffer(offsets, dtype=np.uint32)]
+            if selection is not None:
+                rows = rows[rows['selection'] == SELECTIONS.index(selection)]
+            parts.append(rows)
+        return np.concatenate(parts) if len(parts) > 0 else np.empty(0, dtype=RECORD_DTYPE)
+
+    def league_of(self, record):
+        return self._leagues.decode(int(record['league']))
+
+    def match_of(self, record):
+        return self._matches.decode(int(record['match']))
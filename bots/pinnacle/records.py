@@ -0,0 +1,73 @@
+# The designations of the main market, the order of the odds of a record
+DESIGNATIONS = ('home', 'draw', 'away')
+
+
+def event_key(href=None, matchup_id=None, home=None, away=None, kickoff=None):
+    """A key of an event which stays the same between scrapes: the matchup id of the API or of the event link,
+    otherwise the teams and the kickoff.
+    """
+    if matchup_id is not None:
+        return str(matchup_id)
+    if href:
+        return href.rstrip('/').rsplit('/', 1)[-1]
+    return "%s|%s|%s" % (home, away, kickoff.isoformat() if kickoff is not None else '')
+
+
+class MatchRecord(object):
+    """A detached match: the event key, the league, the teams, the kickoff and the main market odds.
+
+    It holds no browser handle, so it can be cached, pickled to other processes and kept in large numbers. A
+    record is turned into an actionable `BettingBot.MatchSelection` with `BettingBot.rehydrate` when a bet is
+    placed on it.
+    """
+
+    __slots__ = ('key', 'league', 'home', 'away', 'kickoff', '_odds')
+
+    def __init__(self, key, league, home, away, kickoff, odds=None):
+        self.key = key
+        self.league = league
+        self.home = home
+        self.away = away
+        self.kickoff = kickoff
+        odds = odds or {}
+        self._odds = tuple(odds.get(designation, None) for designation in DESIGNATIONS)
+
+    @classmethod
+    def from_selection(cls, match, league=None):
+        """The record of a MatchSelection of the bots."""
+        key = event_key(href=match.href, matchup_id=getattr(match, 'matchup_id', None),
+                        home=match.home, away=match.away, kickoff=match.date)
+        return cls(key, league or match.league, match.home, match.away, match.date, match.odds)
+
+    @classmethod
+    def from_dict(cls, match, league=None):
+        """The record of a match dict of the interface or of the API."""
+        key = event_key(href=match.get('href', None), matchup_id=match.get('id', None),
+                        home=match['home'], away=match['away'], kickoff=match['time'])
+        return cls(key, league, match['home'], match['away'], match['time'], match.get('odds', None))
+
+    @property
+    def odds(self):
+        return { designation: value for designation, value in zip(DESIGNATIONS, self._odds) if value is not None }
+
+    def odds_of(self, designation):
+        return self._odds[DESIGNATIONS.index(designation)]
+
+    def __reduce__(self):
+        return (_make_record, (self.key, self.league, self.home, self.away, self.kickoff, self._odds))
+
+    def __eq__(self, other):
+        return isinstance(other, MatchRecord) and (self.key, self.league, self.kickoff, self._odds) == (other.key, other.league, other.kickoff, other._odds)
+
+    def __hash__(self):
+        return hash((self.key, self.league))
+
+    def __repr__(self):
+        return 'MatchRecord(%s, At: %s Home: %s - Away: %s)' % (self.key, self.kickoff, self.home, self.away)
+
+
+def _make_record(key, league, home, away, kickoff, odds):
+    record = MatchRecord.__new__(MatchRecord)
+    record.key, record.league, record.home, record.away, record.kickoff = key, league, home, away, kickoff
+    record._odds = odds
+    return record
@@ -0,0 +1,573 @@
+# Common Python library imports
+import re
+import time
+from collections import OrderedDict
+from itertools import count
+from urllib.parse import urljoin, urldefrag
+
+# Pip package imports
+from loguru import logger
+from lxml import html as lxml_html
+from selenium.common.exceptions import NoSuchElementException, NoSuchWindowException, \
+    StaleElementReferenceException, WebDriverException
+from selenium.webdriver.common.by import By
+
+# Internal package imports
+from bots.waits import DOM_SIGNATURE_SCRIPT
+from bots.pinnacle.interface import EVENTS_SNAPSHOT_SCRIPT, BETSLIP_CARDS_SCRIPT, ALL_STAKES_SET_SCRIPT, \
+    OPEN_TAB_SCRIPT, MARKETS_XPATH, BETSLIP_XPATH, BETSLIP_CARD_XPATH, SELECTION_DETAILS_XPATH, \
+    SELECTION_TITLE_XPATH, STAKE_INPUT_XPATH, CONFIRM_BUTTON_XPATH, LOGIN_BUTTON_XPATH, BANKROLL_XPATH, \
+    parse_bankroll
+from bots.pinnacle.parser import element_text
+from bots.pinnacle.betslip import BETSLIP_CHECKSUM_SCRIPT
+from bots.pinnacle.session import LOCAL_STORAGE_DUMP_SCRIPT, LOCAL_STORAGE_LOAD_SCRIPT, LOCAL_STORAGE_CLEAR_SCRIPT
+from bots.pinnacle.stream import OBSERVER_INSTALL_SCRIPT, OBSERVER_DRAIN_SCRIPT, OBSERVER_UNINSTALL_SCRIPT
+
+SESSION_COOKIE = 'replay-session'
+
+LOGIN_FORM_HTML = ('<form><input id="username" type="text"><input id="password" type="password">'
+                   '<button type="submit">Log in</button></form>')
+BANKROLL_HTML = '<span data-test-id="QuickCashier-BankRoll">%s %.2f</span>'
+BETSLIP_EMPTY_HTML = '<div data-test-id="betslip-empty">Your bet slip is empty</div>'
+BETSLIP_CARD_HTML = ('<div data-test-id="Betslip-Card">'
+                     '<div data-test-id="Betslip-SelectionDetails"><div data-test-id="SelectionDetails-Title" alt="%(title)s">%(title)s</div>'
+                     '<span>%(designation)s</span><span>%(odds)s</span><button>x</button></div>'
+                     '<div data-test-id="Betslip-StakeWinInput"><div data-label="Stake"><input value="" data-empty="true"></div>'
+                     '<div data-label="Win"><input value=""></div></div>'
+                     '</div>')
+
+ROW_XPATH = './ancestor::div[@data-test-id="Event.Row"][1]'
+SELECTION_XPATH = '//div[@data-test-id="Event.Row"]//a[@data-test-designation]'
+
+
+def by_to_xpath(by, value):
+    if by == By.XPATH:
+        return value
+    if by == By.ID:
+        return '//*[@id="%s"]' % value
+    if by == By.NAME:
+        return '//*[@name="%s"]' % value
+    if by == By.TAG_NAME:
+        return '//%s' % value
+    if by == By.CLASS_NAME:
+        return '//*[contains(concat(" ", normalize-space(@class), " "), " %s ")]' % value
+    raise WebDriverException("The replay driver does not support locating by [%s]." % by)
+
+def normalize_url(url):
+    return urldefrag(url)[0].rstrip('/')
+
+
+class ReplayElement(object):
+    """A node of a replayed page with the WebElement calls the package uses."""
+
+    def __init__(self, window, node):
+        self._window = window
+        self._node = node
+
+    def __eq__(self, other):
+        return isinstance(other, ReplayElement) and other._node is self._node
+
+    def __hash__(self):
+        return hash(self._node)
+
+    def __repr__(self):
+        return '<ReplayElement %s>' % self._node.tag
+
+    @property
+    def parent(self):
+        """The driver of the element, as WebElement.parent"""
+        return self._window.driver
+
+    @property
+    def node(self):
+        self._window.driver._tick()
+        if self._window.closed or self._node.getroottree().getroot() is not self._window.tree.getroot():
+            raise StaleElementReferenceException("The element is not attached to the page any more.")
+        return self._node
+
+    @property
+    def tag_name(self):
+        return self.node.tag
+
+    @property
+    def text(self):
+        return element_text(self.node)
+
+    def get_attribute(self, name):
+        node = self.node
+        value = node.get(name)
+        if name == 'value' and value is None and node.tag in ('input', 'textarea'):
+            return ''
+        if name in ('href', 'src') and value is not None:
+            return urljoin(self._window.url, value)
+        return value
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return self.node.get('disabled') is None
+
+    def find_elements_by_xpath(self, xpath):
+        return [ ReplayElement(self._window, node) for node in self.node.xpath(xpath) if not isinstance(node, str) ]
+
+    def find_element_by_xpath(self, xpath):
+        elements = self.find_elements_by_xpath(xpath)
+        if len(elements) == 0:
+            raise NoSuchElementException("No element found for [%s]." % xpath)
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        xpath = by_to_xpath(by, value)
+        return self.find_elements_by_xpath(xpath if by == By.XPATH else '.' + xpath)
+
+    def find_element(self, by=By.ID, value=None):
+        xpath = by_to_xpath(by, value)
+        return self.find_element_by_xpath(xpath if by == By.XPATH else '.' + xpath)
+
+    def clear(self):
+        self._window.driver._on_input(self._window, self.node, '')
+
+    def send_keys(self, *values):
+        node = self.node
+        self._window.driver._on_input(self._window, node, (node.get('value') or '') + "".join(str(value) for value in values))
+
+    def click(self):
+        self._window.driver._on_click(self._window, self.node)
+
+
+class ReplayWindow(object):
+
+    def __init__(self, driver, handle):
+        self.driver = driver
+        self.handle = handle
+        self.url = 'about:blank'
+        self.tree = lxml_html.fromstring('<html><body></body></html>').getroottree()
+        self.closed = False
+        # Betslip card node -> the selection anchor it was added by
+        self.cards = {}
+
+
+class SwitchTo(object):
+
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        self._driver._switch_window(handle)
+
+    def default_content(self):
+        pass
+
+
+class ReplayDriver(object):
+    """In-process WebDriver which replays recorded pages.
+
+    Every page is an lxml tree of a recorded HTML keyed by its URL, and the WebDriver calls of the package are
+    answered from that tree: the element lookups, attributes and texts, and the known scripts of the package,
+    which are emulated in Python. The clicks and the typing replay the state changes of the site: logging in,
+    selecting an odds adds a betslip card, removing a card, typing a stake and confirming the bets, which lowers
+    the bankroll. More changes, like moving odds, can be scheduled with `schedule`.
+
+    A factory of the driver can be passed to `BettingBot.login` as the `webdriver`.
+
+    :param pages: dict of URL -> HTML of the recorded pages
+    :param credentials: (user, password) accepted by the login form, None accepts any non empty pair
+    :param bankroll: the bankroll of the logged in session, by default the one of the first recorded page
+    """
+
+    def __init__(self, pages, credentials=None, bankroll=None, currency='EUR'):
+        self._pages = { normalize_url(url): source for url, source in pages.items() }
+        self._credentials = credentials
+        self._bankroll = bankroll
+        self._currency = currency
+        self._windows = OrderedDict()
+        self._handles = count()
+        self._current = None
+        self._cookies = OrderedDict()
+        self._local_storage = {}
+        self._scheduled = []
+        self._scripts = {
+            EVENTS_SNAPSHOT_SCRIPT: self._events_snapshot,
+            DOM_SIGNATURE_SCRIPT: self._dom_signature,
+            BETSLIP_CARDS_SCRIPT: self._betslip_cards,
+            ALL_STAKES_SET_SCRIPT: self._all_stakes_set,
+            BETSLIP_CHECKSUM_SCRIPT: self._betslip_checksum,
+            OPEN_TAB_SCRIPT: self._open_tab,
+            LOCAL_STORAGE_DUMP_SCRIPT: lambda: dict(self._local_storage),
+            LOCAL_STORAGE_LOAD_SCRIPT: self._local_storage.update,
+            LOCAL_STORAGE_CLEAR_SCRIPT: self._local_storage.clear,
+            # The mutations are not replayed, the odds stream cannot be installed
+            OBSERVER_INSTALL_SCRIPT: lambda xpath, max_buffer: False,
+            OBSERVER_DRAIN_SCRIPT: lambda: None,
+            OBSERVER_UNINSTALL_SCRIPT: lambda: None,
+        }
+        #: The bets accepted by the confirm button, (title, designation, odds, stake) tuples
+        self.placed_bets = []
+        self._new_window()
+
+    @classmethod
+    def from_files(cls, paths, **kwargs):
+        """:param paths: dict of URL -> path of the recorded HTML file"""
+        pages = {}
+        for url, path in paths.items():
+            with open(path, 'r', encoding='utf-8') as f:
+                pages[url] = f.read()
+        return cls(pages, **kwargs)
+
+    @classmethod
+    def factory(cls, pages, **kwargs):
+        """:return: a function which creates a new driver, the `webdriver` argument of `BettingBot.login`"""
+        return lambda: cls(pages, **kwargs)
+
+    # Scripted state changes
+
+    def schedule(self, delay, change):
+        """Apply `change(driver)` after `delay` seconds, at the first driver call after it is due."""
+        self._scheduled.append( (time.monotonic() + delay, change) )
+        self._scheduled.sort(key=lambda item: item[0])
+
+    def _tick(self):
+        now = time.monotonic()
+        while len(self._scheduled) > 0 and self._scheduled[0][0] <= now:
+            _, change = self._scheduled.pop(0)
+            change(self)
+
+    @property
+    def logged_in(self):
+        return SESSION_COOKIE in self._cookies
+
+    @property
+    def bankroll(self):
+        return self._bankroll
+
+    def set_bankroll(self, bankroll):
+        self._bankroll = bankroll
+        for window in self._windows.values():
+            self._render_session(window)
+
+    def set_odds(self, href, designation, odds):
+        """Change the odds of a selection on every open page, the event is identified by its link."""
+        for node in self._selections(href, designation):
+            span = node.find('span')
+            (span if span is not None else node).text = "%.3f" % odds
+
+    def set_state(self, href, designation, state):
+        for node in self._selections(href, designation):
+            node.set('data-test-state', state)
+
+    def _selections(self, href, designation):
+        xpath = '//div[@data-test-id="Event.Row"][.//a[@data-test-id="Event.GameInfo"][@href="%s"]]//a[@data-test-designation="%s"]' % (href, designation)
+        return [ node for window in self._windows.values() for node in window.tree.xpath(xpath) ]
+
+    # Windows and navigation
+
+    @property
+    def _window(self):
+        self._tick()
+        window = self._windows.get(self._current, None)
+        if window is None:
+            raise NoSuchWindowException("The current window is closed.")
+        return window
+
+    def _new_window(self):
+        handle = 'replay-%d' % next(self._handles)
+        self._windows[handle] = ReplayWindow(self, handle)
+        self._current = handle
+        return handle
+
+    def _switch_window(self, handle):
+        if handle not in self._windows:
+            raise NoSuchWindowException("No window [%s]." % handle)
+        self._current = handle
+
+    @property
+    def switch_to(self):
+        return SwitchTo(self)
+
+    @property
+    def window_handles(self):
+        return list(self._windows.keys())
+
+    @property
+    def current_window_handle(self):
+        return self._window.handle
+
+    @property
+    def current_url(self):
+        return self._window.url
+
+    @property
+    def title(self):
+        titles = self._window.tree.xpath('//title')
+        return element_text(titles[0]) if len(titles) > 0 else ''
+
+    @property
+    def page_source(self):
+        return lxml_html.tostring(self._window.tree, encoding='unicode')
+
+    def get(self, url):
+        self._load(self._window, url)
+
+    def _load(self, window, url):
+        source = self._pages.get(normalize_url(url), None)
+        if source is None:
+            raise WebDriverException("No recorded page for [%s]." % url)
+        window.tree = lxml_html.fromstring(source).getroottree()
+        window.url = url
+        window.cards = {}
+        self._render_session(window)
+        logger.debug("Replaying page [%s]." % url)
+
+    def close(self):
+        window = self._window
+        window.closed = True
+        del self._windows[window.handle]
+        self._current = None
+
+    def quit(self):
+        for window in self._windows.values():
+            window.closed = True
+        self._windows.clear()
+        self._current = None
+
+    # Cookies
+
+    def get_cookies(self):
+        return [ dict(cookie) for cookie in self._cookies.values() ]
+
+    def add_cookie(self, cookie):
+        self._cookies[cookie['name']] = dict(cookie)
+
+    def delete_all_cookies(self):
+        self._cookies.clear()
+
+    # Elements
+
+    def find_elements_by_xpath(self, xpath):
+        window = self._window
+        return [ ReplayElement(window, node) for node in window.tree.xpath(xpath) if not isinstance(node, str) ]
+
+    def find_element_by_xpath(self, xpath):
+        elements = self.find_elements_by_xpath(xpath)
+        if len(elements) == 0:
+            raise NoSuchElementException("No element found for [%s]." % xpath)
+        return elements[0]
+
+    def find_elements(self, by=By.ID, value=None):
+        return self.find_elements_by_xpath(by_to_xpath(by, value))
+
+    def find_element(self, by=By.ID, value=None):
+        return self.find_element_by_xpath(by_to_xpath(by, value))
+
+    def find_element_by_id(self, element_id):
+        return self.find_element(By.ID, element_id)
+
+    # Scripts
+
+    def execute_script(self, script, *args):
+        fnc = self._scripts.get(script, None)
+        if fnc is None:
+            raise WebDriverException("The replay driver cannot run the script: %s" % script.strip()[:80])
+        self._tick()
+        return fnc(*args)
+
+    def _events_snapshot(self, xpath):
+        window = self._window
+        result, group = [], None
+        for node in window.tree.xpath(xpath):
+            attrib = node.get('data-test-id')
+            if attrib == 'Events.DateBar':
+                group = {'date': element_text(node), 'events': []}
+                result.append(group)
+            elif attrib == 'Event.Row' and group is not None:
+                links = node.xpath('.//a[@data-test-id="Event.GameInfo"]')
+                blocks = node.xpath('./div')
+                selections = []
+                if len(blocks) > 1:
+                    for anchor in blocks[1].xpath('./a'):
+                        selections.append({
+                            'designation': (anchor.get('data-test-designation') or '').strip(),
+                            'state': anchor.get('data-test-state'),
+                            'selected': anchor.get('data-selected'),
+                            'odds': element_text(anchor),
+                        })
+                group['events'].append({
+                    'element': ReplayElement(window, node),
+                    'href': links[0].get('href') if len(links) > 0 else None,
+                    'info': [ element_text(info) for info in node.xpath('.//a[@data-test-id="Event.GameInfo"]/div') ],
+                    'selections': selections,
+                })
+        return result
+
+    def _dom_signature(self, xpath):
+        nodes = self._window.tree.xpath(xpath)
+        if len(nodes) == 0:
+            return None
+        return [ sum(1 for _ in nodes[0].iterdescendants()), len(nodes[0].text_content()) ]
+
+    def _betslip_cards(self, xpath):
+        window = self._window
+        cards = []
+        for card in window.tree.xpath(xpath):
+            titles = card.xpath(SELECTION_TITLE_XPATH)
+            inputs = card.xpath(STAKE_INPUT_XPATH)
+            buttons = card.xpath(SELECTION_DETAILS_XPATH + '/button')
+            selections = card.xpath(SELECTION_DETAILS_XPATH + '/span')
+            cards.append({
+                'title': (titles[0].get('alt') or '').strip() if len(titles) > 0 else None,
+                'selection': element_text(selections[0]).strip() if len(selections) > 0 else None,
+                'stake_input': ReplayElement(window, inputs[0]) if len(inputs) > 0 else None,
+                'button': ReplayElement(window, buttons[0]) if len(buttons) > 0 else None,
+            })
+        return cards
+
+    def _all_stakes_set(self, inputs):
+        return all(stake_input.get_attribute('data-empty') == 'false' for stake_input in inputs)
+
+    def _betslip_checksum(self, card_xpath, input_xpath):
+        cards = self._window.tree.xpath(card_xpath)
+        total = 0.0
+        for card in cards:
+            inputs = card.xpath(input_xpath)
+            try:
+                total += float(inputs[0].get('value'))
+            except (IndexError, TypeError, ValueError):
+                pass
+        return [len(cards), total]
+
+    def _open_tab(self, url):
+        current = self._current
+        handle = self._new_window()
+        try:
+            self._load(self._windows[handle], urljoin(self._windows[current].url, url))
+        finally:
+            self._current = current
+
+    # Replayed state changes of the site
+
+    def _render_session(self, window):
+        """Render the header of a page for the login state of the session."""
+        tree = window.tree
+        if not self.logged_in:
+            for span in tree.xpath(BANKROLL_XPATH):
+                self._replace(span, LOGIN_FORM_HTML)
+            return
+        if self._bankroll is None:
+            self._bankroll = self._recorded_bankroll()
+        for form in tree.xpath('//form[.//input[@id="username"]]'):
+            self._replace(form, BANKROLL_HTML % (self._currency, self._bankroll))
+        for span in tree.xpath(BANKROLL_XPATH):
+            span.text = "%s %.2f" % (self._currency, self._bankroll)
+
+    @staticmethod
+    def _replace(node, source):
+        new_node = lxml_html.fragment_fromstring(source)
+        new_node.tail = node.tail
+        node.getparent().replace(node, new_node)
+        return new_node
+
+    def _on_input(self, window, node, value):
+        node.set('value', value)
+        if node.xpath('ancestor::div[@data-label="Stake"]'):
+            node.set('data-empty', 'false' if len(value) > 0 else 'true')
+
+    def _on_click(self, window, node):
+        tree = window.tree
+        if node in tree.xpath(LOGIN_BUTTON_XPATH):
+            self._login(window)
+        elif node in tree.xpath(SELECTION_XPATH):
+            self._toggle_selection(window, node)
+        elif node in tree.xpath(BETSLIP_CARD_XPATH + '/' + SELECTION_DETAILS_XPATH[2:] + '/button'):
+            self._remove_card(window, node.xpath('./ancestor::div[@data-test-id="Betslip-Card"][1]')[0])
+        elif node in tree.xpath(CONFIRM_BUTTON_XPATH):
+            self._confirm(window)
+        elif node in tree.xpath(MARKETS_XPATH):
+            for market in tree.xpath(MARKETS_XPATH):
+                market.attrib.pop('data-selected', None)
+            node.set('data-selected', 'true')
+        elif node.tag == 'a' and node.get('href'):
+            self._load(window, urljoin(window.url, node.get('href')))
+
+    def _login(self, window):
+        user = (window.tree.xpath('//input[@id="username"]') or [None])[0]
+        password = (window.tree.xpath('//input[@id="password"]') or [None])[0]
+        user = user.get('value') if user is not None else None
+        password = password.get('value') if password is not None else None
+        if not user or not password or (self._credentials is not None and (user, password) != tuple(self._credentials)):
+            logger.debug("Replayed login is rejected.")
+            return
+        self.add_cookie({'name': SESSION_COOKIE, 'value': user, 'path': '/'})
+        for each in self._windows.values():
+            self._render_session(each)
+
+    def _recorded_bankroll(self):
+        for source in self._pages.values():
+            match = re.search(r'data-test-id="QuickCashier-BankRoll"[^>]*>([^<]*)<', source)
+            if match is not None:
+                return parse_bankroll(match.group(1))
+        return 0.0
+
+    def _toggle_selection(self, window, anchor):
+        if anchor.get('data-test-state') != 'open':
+            return
+        for card, card_anchor in list(window.cards.items()):
+            if card_anchor is anchor:
+                self._remove_card(window, card)
+                return
+        row = anchor.xpath(ROW_XPATH)[0]
+        info = [ element_text(div) for div in row.xpath('.//a[@data-test-id="Event.GameInfo"]/div') ]
+        card = lxml_html.fragment_fromstring(BETSLIP_CARD_HTML % {
+            'title': "%s - %s" % (info[0], info[1]),
+            'designation': (anchor.get('data-test-designation') or '').strip(),
+            'odds': element_text(anchor),
+        })
+        betslip = window.tree.xpath(BETSLIP_XPATH)[0]
+        buttons = betslip.xpath(CONFIRM_BUTTON_XPATH)
+        if len(buttons) > 0:
+            buttons[0].addprevious(card)
+        else:
+            betslip.append(card)
+        anchor.set('data-selected', 'true')
+        window.cards[card] = anchor
+        self._render_betslip(window)
+
+    def _remove_card(self, window, card):
+        anchor = window.cards.pop(card, None)
+        if anchor is not None:
+            anchor.set('data-selected', 'false')
+        card.getparent().remove(card)
+        self._render_betslip(window)
+
+    def _confirm(self, window):
+        cards = window.tree.xpath(BETSLIP_CARD_XPATH)
+        bets = []
+        for card in cards:
+            inputs = card.xpath(STAKE_INPUT_XPATH)
+            try:
+                stake = float(inputs[0].get('value'))
+            except (IndexError, TypeError, ValueError):
+                stake = 0.0
+            if stake <= 0.0:
+                continue
+            details = card.xpath(SELECTION_DETAILS_XPATH + '/span')
+            bets.append( ((card.xpath(SELECTION_TITLE_XPATH)[0].get('alt') or '').strip(),
+                          element_text(details[0]) if len(details) > 0 else None,
+                          float(element_text(details[1])) if len(details) > 1 else None,
+                          stake) )
+            self._remove_card(window, card)
+        self.placed_bets.extend(bets)
+        if len(bets) > 0:
+            self.set_bankroll((self._bankroll or 0.0) - sum(bet[3] for bet in bets))
+
+    def _render_betslip(self, window):
+        for betslip in window.tree.xpath(BETSLIP_XPATH):
+            num_of_cards = len(betslip.xpath('.//div[@data-test-id="Betslip-Card"]'))
+            empty = betslip.xpath('.//div[@data-test-id="betslip-empty"]')
+            if num_of_cards > 0:
+                for node in empty:
+                    node.getparent().remove(node)
+            elif len(empty) == 0:
+                betslip.insert(0, lxml_html.fragment_fromstring(BETSLIP_EMPTY_HTML))
+            for button in betslip.xpath(CONFIRM_BUTTON_XPATH):
+                button.text = "Place %d bets" % num_of_cards
@@ -0,0 +1,182 @@
+# Common Python library imports
+import heapq
+import itertools
+import time
+import traceback
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+# Pip package imports
+from loguru import logger
+
+# One scan of a league: the matches found, the bets placed and the time of the next scan
+CycleResult = namedtuple('CycleResult', ['league', 'matches', 'bets', 'next_scan', 'error'])
+
+# (seconds before the kickoff, seconds between the scans) from the closest to the farthest kickoff
+default_intervals = (
+    (15 * 60, 30),
+    (60 * 60, 120),
+    (6 * 3600, 600),
+    (24 * 3600, 1800),
+)
+
+
+def scan_interval(seconds_to_kickoff, intervals=default_intervals, idle_interval=6 * 3600):
+    """:return: the seconds between the scans of a match which starts in `seconds_to_kickoff`"""
+    for horizon, interval in intervals:
+        if seconds_to_kickoff <= horizon:
+            return interval
+    return idle_interval
+
+def match_deadline(seconds_to_kickoff, intervals=default_intervals, idle_interval=6 * 3600, backoff=1.0):
+    """:return: the seconds until a match has to be scanned again.
+
+    It is the scan interval of the match times `backoff`, but the match is scanned as soon as it crosses into a
+    closer interval, e.g. a match 16 minutes before its kickoff is scanned again a minute later instead of 2
+    minutes later. The `backoff` does not stretch the closest interval, and a stretched interval is at most the
+    next farther one, so a match is never scanned less often as its kickoff approaches.
+    """
+    tiers = [ interval for _, interval in intervals ] + [idle_interval]
+    tier = next((position for position, (horizon, _) in enumerate(intervals) if seconds_to_kickoff <= horizon), len(intervals))
+    deadline = tiers[tier]
+    if tier > 0:
+        deadline = min(deadline * backoff, tiers[min(tier + 1, len(tiers) - 1)])
+    for horizon, _ in intervals:
+        if horizon < seconds_to_kickoff:
+            deadline = min(deadline, seconds_to_kickoff - horizon)
+    return deadline
+
+
+class Scheduler(object):
+    """Scans the leagues of a BettingBot by the kickoffs of their matches.
+
+    A priority queue holds the time of the next scan of every league. After a scan every upcoming match gets a
+    deadline from its kickoff, `match_deadline`, and the league is due at the earliest one: the leagues with
+    matches about to start are scanned every `intervals` seconds, the ones without matches every
+    `idle_interval`. A league whose odds did not move since the last scan waits `quiet_backoff` times longer,
+    up to `max_backoff` times, so the browser time goes to the pages whose odds change. The closest interval is
+    never stretched, see `match_deadline`.
+
+    Every cycle selects the league and the market, reads the matches and, with a strategy, places the bets of
+    the strategy in one batch and confirms them once.
+
+    :param strategy: called with (league, matches), returns the (match, market_choice, stake) to bet on
+    :param market: slug of the market to select before the scan, e.g. 'main_market'
+    :param now: returns the current time, in the local time of the kickoffs
+    """
+
+    def __init__(self, bot, leagues, strategy=None, market=None, intervals=default_intervals, idle_interval=6 * 3600,
+                 min_interval=10, error_interval=60, quiet_backoff=1.5, max_backoff=4.0, now=datetime.now, sleep=time.sleep):
+        assert len(leagues) > 0, "The scheduler needs at least one league."
+        self._bot = bot
+        self._strategy = strategy
+        self._market = market
+        self._intervals = intervals
+        self._idle_interval = idle_interval
+        self._min_interval = min_interval
+        self._error_interval = error_interval
+        self._quiet_backoff = quiet_backoff
+        self._max_backoff = max_backoff
+        self._now = now
+        self._sleep = sleep
+        self._queue = []
+        self._counter = itertools.count()
+        self._due = {}
+        self._kickoffs = {}
+        self._odds = {}
+        self._backoff = {}
+        start = now()
+        for league in leagues:
+            self.schedule(league, start)
+
+    def schedule(self, league, when):
+        """Scan a league at `when`, a later entry of the league in the queue is skipped."""
+        self._due[league] = when
+        heapq.heappush(self._queue, (when, next(self._counter), league))
+
+    @property
+    def due(self):
+        """dict of league -> time of its next scan"""
+        return dict(self._due)
+
+    def kickoffs(self, league):
+        """The kickoffs of the upcoming matches of a league at its last scan."""
+        return list(self._kickoffs.get(league, []))
+
+    def next_league(self):
+        """:return: (due time, league) of the next scan"""
+        while len(self._queue) > 0:
+            when, _, league = self._queue[0]
+            if self._due.get(league) == when:
+                return when, league
+            # Rescheduled since it was queued
+            heapq.heappop(self._queue)
+        return None, None
+
+    def run_once(self):
+        """Wait until the next league is due and scan it. :return: the CycleResult"""
+        when, league = self.next_league()
+        assert league is not None, "No league is scheduled."
+        wait = (when - self._now()).total_seconds()
+        if wait > 0:
+            self._sleep(wait)
+        heapq.heappop(self._queue)
+        return self.scan(league)
+
+    def run(self, cycles=None, stop_event=None, callback=None):
+        """Run the scan cycles, until `cycles` are done or the `stop_event` is set.
+
+        :param callback: called with the CycleResult of every cycle
+        """
+        for cycle in itertools.count():
+            if (cycles is not None and cycle >= cycles) or (stop_event is not None and stop_event.is_set()):
+                break
+            result = self.run_once()
+            if callback is not None:
+                callback(result)
+
+    def scan(self, league):
+        matches, bets = [], []
+        try:
+            self._bot.select_league(league)
+            if self._market is not None:
+                self._bot.select_market(getattr(self._bot.markets, self._market))
+            # The scheduler decides when the page is read again, not the match cache
+            self._bot.match_cache.invalidate(league)
+            matches = self._bot.select_matches()
+            if self._strategy is not None:
+                selections = list(self._strategy(league, matches))
+                if len(selections) > 0:
+                    self._bot.place_bets(selections)
+                    self._bot.confirm_bets()
+                    bets = selections
+        except Exception as err:
+            tb = traceback.format_exc()
+            logger.error(tb)
+            next_scan = self._now() + timedelta(seconds=self._error_interval)
+            self.schedule(league, next_scan)
+            return CycleResult(league, matches, bets, next_scan, tb)
+
+        next_scan = self._next_scan(league, matches)
+        self.schedule(league, next_scan)
+        logger.debug("League [%s] scanned, [%s] matches, next scan at [%s]." % (league, len(matches), next_scan))
+        return CycleResult(league, matches, bets, next_scan, None)
+
+    def _next_scan(self, league, matches):
+        now = self._now()
+        upcoming = [ match for match in matches if match.date is not None and match.date > now ]
+        self._kickoffs[league] = sorted(match.date for match in upcoming)
+
+        odds = tuple(sorted((match.home, match.away, match.date, tuple(sorted(match.odds.items()))) for match in upcoming))
+        if league in self._odds and self._odds[league] == odds:
+            self._backoff[league] = min(self._max_backoff, self._backoff.get(league, 1.0) * self._quiet_backoff)
+        else:
+            self._backoff[league] = 1.0
+        self._odds[league] = odds
+
+        # The league is due at the earliest deadline of its matches
+        delay = self._idle_interval
+        for match in upcoming:
+            delay = min(delay, match_deadline((match.date - now).total_seconds(), self._intervals, self._idle_interval,
+                                              backoff=self._backoff[league]))
+        return now + timedelta(seconds=max(self._min_interval, delay))
@@ -0,0 +1,122 @@
+# Common Python library imports
+import json
+import os
+import time
+import traceback
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.pinnacle.interface import open_main_page, is_logged_in
+
+LOCAL_STORAGE_DUMP_SCRIPT = """
+var items = {};
+for (var i = 0; i < window.localStorage.length; i++) {
+    var key = window.localStorage.key(i);
+    items[key] = window.localStorage.getItem(key);
+}
+return items;
+"""
+
+LOCAL_STORAGE_LOAD_SCRIPT = """
+var items = arguments[0];
+for (var key in items) {
+    window.localStorage.setItem(key, items[key]);
+}
+"""
+
+LOCAL_STORAGE_CLEAR_SCRIPT = "window.localStorage.clear();"
+
+class SessionCache(object):
+    """On-disk cache of an authenticated session: the cookies and the local storage of the site.
+
+    The file holds the credentials of the session, so it is only readable by its owner.
+
+    :param max_age: seconds after which a saved session is not restored any more
+    """
+
+    def __init__(self, path, max_age=12 * 3600):
+        self._path = os.path.expanduser(path)
+        self._max_age = max_age
+
+    @property
+    def path(self):
+        return self._path
+
+    def save(self, driver):
+        try:
+            data = {
+                'saved_at': time.time(),
+                'cookies': driver.get_cookies(),
+                'local_storage': driver.execute_script(LOCAL_STORAGE_DUMP_SCRIPT) or {},
+            }
+            directory = os.path.dirname(self._path)
+            if len(directory) > 0:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = "%s.tmp" % self._path
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self._path)
+            logger.debug("Session saved to [%s]." % self._path)
+        except Exception as err:
+            tb = traceback.format_exc()
+            logger.error(tb)
+
+    def load(self):
+        try:
+            with open(self._path, 'r') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as err:
+            logger.warning("Session cache [%s] cannot be read: %s" % (self._path, err))
+            return None
+        if time.time() - data.get('saved_at', 0) > self._max_age:
+            logger.debug("Session cache [%s] is expired." % self._path)
+            return None
+        return data
+
+    def clear(self):
+        try:
+            os.remove(self._path)
+        except FileNotFoundError:
+            pass
+
+    def restore(self, driver, main_page=None):
+        """Restore the cached session into a driver which has the main page opened.
+
+        :return: True if the restored session is logged in. A rejected or partly restored session is removed
+            from the cache and from the driver.
+        """
+        data = self.load()
+        if data is None:
+            return False
+        try:
+            for cookie in data['cookies']:
+                if 'expiry' in cookie:
+                    cookie['expiry'] = int(cookie['expiry'])
+                driver.add_cookie(cookie)
+            driver.execute_script(LOCAL_STORAGE_LOAD_SCRIPT, data['local_storage'])
+            # Reload the page with the restored session
+            open_main_page(driver, main_page)
+        except Exception as err:
+            tb = traceback.format_exc()
+            logger.error(tb)
+            # Some cookies or items may be applied already
+            self._discard(driver, main_page)
+            return False
+        if is_logged_in(driver):
+            logger.info("Session restored from [%s]." % self._path)
+            return True
+        logger.info("The cached session is rejected by the site.")
+        self._discard(driver, main_page)
+        return False
+
+    def _discard(self, driver, main_page=None):
+        """Remove the cached session and reload the main page without it."""
+        self.clear()
+        driver.delete_all_cookies()
+        driver.execute_script(LOCAL_STORAGE_CLEAR_SCRIPT)
+        open_main_page(driver, main_page)
@@ -0,0 +1,91 @@
+# Common Python library imports
+from collections import namedtuple
+
+# Pip package imports
+import numpy as np
+
+# The stake limits of the BettingBot config
+StakeLimits = namedtuple('StakeLimits', ['min_stake', 'max_stake', 'max_sum_stake', 'min_bankroll_percent', 'max_stake_percent'])
+
+METHODS = ('kelly', 'proportional')
+
+
+def limits_from_config(config):
+    return StakeLimits(*[ config[field] for field in StakeLimits._fields ])
+
+def max_stake(bankroll, limits):
+    """The largest stake of a bet: at most `max_stake` and `max_stake_percent` of the bankroll."""
+    return min(limits.max_stake, limits.max_stake_percent * bankroll)
+
+def limit_stake(stake, bankroll, limits):
+    """Clamp a single stake to `max_stake_percent` of the bankroll, then between `min_stake` and `max_stake`."""
+    stake = min(stake, limits.max_stake_percent * bankroll)
+    return min(limits.max_stake, max(limits.min_stake, stake))
+
+def kelly_fractions(odds, probabilities):
+    """The Kelly fraction of the bankroll of every candidate, 0 for the ones without an edge."""
+    odds = np.asarray(odds, dtype=float)
+    probabilities = np.asarray(probabilities, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fractions = (probabilities * odds - 1.0) / (odds - 1.0)
+    return np.where((odds > 1.0) & (fractions > 0.0), fractions, 0.0)
+
+def batch_budget(bankroll, starting_bankroll, sum_stakes, limits):
+    """The most a batch can stake: below the maximum sum of stakes, and leaving the minimum percentage of the
+    starting bankroll.
+    """
+    # The sum of stakes has to stay strictly below the maximum, one cent is kept
+    budget = min(limits.max_sum_stake - sum_stakes - 0.01, bankroll - limits.min_bankroll_percent * starting_bankroll)
+    return max(0.0, budget)
+
+def allocate_stakes(odds, probabilities, bankroll, starting_bankroll, limits, sum_stakes=0.0, method='kelly',
+                    kelly_fraction=0.25):
+    """Allocate the stakes of a batch of candidate bets together.
+
+    The 'kelly' method stakes `kelly_fraction` of the Kelly criterion, the 'proportional' one shares the budget
+    in proportion to the edges. The limits hold for the whole batch: a stake is at most `max_stake` and
+    `max_stake_percent` of the bankroll left after the batch, the sum fits the budget of `batch_budget`. When it
+    does not, all stakes are scaled down together, so a better bet keeps the larger stake whatever its position.
+    The stakes which end up below `min_stake` are dropped. With 'proportional' the budget is shared again among
+    the bets left; with 'kelly' the others only grow back towards their Kelly stakes when the batch was scaled
+    down to the budget.
+
+    :param odds: decimal odds of the candidates
+    :param probabilities: model probabilities of the candidates
+    :param limits: StakeLimits, see `limits_from_config`
+    :return: array of the stakes in the currency of the bankroll rounded down to cents, 0 for the candidates not
+        to bet on
+    """
+    assert method in METHODS, "[%s] is not a staking method." % method
+    odds = np.asarray(odds, dtype=float)
+    probabilities = np.asarray(probabilities, dtype=float)
+    assert odds.shape == probabilities.shape, "The odds and the probabilities have different shapes."
+    budget = batch_budget(bankroll, starting_bankroll, sum_stakes, limits)
+    if odds.size == 0 or budget < limits.min_stake:
+        return np.zeros(odds.shape)
+
+    # The limit of `limit_stake` with the bankroll left after any allocation within the budget, so the stakes
+    # are not clamped again when the bets are placed one after the other
+    highest = max_stake(bankroll - budget, limits)
+    if method == 'kelly':
+        stakes = np.minimum(kelly_fraction * kelly_fractions(odds, probabilities) * bankroll, highest)
+    else:
+        edges = np.clip(probabilities * odds - 1.0, 0.0, None)
+        stakes = np.minimum(edges / max(edges.sum(), 1e-12) * budget, highest)
+
+    active = stakes >= limits.min_stake
+    while True:
+        if method == 'kelly':
+            allocated = np.where(active, stakes, 0.0)
+            total = allocated.sum()
+            if total > budget:
+                allocated *= budget / total
+        else:
+            weights = np.where(active, edges, 0.0)
+            allocated = np.minimum(weights / max(weights.sum(), 1e-12) * budget, highest)
+        still_active = active & (allocated >= limits.min_stake)
+        if np.array_equal(still_active, active):
+            break
+        active = still_active
+    # Rounded down to cents, so the sum never goes above the budget
+    return np.floor(allocated * 100.0) / 100.0
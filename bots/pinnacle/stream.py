@@ -0,0 +1,195 @@
+# Common Python library imports
+import threading
+import time as stime
+from collections import namedtuple
+from datetime import datetime, time
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.utils import safe_cast
+from bots.pinnacle.interface import EVENTS_CONTAINER_XPATH, convert_date_text, wait_for_element
+
+OddsChange = namedtuple('OddsChange', ['key', 'designation', 'odds', 'timestamp'])
+StateChange = namedtuple('StateChange', ['key', 'designation', 'state', 'timestamp'])
+RowAdded = namedtuple('RowAdded', ['key', 'home', 'away', 'time', 'timestamp'])
+RowRemoved = namedtuple('RowRemoved', ['key', 'timestamp'])
+# The observer was lost, e.g. the page was navigated, and it is installed again. Changes may be missed.
+StreamReset = namedtuple('StreamReset', ['timestamp'])
+
+OBSERVER_INSTALL_SCRIPT = """
+var maxBuffer = arguments[1];
+if (window.__botsOddsObserver) { window.__botsOddsObserver.disconnect(); }
+var container = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (container === null) { return false; }
+window.__botsOddsBuffer = [];
+var lastOdds = {};
+
+function push(change) {
+    var buffer = window.__botsOddsBuffer;
+    if (buffer.length >= maxBuffer) { buffer.shift(); }
+    change.ts = Date.now() / 1000.0;
+    buffer.push(change);
+}
+function rowKey(row) {
+    var link = row.querySelector('a[data-test-id="Event.GameInfo"]');
+    return link ? link.getAttribute('href') : null;
+}
+function rowDate(row) {
+    var node = row.previousElementSibling;
+    while (node !== null && node.getAttribute('data-test-id') !== 'Events.DateBar') { node = node.previousElementSibling; }
+    return node ? node.innerText.trim() : null;
+}
+function elementOf(node) {
+    return node.nodeType === Node.ELEMENT_NODE ? node : node.parentElement;
+}
+function selectionChanged(anchor, attribute) {
+    var row = anchor.closest('[data-test-id="Event.Row"]');
+    if (row === null) { return; }
+    var key = rowKey(row);
+    var designation = (anchor.getAttribute('data-test-designation') || '').trim();
+    if (attribute === 'data-test-state') {
+        push({'type': 'state', 'key': key, 'designation': designation, 'value': anchor.getAttribute('data-test-state')});
+    } else {
+        var odds = anchor.innerText.trim();
+        if (lastOdds[key + designation] === odds) { return; }
+        lastOdds[key + designation] = odds;
+        push({'type': 'odds', 'key': key, 'designation': designation, 'value': odds});
+    }
+}
+window.__botsOddsObserver = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var mutation = mutations[i];
+        var target = elementOf(mutation.target);
+        if (target === null) { continue; }
+        if (mutation.type === 'childList' && target === container) {
+            Array.prototype.forEach.call(mutation.addedNodes, function (node) {
+                if (node.nodeType === Node.ELEMENT_NODE && node.getAttribute('data-test-id') === 'Event.Row') {
+                    var info = node.querySelectorAll('a[data-test-id="Event.GameInfo"] > div');
+                    push({'type': 'row_added', 'key': rowKey(node), 'date': rowDate(node),
+                          'info': Array.prototype.map.call(info, function (e) { return e.innerText.trim(); })});
+                }
+            });
+            Array.prototype.forEach.call(mutation.removedNodes, function (node) {
+                if (node.nodeType === Node.ELEMENT_NODE && node.getAttribute('data-test-id') === 'Event.Row') {
+                    push({'type': 'row_removed', 'key': rowKey(node)});
+                }
+            });
+            continue;
+        }
+        var anchor = target.closest('a[data-test-designation]');
+        if (anchor !== null) {
+            selectionChanged(anchor, mutation.type === 'attributes' ? mutation.attributeName : null);
+        } else if (mutation.type === 'childList') {
+            // Re-rendered selections of a row
+            Array.prototype.forEach.call(mutation.addedNodes, function (node) {
+                if (node.nodeType !== Node.ELEMENT_NODE) { return; }
+                var anchors = node.matches('a[data-test-designation]') ? [node] : node.querySelectorAll('a[data-test-designation]');
+                Array.prototype.forEach.call(anchors, function (a) { selectionChanged(a, null); });
+            });
+        }
+    }
+});
+window.__botsOddsObserver.observe(container, {'childList': true, 'subtree': true, 'characterData': true,
+                                              'attributes': true, 'attributeFilter': ['data-test-state']});
+return true;
+"""
+
+OBSERVER_DRAIN_SCRIPT = """
+var buffer = window.__botsOddsBuffer;
+if (buffer === undefined || buffer === null) { return null; }
+window.__botsOddsBuffer = [];
+return buffer;
+"""
+
+OBSERVER_UNINSTALL_SCRIPT = """
+if (window.__botsOddsObserver) { window.__botsOddsObserver.disconnect(); }
+window.__botsOddsObserver = null;
+window.__botsOddsBuffer = null;
+"""
+
+
+def to_event(change):
+    change_type = change['type']
+    if change_type == 'odds':
+        return OddsChange(change['key'], change['designation'], safe_cast(change['value'], float), change['ts'])
+    if change_type == 'state':
+        return StateChange(change['key'], change['designation'], change['value'], change['ts'])
+    if change_type == 'row_added':
+        info = change['info']
+        kickoff = None
+        curr_date = convert_date_text(change['date']) if change['date'] else None
+        if curr_date is not None and len(info) > 2:
+            i_time = info[2].split(':')
+            kickoff = datetime.combine(curr_date, time(int(i_time[0]), int(i_time[1])))
+        return RowAdded(change['key'], info[0] if len(info) > 0 else None, info[1] if len(info) > 1 else None,
+                        kickoff, change['ts'])
+    if change_type == 'row_removed':
+        return RowRemoved(change['key'], change['ts'])
+    return None
+
+
+class OddsStream(object):
+    """Push based stream of the changes of the current league page.
+
+    A MutationObserver injected into the page buffers the odds, the open/closed state and the added or removed
+    event rows. Every `drain` reads and empties that buffer with one script execution.
+
+    :param lock: held during every call on the driver, the lock which guards the navigation of the bot
+    """
+
+    def __init__(self, driver, max_buffer=10000, lock=None):
+        self._driver = driver
+        self._max_buffer = max_buffer
+        self._lock = lock if lock is not None else threading.RLock()
+        self._installed = False
+
+    def install(self):
+        with self._lock:
+            wait_for_element(self._driver, EVENTS_CONTAINER_XPATH)
+            self._installed = bool(self._driver.execute_script(OBSERVER_INSTALL_SCRIPT, EVENTS_CONTAINER_XPATH, self._max_buffer))
+        assert self._installed, "The odds observer cannot be installed, the event list is not found."
+        logger.debug("Odds observer installed.")
+
+    def uninstall(self):
+        with self._lock:
+            if self._installed:
+                self._driver.execute_script(OBSERVER_UNINSTALL_SCRIPT)
+                self._installed = False
+
+    def drain(self):
+        """:return: the list of the change events since the last drain"""
+        with self._lock:
+            if not self._installed:
+                self.install()
+                return []
+            changes = self._driver.execute_script(OBSERVER_DRAIN_SCRIPT)
+            if changes is None:
+                logger.warning("The odds observer is lost, installing it again.")
+                self.install()
+                return [ StreamReset(stime.time()) ]
+        return [ event for event in (to_event(change) for change in changes) if event is not None ]
+
+    def events(self, interval=1.0, duration=None):
+        """Generator of the change events, the page is polled every `interval` seconds.
+
+        :param duration: stop after this many seconds, None runs until the generator is closed
+        """
+        started = stime.monotonic()
+        self.install()
+        try:
+            while duration is None or stime.monotonic() - started < duration:
+                polled = stime.monotonic()
+                for event in self.drain():
+                    yield event
+                stime.sleep(max(0.0, interval - (stime.monotonic() - polled)))
+        finally:
+            try:
+                self.uninstall()
+            except Exception as err:
+                logger.error(err)
+
+    def watch(self, callback, interval=1.0, duration=None):
+        for event in self.events(interval=interval, duration=duration):
+            callback(event)
@@ -0,0 +1,98 @@
+# Common Python library imports
+import traceback
+
+# Pip package imports
+from loguru import logger
+
+# Internal package imports
+from bots.resilience import CircuitOpenError
+from bots.pinnacle.interface import open_league_tab, wait_for_element, switch_window, CONTENT_BLOCK_XPATH
+from bots.pinnacle.pagecache import PageCache
+
+
+class LeagueTabs(object):
+    """Keeps one browser tab per league in a logged in session.
+
+    The tabs are kept open between scrapes, so the league pages are loaded only once and every later scrape
+    reads the live page of the tab.
+    """
+
+    def __init__(self, driver, direct=False):
+        self._driver = driver
+        # Open the league pages by their URL instead of the sidebar links
+        self._direct = direct
+        self._main_handle = driver.current_window_handle
+        self._handles = {}
+
+    @property
+    def handles(self):
+        return dict(self._handles)
+
+    def open(self, leagues):
+        # The tabs are opened from the main window, where the favourites sidebar is known to be loaded
+        self.switch_to_main()
+        for league in leagues:
+            if league not in self._handles:
+                logger.debug('Opening tab of league [%s].' % league)
+                self._handles[league] = open_league_tab(self._driver, league, direct=self._direct)
+
+    def switch(self, league):
+        handle = self._handles[league]
+        if self._driver.current_window_handle != handle:
+            switch_window(self._driver, handle)
+        return handle
+
+    def switch_to_main(self):
+        if self._driver.current_window_handle != self._main_handle:
+            switch_window(self._driver, self._main_handle)
+
+    def scrape(self, leagues, scrape_fnc, concurrent=True, policy=None, timeout=10):
+        """Run `scrape_fnc(league)` in the tab of every league.
+
+        :param concurrent: open every tab before the first scrape, so the pages load in parallel. Otherwise
+            the tabs are opened and scraped one after the other in round-robin order.
+        :param policy: RetryPolicy of one league, every league gets its own circuit breaker. A league whose
+            breaker is open is skipped without touching its tab.
+        :param timeout: seconds the content of a league page is waited for
+        :return: dict of league -> result of the scrape function. Leagues that failed are left out.
+        """
+        if concurrent:
+            self.open(leagues)
+        results = {}
+        try:
+            for league in leagues:
+                try:
+                    if policy is None:
+                        results[league] = self._scrape(league, scrape_fnc, concurrent, timeout)
+                    else:
+                        results[league] = policy.scoped(league).run(self._scrape, league, scrape_fnc, concurrent, timeout)
+                except CircuitOpenError as err:
+                    logger.info("League [%s] skipped: %s" % (league, err))
+                except Exception as err:
+                    tb = traceback.format_exc()
+                    logger.error(tb)
+        finally:
+            self.switch_to_main()
+        return results
+
+    def _scrape(self, league, scrape_fnc, concurrent, timeout):
+        if not concurrent:
+            self.open([league])
+        self.switch(league)
+        wait_for_element(self._driver, CONTENT_BLOCK_XPATH, timeout=timeout)
+        return scrape_fnc(league)
+
+    def close(self, leagues=None):
+        leagues = list(self._handles.keys()) if leagues is None else leagues
+        for league in leagues:
+            handle = self._handles.pop(league, None)
+            if handle is None:
+                continue
+            try:
+                switch_window(self._driver, handle)
+                self._driver.close()
+                PageCache.of(self._driver).close_window(handle)
+            except Exception as err:
+                logger.error(err)
+        # The current window may be closed, its handle cannot be read any more
+        switch_window(self._driver, self._main_handle)
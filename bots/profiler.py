@@ -0,0 +1,171 @@
+# Common Python library imports
+import heapq
+import sys
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# Pip package imports
+from loguru import logger
+
+# One WebDriver protocol call: the command, its latency in seconds and the bots functions on the stack
+DriverCall = namedtuple('DriverCall', ['command', 'latency', 'stack', 'cycle'])
+
+
+def caller_stack(prefix='bots.', skip=(__name__,)):
+    """The functions of the package on the current stack, the outermost first, e.g.
+    ('betting.BettingBot.select_matches', 'interface.get_events_snapshot').
+    """
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(prefix) and module not in skip:
+            code = frame.f_code
+            stack.append("%s.%s" % (module[len(prefix):].rsplit('.', 1)[-1], getattr(code, 'co_qualname', code.co_name)))
+        frame = frame.f_back
+    stack.reverse()
+    return tuple(stack)
+
+
+class CallStats(object):
+
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+
+class DriverProfiler(object):
+    """Records every WebDriver protocol call of the drivers it is attached to.
+
+    The `execute` method of the driver is wrapped, every element call goes through it as well. A call is tagged
+    with the stack of the package functions which made it, so the report tells how many `findElement`,
+    `getElementText` or `executeScript` calls a function of the interface makes and how long they take. When
+    disabled the wrapper only checks a flag.
+
+    :param slowest: number of the slowest calls kept for the report
+    :param prefix: module prefix of the functions that tag the calls
+    """
+
+    def __init__(self, enabled=True, slowest=20, prefix='bots.'):
+        self.enabled = enabled
+        self._slowest = slowest
+        self._prefix = prefix
+        self._cycle = None
+        self._cycles = []
+        self.reset()
+
+    def reset(self):
+        # (stack, command) -> CallStats, and the same per cycle
+        self._stats = {}
+        self._cycle_stats = {}
+        self._slowest_calls = []
+        self._cycles = []
+
+    def attach(self, driver):
+        """Wrap the `execute` of a driver. :return: the driver"""
+        execute = driver.execute
+        profiler = self
+
+        def profiled_execute(driver_command, params=None):
+            if not profiler.enabled:
+                return execute(driver_command, params)
+            start = time.perf_counter()
+            try:
+                return execute(driver_command, params)
+            finally:
+                profiler.record(driver_command, time.perf_counter() - start, caller_stack(profiler._prefix))
+
+        driver.execute = profiled_execute
+        return driver
+
+    def factory(self, make_driver):
+        """:return: a driver factory, e.g. for `BettingBot.login`, which attaches the new drivers"""
+        return lambda *args, **kwargs: self.attach(make_driver(*args, **kwargs))
+
+    def record(self, command, latency, stack):
+        key = (stack, command)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = CallStats()
+        stats.add(latency)
+        if self._cycle is not None:
+            cycle_stats = self._cycle_stats[self._cycle].get(key)
+            if cycle_stats is None:
+                cycle_stats = self._cycle_stats[self._cycle][key] = CallStats()
+            cycle_stats.add(latency)
+        call = DriverCall(command, latency, stack, self._cycle)
+        if len(self._slowest_calls) < self._slowest:
+            heapq.heappush(self._slowest_calls, (latency, id(call), call))
+        elif latency > self._slowest_calls[0][0]:
+            heapq.heapreplace(self._slowest_calls, (latency, id(call), call))
+
+    @contextmanager
+    def cycle(self, name=None):
+        """Collect the calls of one bot cycle separately, e.g. one scan of the leagues."""
+        name = name or "cycle-%d" % (len(self._cycles) + 1)
+        previous, self._cycle = self._cycle, name
+        self._cycles.append(name)
+        self._cycle_stats[name] = {}
+        start = time.perf_counter()
+        try:
+            yield name
+        finally:
+            self._cycle = previous
+            logger.debug("Cycle [%s] took [%.3f] seconds." % (name, time.perf_counter() - start))
+
+    @property
+    def cycles(self):
+        return list(self._cycles)
+
+    def _selected(self, cycle):
+        return self._stats if cycle is None else self._cycle_stats.get(cycle, {})
+
+    def totals(self, cycle=None):
+        """:return: dict of function -> {'count', 'total', 'commands': {command: count}}, by the innermost function"""
+        totals = {}
+        for (stack, command), stats in self._selected(cycle).items():
+            function = stack[-1] if len(stack) > 0 else '<external>'
+            entry = totals.setdefault(function, {'count': 0, 'total': 0.0, 'commands': {}})
+            entry['count'] += stats.count
+            entry['total'] += stats.total
+            entry['commands'][command] = entry['commands'].get(command, 0) + stats.count
+        return totals
+
+    def collapsed(self, cycle=None):
+        """The calls in the collapsed stack format of flame graphs: one 'outer;inner;command microseconds' line
+        per stack, which can be fed to flamegraph.pl or speedscope.
+        """
+        lines = []
+        for (stack, command), stats in sorted(self._selected(cycle).items(), key=lambda item: -item[1].total):
+            lines.append("%s %d" % (";".join(stack + (command,)), int(round(stats.total * 1e6))))
+        return lines
+
+    def slowest(self):
+        """:return: the slowest calls, the slowest first"""
+        return [ call for _, _, call in sorted(self._slowest_calls, reverse=True) ]
+
+    def summary(self, cycle=None, limit=None):
+        """A printable report: the calls and time per function, the slowest first, and the slowest calls."""
+        totals = sorted(self.totals(cycle).items(), key=lambda item: -item[1]['total'])
+        grand_total = sum(entry['total'] for _, entry in totals) or 1.0
+        lines = ["%-60s %8s %10s %6s  %s" % ("function", "calls", "time [ms]", "%", "commands")]
+        for function, entry in totals[:limit]:
+            commands = ", ".join("%s:%d" % (command, count) for command, count in
+                                 sorted(entry['commands'].items(), key=lambda item: -item[1]))
+            lines.append("%-60s %8d %10.1f %6.1f  %s" % (function, entry['count'], entry['total'] * 1e3,
+                                                          100.0 * entry['total'] / grand_total, commands))
+        if cycle is None:
+            lines.append("")
+            lines.append("slowest calls:")
+            for call in self.slowest():
+                lines.append("  %8.1f ms  %-24s %s" % (call.latency * 1e3, call.command, " > ".join(call.stack)))
+        return "\n".join(lines)
@@ -0,0 +1,251 @@
+# Common Python library imports
+import asyncio
+import random
+import threading
+import time
+from functools import wraps
+
+# Pip package imports
+from loguru import logger
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+# The kinds of the errors, a policy retries only the kinds it is given
+STALE = 'stale'
+TIMEOUT = 'timeout'
+LOGGED_OUT = 'logged_out'
+CONNECTION = 'connection'
+ERROR = 'error'
+
+TRANSIENT = (STALE, TIMEOUT, LOGGED_OUT, CONNECTION)
+ALL_KINDS = TRANSIENT + (ERROR,)
+
+# Per-operation budgets, overridden by the 'retry_policies' of the bot config
+default_policies = {
+    'login': {'tries': 3, 'delay': 2.0, 'backoff': 2.0, 'deadline': 30.0, 'retry_on': ALL_KINDS},
+    'select_league': {'tries': 3, 'delay': 1.0, 'backoff': 2.0, 'deadline': 15.0},
+    # One league page of a multi-league scan: a flaky page is given up quickly and skipped for a while
+    'league_scrape': {'tries': 2, 'delay': 0.5, 'deadline': 12.0, 'failure_threshold': 2, 'reset_timeout': 300.0},
+}
+
+
+class LoggedOutError(ConnectionError):
+    """The website logged the session off."""
+
+
+class CircuitOpenError(Exception):
+    """The operation failed too often lately, it is not tried until its circuit breaker resets."""
+
+
+def classify(err):
+    """:return: the kind of an error, one of STALE, TIMEOUT, LOGGED_OUT, CONNECTION or ERROR"""
+    if isinstance(err, StaleElementReferenceException):
+        return STALE
+    if isinstance(err, LoggedOutError):
+        return LOGGED_OUT
+    if isinstance(err, (TimeoutException, TimeoutError)):
+        return TIMEOUT
+    # The requests errors are IOErrors as well
+    if isinstance(err, (OSError, WebDriverException)):
+        return CONNECTION
+    return ERROR
+
+
+class CircuitBreaker(object):
+    """Stops calling an operation after `failure_threshold` failures in a row.
+
+    The breaker stays open for `reset_timeout` seconds, then lets one trial call through (half open): a success
+    closes it, a failure opens it again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60.0, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self._opened_at is None:
+            return CircuitBreaker.CLOSED
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return CircuitBreaker.HALF_OPEN
+        return CircuitBreaker.OPEN
+
+    def allow(self):
+        with self._lock:
+            state = self._state()
+            if state == CircuitBreaker.HALF_OPEN:
+                # Only one trial call, the next ones wait for its outcome
+                self._opened_at = self._clock()
+                return True
+            return state == CircuitBreaker.CLOSED
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logger.warning("Circuit [%s] opened after [%s] failures." % (self.name, self._failures))
+                self._opened_at = self._clock()
+
+    def reset(self):
+        self.record_success()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(name, **kwargs):
+    """The circuit breaker of an operation, shared by every policy of the process."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **kwargs)
+        return breaker
+
+def reset_breakers():
+    with _breakers_lock:
+        _breakers.clear()
+
+
+class RetryPolicy(object):
+    """Retries an operation with a jittered exponential backoff inside a total deadline.
+
+    The errors are classified by `classify`, only the kinds of `retry_on` are retried and the stale elements
+    are retried at once. A retry is not started if its backoff would end after the deadline, the last error is
+    raised instead. Every failed run counts against the circuit breaker of the operation.
+
+    :param deadline: total seconds of the tries and the backoffs, None for no limit
+    :param jitter: the backoff is randomized by +- this fraction
+    :param breaker: name of the circuit breaker, the name of the policy by default. False disables it.
+    :param exceptions: only the errors of these types are retried, whatever their kind
+    """
+
+    def __init__(self, name, tries=3, delay=1.0, backoff=2.0, max_delay=30.0, jitter=0.5, deadline=None,
+                 retry_on=TRANSIENT, failure_threshold=3, reset_timeout=60.0, breaker=None, clock=time.monotonic,
+                 exceptions=Exception):
+        assert tries >= 1, "A policy needs at least one try."
+        self.name = name
+        self.tries = tries
+        self.delay = delay
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.deadline = deadline
+        self.retry_on = tuple(retry_on)
+        self.exceptions = exceptions
+        self._clock = clock
+        self._breaker_options = {'failure_threshold': failure_threshold, 'reset_timeout': reset_timeout}
+        self.breaker = None if breaker is False else get_breaker(breaker or name, **self._breaker_options)
+
+    def scoped(self, key):
+        """The same policy with its own circuit breaker for `key`, e.g. one breaker per league."""
+        policy = RetryPolicy.__new__(RetryPolicy)
+        policy.__dict__.update(self.__dict__)
+        policy.name = "%s:%s" % (self.name, key)
+        if self.breaker is not None:
+            policy.breaker = get_breaker(policy.name, **self._breaker_options)
+        return policy
+
+    def backoff_delay(self, attempt):
+        """The randomized pause after the `attempt`-th failed try, counted from 1."""
+        delay = min(self.max_delay, self.delay * self.backoff ** (attempt - 1))
+        return max(0.0, delay * (1.0 + random.uniform(-self.jitter, self.jitter)))
+
+    def _before(self):
+        if self.breaker is not None and not self.breaker.allow():
+            raise CircuitOpenError("The circuit of [%s] is open." % self.name)
+
+    def _after_failure(self, err, attempt, start):
+        """:return: the pause before the next try, or None to give up"""
+        kind = classify(err)
+        if kind not in self.retry_on or not isinstance(err, self.exceptions) or attempt >= self.tries:
+            return None
+        pause = 0.0 if kind == STALE else self.backoff_delay(attempt)
+        if self.deadline is not None and self._clock() - start + pause >= self.deadline:
+            logger.warning("[%s] gave up, the deadline of [%.1f] seconds would pass." % (self.name, self.deadline))
+            return None
+        logger.warning("[%s] failed with a [%s] error: %s, retrying in %.2f seconds..." % (self.name, kind, err, pause))
+        return pause
+
+    def _failed(self, err):
+        if self.breaker is not None:
+            self.breaker.record_failure()
+        logger.error("[%s] failed: %s" % (self.name, err))
+
+    def _succeeded(self):
+        if self.breaker is not None:
+            self.breaker.record_success()
+
+    def run(self, fnc, *args, **kwargs):
+        """Call `fnc` until it returns. :raise: the last error, or CircuitOpenError"""
+        self._before()
+        start = self._clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = fnc(*args, **kwargs)
+            except Exception as err:
+                pause = self._after_failure(err, attempt, start)
+                if pause is None:
+                    self._failed(err)
+                    raise
+                time.sleep(pause)
+            else:
+                self._succeeded()
+                return result
+
+    async def run_async(self, fnc, *args, **kwargs):
+        """The same as `run` for a coroutine function, the backoff awaits `asyncio.sleep`."""
+        self._before()
+        start = self._clock()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                result = await fnc(*args, **kwargs)
+            except Exception as err:
+                pause = self._after_failure(err, attempt, start)
+                if pause is None:
+                    self._failed(err)
+                    raise
+                await asyncio.sleep(pause)
+            else:
+                self._succeeded()
+                return result
+
+    def __call__(self, f):
+        """Use the policy as a decorator of a function or a coroutine function."""
+        if asyncio.iscoroutinefunction(f):
+            @wraps(f)
+            async def f_async(*args, **kwargs):
+                return await self.run_async(f, *args, **kwargs)
+            return f_async
+
+        @wraps(f)
+        def f_sync(*args, **kwargs):
+            return self.run(f, *args, **kwargs)
+        return f_sync
+
+
+def get_policy(name, overrides=None):
+    """The policy of an operation from `default_policies`, updated by `overrides[name]`."""
+    options = { **default_policies.get(name, {}), **(overrides or {}).get(name, {}) }
+    return RetryPolicy(name, **options)
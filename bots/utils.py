@@ -1,7 +1,6 @@
 # Common Python library imports
 from datetime import timedelta
-import time
-from functools import wraps
+import warnings
 
 # Pip package imports
 from loguru import logger
@@ -21,44 +20,33 @@ def listify(args):
 
 
 def retry(ExceptionToCheck, tries=4, delay=1, backoff=2, logger=logger):
-    """Retry calling the decorated function using an exponential backoff.
+    """Retry calling the decorated function or coroutine function using an exponential backoff.
 
-    :param ExceptionToCheck: the exception to check. may be a tuple of
-        exceptions to check
-    :type ExceptionToCheck: Exception or tuple
+    Deprecated, use `bots.resilience.RetryPolicy`: this is a policy without jitter, deadline or circuit breaker,
+    which retries only the errors of `ExceptionToCheck` and raises the last one. The retries are logged by the
+    policy, `logger` is kept for the old signature.
+
+    :param ExceptionToCheck: the exception to check. may be a tuple of exceptions to check
     :param tries: number of times to try (not retry) before giving up
-    :type tries: int
     :param delay: initial delay between retries in seconds
-    :type delay: int
-    :param backoff: backoff multiplier e.g. value of 2 will double the delay
-        each retry
-    :type backoff: int
-    :param logger: logger to use. If None, print
-    :type logger: logging.Logger instance
+    :param backoff: backoff multiplier e.g. value of 2 will double the delay each retry
     """
-    def deco_retry(f):
+    from bots.resilience import RetryPolicy, ALL_KINDS
+    warnings.warn("bots.utils.retry is deprecated, use bots.resilience.RetryPolicy", DeprecationWarning, stacklevel=2)
 
-        @wraps(f)
-        def f_retry(*args, **kwargs):
-            mtries, mdelay = tries, delay
-            while mtries > 1:
-                try:
-                    return f(*args, **kwargs)
-                except ExceptionToCheck as e:
-                    msg = "%s, Retrying in %d seconds..." % (str(e), mdelay)
-                    if logger:
-                        logger.warning(msg)
-                    time.sleep(mdelay)
-                    mtries -= 1
-                    mdelay *= backoff
-            logger.error("Retrying failed.")
-            raise ExceptionToCheck
-
-        return f_retry  # true decorator
+    def deco_retry(f):
+        policy = RetryPolicy(f.__name__, tries=tries, delay=delay, backoff=backoff, max_delay=float('inf'), jitter=0.0,
+                             retry_on=ALL_KINDS, exceptions=ExceptionToCheck, breaker=False)
+        return policy(f)
 
     return deco_retry
 
 
+def async_retry(ExceptionToCheck, tries=4, delay=1, backoff=2, logger=logger):
+    """Deprecated, the same as `retry`, which awaits `asyncio.sleep` between the tries of a coroutine."""
+    return retry(ExceptionToCheck, tries=tries, delay=delay, backoff=backoff, logger=logger)
+
+
 def get_nested(data, *args, **kwargs):
     if args and data:
         element  = args[0]
@@ -119,6 +107,8 @@ class ObjectMaker(object):
     def __init__(self,
                  class_=None,
                  **kwargs):
+        # Optional bots.profiler.DriverProfiler, which is attached to every made object
+        self._profiler = kwargs.pop('profiler', None)
         self._kwargs = kwargs
 
         self.class_ = type(class_.__name__, (class_,), {})
@@ -131,7 +121,10 @@ class ObjectMaker(object):
                 local_kw["info"] = d
             else:
                 local_kw.setdefault(k, v)
-        return self.class_(**local_kw)
+        obj = self.class_(**local_kw)
+        if self._profiler is not None:
+            obj = self._profiler.attach(obj)
+        return obj
 
 def split_into(arr, n):
     sp = len(arr) // n
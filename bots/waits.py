@@ -0,0 +1,179 @@
+# Common Python library imports
+import re
+import time
+from collections import deque
+
+# Pip package imports
+from loguru import logger
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+# Readiness conditions. Every condition is a callable which takes the driver and returns a truthy value when the
+# page is ready, so they can be passed to `WebDriverWait.until` directly.
+
+def element_present(xpath):
+    def condition(driver):
+        elements = driver.find_elements_by_xpath(xpath)
+        return elements[0] if len(elements) > 0 else False
+    return condition
+
+def element_absent(xpath):
+    def condition(driver):
+        return len(driver.find_elements_by_xpath(xpath)) == 0
+    return condition
+
+def attribute_equals(element, name, value):
+    def condition(driver):
+        attribute = element.get_attribute(name)
+        return attribute is not None and attribute.strip() == value
+    return condition
+
+def element_count_changed(xpath, previous):
+    def condition(driver):
+        return len(driver.find_elements_by_xpath(xpath)) != previous
+    return condition
+
+def text_matches(xpath, pattern):
+    regex = re.compile(pattern)
+    def condition(driver):
+        elements = driver.find_elements_by_xpath(xpath)
+        return len(elements) > 0 and regex.search(elements[0].text) is not None
+    return condition
+
+def url_starts_with(url):
+    url = url.rstrip('/')
+    def condition(driver):
+        return driver.current_url.startswith(url)
+    return condition
+
+# Returns a cheap signature of a subtree: the number of nodes and the length of its text
+DOM_SIGNATURE_SCRIPT = """
+var result = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+var node = result.singleNodeValue;
+if (node === null) { return null; }
+return [node.getElementsByTagName('*').length, node.textContent.length];
+"""
+
+def dom_stable(xpath='//body', quiet_period=0.3):
+    """Ready when the signature of the subtree under `xpath` has not changed for `quiet_period` seconds."""
+    state = {'signature': None, 'since': None}
+    def condition(driver):
+        signature = driver.execute_script(DOM_SIGNATURE_SCRIPT, xpath)
+        now = time.monotonic()
+        if signature is None or signature != state['signature']:
+            state['signature'], state['since'] = signature, now
+            return False
+        return now - state['since'] >= quiet_period
+    return condition
+
+def all_of(*conditions):
+    def condition(driver):
+        result = True
+        for cond in conditions:
+            result = cond(driver)
+            if not result:
+                return False
+        return result
+    return condition
+
+
+class Waiter(object):
+    """Waits on readiness conditions with per-action timeouts and keeps the observed latency of every action.
+
+    With `adaptive` enabled, once an action has `min_samples` observations its timeout shrinks to
+    `headroom` times its p95 latency, but never below `min_timeout` or above the configured timeout.
+    """
+
+    default_timeouts = {
+        'login': 40,
+        'open_league': 15,
+        'select_market': 5,
+        'select_selection': 5,
+        'stake_input': 5,
+        'betslip_settle': 5,
+        'confirm_bet': 20,
+    }
+
+    def __init__(self, timeouts=None, default_timeout=10, poll_frequency=0.1, adaptive=False, headroom=3.0,
+                 min_timeout=1.0, min_samples=20, history=200, quiet_period=0.3):
+        self._timeouts = { **Waiter.default_timeouts, **(timeouts or {}) }
+        self._default_timeout = default_timeout
+        self._poll_frequency = poll_frequency
+        self._quiet_period = quiet_period
+        self._adaptive = adaptive
+        self._headroom = headroom
+        self._min_timeout = min_timeout
+        self._min_samples = min_samples
+        self._history = history
+        self._latencies = {}
+        self._timeout_counts = {}
+
+    def copy(self, timeouts=None, **kwargs):
+        """:return: a new waiter with the timeouts and the options of this one, updated with the given ones. The
+        latencies are not copied.
+        """
+        options = { key: getattr(self, '_' + key) for key in ('default_timeout', 'poll_frequency', 'quiet_period', 'adaptive',
+                                                             'headroom', 'min_timeout', 'min_samples', 'history') }
+        for key in kwargs:
+            assert key in options, "[%s] is not a waiter option." % key
+        return Waiter(timeouts={ **self._timeouts, **(timeouts or {}) }, **{ **options, **kwargs })
+
+    def configure(self, timeouts=None, **kwargs):
+        self._timeouts.update(timeouts or {})
+        for key, value in kwargs.items():
+            assert hasattr(self, '_' + key), "[%s] is not a waiter option." % key
+            setattr(self, '_' + key, value)
+
+    @property
+    def quiet_period(self):
+        """The quiet period of the `dom_stable` conditions of the waits."""
+        return self._quiet_period
+
+    def timeout(self, action):
+        configured = self._timeouts.get(action, self._default_timeout)
+        if self._adaptive:
+            latencies = self._latencies.get(action, ())
+            if len(latencies) >= self._min_samples:
+                return min(configured, max(self._min_timeout, self.percentile(action, 95) * self._headroom))
+        return configured
+
+    def wait(self, action, driver, condition, timeout=None, required=True, message=''):
+        """Wait until `condition` is met for `action`.
+
+        :param required: if False a timeout is logged and None is returned instead of raising
+        :return: the value returned by the condition
+        """
+        timeout = timeout if timeout is not None else self.timeout(action)
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(driver, timeout, poll_frequency=self._poll_frequency,
+                                   ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)).until(condition, message)
+        except TimeoutException:
+            self._timeout_counts[action] = self._timeout_counts.get(action, 0) + 1
+            logger.warning("Waiting for [%s] timed out after [%.1f] seconds." % (action, timeout))
+            if required:
+                raise
+            return None
+        else:
+            self._latencies.setdefault(action, deque(maxlen=self._history)).append(time.monotonic() - start)
+            return result
+
+    def percentile(self, action, percent):
+        latencies = sorted(self._latencies.get(action, ()))
+        if len(latencies) == 0:
+            return None
+        # Nearest-rank percentile
+        rank = max(0, int(-(-percent * len(latencies) // 100)) - 1)
+        return latencies[rank]
+
+    def stats(self):
+        actions = set(self._latencies.keys()) | set(self._timeout_counts.keys())
+        return { action: {
+            'count': len(self._latencies.get(action, ())),
+            'timeouts': self._timeout_counts.get(action, 0),
+            'p50': self.percentile(action, 50),
+            'p95': self.percentile(action, 95),
+            'max': max(self._latencies[action]) if len(self._latencies.get(action, ())) > 0 else None,
+            'timeout': self.timeout(action),
+        } for action in actions }
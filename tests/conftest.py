@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from bots.resilience import reset_breakers
+from bots.pinnacle.betting import BettingBot
+from bots.pinnacle.interface import waiter, league_paths
+from bots.pinnacle.replay import ReplayDriver
+from benchmarks.pages import render_league_page
+
+MAIN_URL = "https://www.pinnacle.com/en/"
+LEAGUE_URL = "https://www.pinnacle.com" + league_paths['bundesliga']
+
+
+@pytest.fixture
+def pages():
+    """The main page and the Bundesliga page: 24 events over three days from 2025-03-01, logged in."""
+    page = render_league_page(24, logged_in=True, bankroll=1000.0, start=date(2025, 3, 1))
+    return {MAIN_URL: page, LEAGUE_URL: page}
+
+@pytest.fixture
+def fast_waits():
+    quiet_period, poll_frequency = waiter.quiet_period, waiter._poll_frequency
+    waiter.configure(quiet_period=0.0, poll_frequency=0.01)
+    yield
+    waiter.configure(quiet_period=quiet_period, poll_frequency=poll_frequency)
+
+@pytest.fixture
+def replay_bot(pages, fast_waits):
+    """Log a BettingBot in to the replayed pages: `replay_bot(config=None, pages=None, **kwargs)`.
+
+    The bots are closed after the test. The circuit breakers are shared by the process, they start closed.
+    """
+    reset_breakers()
+    bots = []
+
+    def login(config=None, pages=pages, **kwargs):
+        factory = ReplayDriver.factory(pages, credentials=("user", "secret"))
+        bot = BettingBot.login("user", "secret", factory, config=config or {}, **kwargs)
+        bots.append(bot)
+        return bot
+
+    yield login
+    for bot in bots:
+        bot.close()
@@ -0,0 +1,106 @@
+import json
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bots.pinnacle.api import ApiBettingBot, american_to_decimal, league_ids
+
+MATCHUPS = [
+    {'id': 11, 'type': 'matchup', 'parent': None, 'startTime': '2025-03-01T14:30:00Z',
+     'participants': [{'alignment': 'home', 'name': 'Bayern Munich'}, {'alignment': 'away', 'name': 'Borussia Dortmund'}]},
+    {'id': 12, 'type': 'matchup', 'parent': None, 'startTime': '2025-03-02T17:30:00Z',
+     'participants': [{'alignment': 'home', 'name': 'RB Leipzig'}, {'alignment': 'away', 'name': 'Bayer Leverkusen'}]},
+    # The first half of a matchup is not a match
+    {'id': 13, 'type': 'matchup', 'parent': {'id': 11}, 'startTime': '2025-03-01T14:30:00Z',
+     'participants': [{'alignment': 'home', 'name': 'Bayern Munich'}, {'alignment': 'away', 'name': 'Borussia Dortmund'}]},
+]
+
+MARKETS = [
+    {'matchupId': 11, 'type': 'moneyline', 'period': 0, 'status': 'open',
+     'prices': [{'designation': 'home', 'price': -150}, {'designation': 'draw', 'price': 320}, {'designation': 'away', 'price': 400}]},
+    {'matchupId': 11, 'type': 'spread', 'period': 0, 'prices': [{'designation': 'home', 'price': 105}]},
+    {'matchupId': 12, 'type': 'moneyline', 'period': 0, 'status': 'open',
+     'prices': [{'designation': 'home', 'price': 120}, {'designation': 'draw', 'price': 250}, {'designation': 'away', 'price': 210}]},
+]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        bundesliga = '/0.1/leagues/%s' % league_ids['bundesliga']
+        if self.path == bundesliga + '/matchups':
+            self._reply(200, MATCHUPS)
+        elif self.path == bundesliga + '/markets/straight':
+            self._reply(200, MARKETS)
+        elif self.path.startswith('/0.1/leagues/'):
+            self._reply(200, [])
+        elif self.path == '/0.1/wallet/balance' and self.headers.get('X-Session') == 'token':
+            self._reply(200, {'amount': 1234.56, 'currency': 'EUR'})
+        else:
+            self._reply(401 if self.path == '/0.1/wallet/balance' else 404, {})
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        if self.path == '/0.1/sessions' and payload == {'username': 'user', 'password': 'secret'}:
+            self._reply(200, {'token': 'token'})
+        else:
+            self._reply(403, {})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def api_url():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield 'http://127.0.0.1:%s/0.1' % server.server_port
+    server.shutdown()
+    server.server_close()
+
+
+def test_american_to_decimal():
+    assert american_to_decimal(-150) == 1.667
+    assert american_to_decimal(230) == 3.3
+    assert american_to_decimal(None) is None
+
+
+def test_api_select_matches(api_url):
+    bot = ApiBettingBot.connect('user', 'secret', config={'api_url': api_url})
+    try:
+        assert bot.bankroll == 1234.56
+        matches = bot.select_matches()
+        assert [ (match.home, match.away) for match in matches ] == [("Bayern Munich", "Borussia Dortmund"), ("RB Leipzig", "Bayer Leverkusen")]
+        assert matches[0].date == datetime(2025, 3, 1, 14, 30)
+        assert matches[0].odds == {'home': 1.667, 'draw': 4.2, 'away': 5.0}
+        assert matches[0].matchup_id == 11
+        assert len(bot.select_matches(date=date(2025, 3, 2))) == 1
+        assert [ match.away for match in bot.select_matches(home="Leipzig") ] == ["Bayer Leverkusen"]
+        with pytest.raises(AssertionError):
+            matches[0].bet_on('home', 1.0)
+    finally:
+        bot.close()
+
+
+def test_api_select_matches_in_leagues(api_url):
+    bot = ApiBettingBot.connect(None, None, config={'api_url': api_url})
+    try:
+        matches = bot.select_matches_in_leagues(['bundesliga', 'laliga', 'serie-a'])
+        assert len(matches) == 2
+        assert all(match.league == 'bundesliga' for match in matches)
+        with pytest.raises(AssertionError):
+            bot.bankroll
+    finally:
+        bot.close()
@@ -0,0 +1,55 @@
+import asyncio
+import threading
+import time
+
+from bots.pinnacle.async_betting import AsyncBettingBot
+
+
+class SlowBot(object):
+    """Blocks like a webdriver call and records the threads running at once."""
+
+    def __init__(self, counter):
+        self.counter = counter
+        self.failures = 1
+
+    def select_matches(self, **kwargs):
+        with self.counter['lock']:
+            self.counter['running'] += 1
+            self.counter['peak'] = max(self.counter['peak'], self.counter['running'])
+        time.sleep(0.05)
+        with self.counter['lock']:
+            self.counter['running'] -= 1
+        return [kwargs]
+
+    def select_league_once(self, league):
+        if self.failures > 0:
+            self.failures -= 1
+            raise ConnectionError
+        return league
+
+
+def test_bots_share_one_event_loop():
+    counter = {'lock': threading.Lock(), 'running': 0, 'peak': 0}
+
+    async def run():
+        bots = [ AsyncBettingBot(SlowBot(counter)) for _ in range(3) ]
+        # The calls of one bot are serialized, different bots run in parallel
+        return await asyncio.gather(*[ bot.select_matches(index=index) for index, bot in enumerate(bots) for _ in range(2) ])
+
+    start = time.monotonic()
+    results = asyncio.run(run())
+    assert len(results) == 6
+    assert counter['peak'] == 3
+    assert time.monotonic() - start < 0.25
+
+
+def test_select_league_retries(monkeypatch):
+    async def run():
+        bot = AsyncBettingBot(SlowBot({}))
+        return await bot.select_league('laliga')
+
+    async def no_sleep(delay):
+        pass
+
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    assert asyncio.run(run()) == 'laliga'
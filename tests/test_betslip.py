@@ -0,0 +1,85 @@
+import os
+from collections import namedtuple
+from datetime import date
+
+import pytest
+
+from bots.pinnacle.betslip import Betslip, BetslipChecksum, checksum_of_record, get_betslip_checksum
+from bots.pinnacle.parser import PageParser
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'league_bundesliga.html')
+
+Match = namedtuple('Match', ['home', 'away'])
+
+
+def test_betslip_totals():
+    betslip = Betslip()
+    first, second = Match("Bayern Munich", "Borussia Dortmund"), Match("Bayern Munich", "RB Leipzig")
+    betslip.add('home', first, 1.5, 5.0)
+    betslip.add('Draw', second, 3.2, 2.5)
+    assert len(betslip) == 2
+    assert betslip.total_stake == 7.5
+    # The same selection again only updates the stake
+    betslip.add('home', first, 1.55, 4.0)
+    assert len(betslip) == 2 and betslip.total_stake == 6.5
+    betslip.set_stake('draw', second, 1.0)
+    assert betslip.checksum == BetslipChecksum(2, 5.0)
+    assert betslip.get('draw', second)['stake'] == 1.0
+    betslip.remove('home', first)
+    assert betslip.checksum == BetslipChecksum(1, 1.0)
+    betslip.remove('draw', second)
+    assert betslip.checksum == BetslipChecksum(0, 0.0)
+
+
+def test_betslip_reconcile():
+    record = PageParser.from_file(FIXTURE).get_betslip()
+    checksum = checksum_of_record(record)
+    assert checksum == BetslipChecksum(2, 5.0)
+
+    betslip = Betslip()
+    betslip.add('home', Match("Bayern Munich", "Borussia Dortmund"), 1.5, 5.0)
+    assert not betslip.reconcile(checksum)
+    betslip.add('away', Match("Bayern Munich", "RB Leipzig"), 2.1, 0.0)
+    assert betslip.reconcile(checksum)
+    betslip.set_stake('away', Match("Bayern Munich", "RB Leipzig"), 1.0)
+    assert not betslip.reconcile(checksum)
+
+
+def test_failed_batch_removes_its_cards(replay_bot):
+    bot = replay_bot({'mode': 'live'})
+    driver = bot._driver
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    matches[0].bet_on('home', 4.0)
+    driver.set_state(matches[2].href, 'away', 'closed')
+    with pytest.raises(AssertionError):
+        bot.place_bets([ (matches[1], 'home', 5.0), (matches[2], 'away', 2.0) ])
+    # Only the card of the earlier bet is left, the confirmation matches the pending bets
+    assert len(driver.find_elements_by_xpath('//div[@data-test-id="Betslip-Card"]')) == 1
+    assert bot.confirm_bets() == 1
+    assert [ bet[1:] for bet in driver.placed_bets ] == [ ('home', matches[0].odds['home'], 4.0) ]
+
+
+def test_batch_with_two_markets_of_a_match(replay_bot):
+    bot = replay_bot({'mode': 'live'})
+    driver = bot._driver
+    match = bot.select_matches(date=date(2025, 3, 1))[0]
+    match.bet_on('draw', 4.0)
+    # The card of the pending draw bet has the same title, its stake is kept
+    assert bot.place_bets([ (match, 'home', 5.0), (match, 'away', 3.0) ]) == [5.0, 3.0]
+    assert bot.confirm_bets() == 3
+    assert sorted(bet[1:] for bet in driver.placed_bets) == [ ('away', match.odds['away'], 3.0), ('draw', match.odds['draw'], 4.0),
+                                                             ('home', match.odds['home'], 5.0) ]
+
+
+def test_cancelled_bet_leaves_the_betslip_model(replay_bot):
+    bot = replay_bot({'mode': 'live'})
+    driver = bot._driver
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    bot.place_bets([ (matches[0], 'home', 5.0), (matches[0], 'draw', 2.0), (matches[1], 'away', 3.0) ])
+    matches[0].clear('home')
+    assert len(bot.betslip) == 2 and bot.betslip.total_stake == 5.0
+    assert bot.betslip.reconcile(get_betslip_checksum(driver))
+    matches[1].clear()
+    assert bot.betslip.reconcile(get_betslip_checksum(driver))
+    assert bot.confirm_bets() == 1
+    assert [ bet[1:] for bet in driver.placed_bets ] == [ ('draw', matches[0].odds['draw'], 2.0) ]
@@ -0,0 +1,32 @@
+import base64
+
+from bots.core import get_chrome_driver, get_firefox_driver, lean_firefox_preferences, blocking_pac, BLOCKED_HOSTS
+
+
+def test_lean_chrome_options():
+    default = get_chrome_driver()['options']
+    lean = get_chrome_driver(lean=True, blocked_hosts=('google-analytics.com',))['options']
+    assert default.arguments == []
+    assert '--blink-settings=imagesEnabled=false' in lean.arguments
+    assert '--host-resolver-rules=MAP google-analytics.com ~NOTFOUND, MAP *.google-analytics.com ~NOTFOUND' in lean.arguments
+    assert lean.experimental_options['prefs']['profile.managed_default_content_settings.images'] == 2
+
+
+def test_lean_chrome_keeps_the_given_prefs():
+    from selenium.webdriver.chrome.options import Options
+    options = Options()
+    options.add_experimental_option('prefs', {'download.default_directory': '/tmp/bets'})
+    prefs = get_chrome_driver(options=options, lean=True)['options'].experimental_options['prefs']
+    assert prefs['download.default_directory'] == '/tmp/bets'
+    assert prefs['profile.managed_default_content_settings.images'] == 2
+
+
+def test_lean_firefox_preferences():
+    preferences = lean_firefox_preferences()
+    assert preferences['permissions.default.image'] == 2
+    assert preferences['gfx.downloadable_fonts.enabled'] is False
+    pac = base64.b64decode(preferences['network.proxy.autoconfig_url'].split(',', 1)[1]).decode('utf-8')
+    assert all("'%s'" % host in pac for host in BLOCKED_HOSTS)
+    # No proxy script without blocked hosts
+    assert 'network.proxy.type' not in lean_firefox_preferences(blocked_hosts=())
+    assert get_firefox_driver(lean=True)['class_'] is not None
@@ -0,0 +1,72 @@
+from datetime import date
+
+from bots.pinnacle.fleet import Fleet, StakeBudget
+
+
+def test_budget_limits():
+    budget = StakeBudget({'mode': 'live', 'min_stake': 1.0, 'max_stake': 50.0, 'max_sum_stake': 100.0,
+                          'min_bankroll_percent': 0.6, 'max_stake_percent': 0.6})
+    budget.start(200.0)
+    budget.start(10.0)
+    assert budget.bankroll == 200.0
+    assert budget.reserve(80.0) == 50.0
+    assert budget.reserve(0.5) == 1.0
+    budget.release(1.0)
+    assert budget.sum_stakes == 50.0
+    # The sum of stakes would reach the maximum
+    assert budget.reserve(50.0) == 0.0
+    assert budget.reserve(45.0) == 45.0
+    # The bankroll is below the minimum percentage
+    assert budget.reserve(1.0) == 0.0
+
+
+def test_budget_checks_the_clamped_stake():
+    budget = StakeBudget({'mode': 'live', 'min_stake': 10.0, 'max_stake': 50.0, 'max_sum_stake': 15.0,
+                          'min_bankroll_percent': 0.1, 'max_stake_percent': 0.6})
+    budget.start(1000.0)
+    assert budget.reserve(4.0) == 10.0
+    # 4.0 would fit, but the minimum stake of 10.0 would go over the maximum sum
+    assert budget.reserve(4.0) == 0.0
+    assert budget.sum_stakes == 10.0
+
+
+def test_removed_bets_give_their_stakes_back(replay_bot):
+    budget = StakeBudget({'max_sum_stake': 20.0})
+    bot = replay_bot(budget=budget)
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    bot.place_bets([ (matches[0], 'home', 8.0), (matches[1], 'home', 8.0) ])
+    assert budget.sum_stakes == 16.0
+    matches[0].clear()
+    assert budget.sum_stakes == 8.0
+    bot.clear_bets()
+    assert budget.sum_stakes == 0.0
+    # The cleared bets do not use up the budget, the same stakes are reserved again
+    assert bot.place_bets([ (matches[0], 'home', 8.0), (matches[1], 'home', 8.0) ]) == [8.0, 8.0]
+    # A confirm in test mode clears the betslip without placing the bets
+    assert bot.confirm_bets() == 2
+    assert budget.sum_stakes == 0.0
+
+
+def test_confirmed_live_bets_keep_their_stakes(replay_bot):
+    budget = StakeBudget({'mode': 'live', 'max_sum_stake': 20.0})
+    bot = replay_bot({'mode': 'live'}, budget=budget)
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    bot.place_bets([ (matches[0], 'home', 8.0) ])
+    assert bot.confirm_bets() == 1
+    bot.clear_bets()
+    matches[0].clear()
+    assert budget.sum_stakes == 8.0
+
+
+def test_budget_does_not_clamp_in_test_mode():
+    budget = StakeBudget({'mode': 'test', 'min_stake': 10.0, 'max_stake': 50.0})
+    budget.start(1000.0)
+    assert budget.reserve(80.0) == 80.0
+    assert budget.reserve(0.5) == 0.5
+
+
+def test_leagues_are_sharded():
+    fleet = Fleet(["premier-league", "laliga", "bundesliga", "serie-a", "ligue-1"], 2, user="", password="")
+    assert fleet.shards == [["premier-league", "laliga", "bundesliga"], ["serie-a", "ligue-1"]]
+    fleet = Fleet(["laliga"], 3, user="", password="")
+    assert fleet.shards == [["laliga"]]
@@ -0,0 +1,41 @@
+import os
+from datetime import date, datetime
+
+from bots.pinnacle.ledger import BetLedger
+
+
+def fill(ledger, num_of_bets):
+    for index in range(num_of_bets):
+        ledger.append(time=datetime(2025, 3, 1 + index % 3, 15, 30), home="Home %s" % (index % 5),
+                      away="Away %s" % (index % 7), stake=1.0 + index, odds=2.5, choice=['home', 'draw', 'away'][index % 3])
+
+
+def test_ledger_frame():
+    ledger = BetLedger(flush_every=4)
+    fill(ledger, 10)
+    assert len(ledger) == 10
+    frame = ledger.to_frame()
+    assert list(frame.columns) == BetLedger.columns
+    assert list(frame['stake']) == [ 1.0 + index for index in range(10) ]
+    assert frame['time'][0] == datetime(2025, 3, 1, 15, 30)
+    # The frame is cached until the next append
+    assert ledger.to_frame() is frame
+    fill(ledger, 1)
+    assert len(ledger.to_frame()) == 11
+
+
+def test_ledger_queries():
+    ledger = BetLedger()
+    fill(ledger, 30)
+    assert len(ledger.query(start=date(2025, 3, 2), end=date(2025, 3, 2))) == 10
+    assert len(ledger.query(choice='draw')) == 10
+    assert len(ledger.query(team="Home 1")) == 6
+    assert len(ledger.query(home="Home 1", choice='home')) == 2
+
+
+def test_ledger_is_persisted(tmp_path):
+    path = os.path.join(str(tmp_path), 'bets.sqlite')
+    ledger = BetLedger(path)
+    fill(ledger, 5)
+    ledger.close()
+    assert len(BetLedger(path)) == 5
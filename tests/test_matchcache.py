@@ -0,0 +1,132 @@
+import threading
+import time
+from datetime import date
+
+from bots.pinnacle.interface import league_paths, open_page
+from bots.pinnacle.matchcache import MatchCache
+from bots.pinnacle.pagecache import PageCache
+
+LEAGUE_URL = "https://www.pinnacle.com" + league_paths['bundesliga']
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_match_lists_expire_after_the_ttl():
+    clock = Clock()
+    cache = MatchCache(ttl=5.0, clock=clock)
+    reads = []
+    load = lambda: reads.append(clock.now) or len(reads)
+
+    assert cache.get('laliga', load) == 1
+    clock.now = 4.0
+    assert cache.get('laliga', load) == 1
+    assert cache.get('bundesliga', load) == 2
+    clock.now = 5.5
+    assert cache.get('laliga', load) == 3
+    cache.invalidate('laliga')
+    assert cache.get('laliga', load) == 4
+    assert (cache.hits, cache.misses) == (1, 4)
+
+
+def test_disabled_cache_always_loads():
+    cache = MatchCache(ttl=0)
+    reads = []
+    for _ in range(3):
+        cache.get('laliga', lambda: reads.append(1))
+    assert len(reads) == 3 and cache.age('laliga') is None
+
+
+def test_background_refresh():
+    cache = MatchCache(ttl=60.0)
+    lock = threading.RLock()
+    reads = []
+    cache.start_refresh(lambda: 'laliga', lambda: reads.append(1) or len(reads), 0.01, lock)
+    try:
+        deadline = time.monotonic() + 2.0
+        while len(reads) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        cache.stop_refresh()
+    assert len(reads) >= 3
+    # The queries find the refreshed list without loading
+    assert cache.get('laliga', lambda: -1) >= 3
+
+
+def test_match_lists_of_another_page_are_read_again():
+    cache = MatchCache(ttl=60.0, clock=Clock())
+    reads = []
+    load = lambda: reads.append(1) or len(reads)
+    assert cache.get('laliga', load, ('main', 0)) == 1
+    assert cache.get('laliga', load, ('main', 0)) == 1
+    # Another tab, then a reload of the main window
+    assert cache.get('laliga', load, ('tab', 0)) == 2
+    assert cache.get('laliga', load, ('main', 1)) == 3
+    assert (cache.hits, cache.misses) == (1, 3)
+
+
+def test_league_url_navigation_and_match_cache(replay_bot):
+    bot = replay_bot({'match_cache_ttl': 60.0, 'league_navigation': 'url'})
+    driver = bot._driver
+    assert driver.current_url == LEAGUE_URL and bot.league == 'bundesliga'
+    first = bot.select_matches(date=date(2025, 3, 1))
+    second = bot.select_matches(date=date(2025, 3, 1), home=first[0].home, away=first[0].away)
+    assert (second[0].home, second[0].away) == (first[0].home, first[0].away)
+    assert (bot.match_cache.misses, bot.match_cache.hits) == (1, 1)
+    # The league page is already open
+    bot.select_league('bundesliga')
+    assert driver.current_url == LEAGUE_URL
+    bot.select_matches()
+    assert bot.match_cache.hits == 2
+    bot.match_cache.invalidate()
+    bot.select_matches()
+    assert bot.match_cache.misses == 2
+
+
+def test_tab_scans_after_a_main_window_query(replay_bot, pages):
+    pages = dict(pages)
+    pages["https://www.pinnacle.com/en/soccer/spain-la-liga/matchups"] = pages[LEAGUE_URL]
+    bot = replay_bot({'match_cache_ttl': 60, 'mode': 'live'}, pages=pages)
+    driver = bot._driver
+    main_window = driver.current_window_handle
+    in_main = bot.select_matches(date=date(2025, 3, 1))
+
+    matches = bot.select_matches_in_leagues(['bundesliga', 'laliga'], date=date(2025, 3, 1))
+    assert len(matches) == 16
+    # The tabs read their own pages, the elements of the main window are not reused
+    for match in matches:
+        assert match.window != main_window and match.html._window.handle == match.window
+    bundesliga = [ match for match in matches if match.league == 'bundesliga' ]
+    assert bot.place_bets([ (bundesliga[0], 'home', 5.0) ]) == [5.0]
+    assert bot.confirm_bets() == 1
+
+    # Back in the main window the page is read again, its list was replaced by the one of the tab
+    bot.close_tabs()
+    bot._switch_window(main_window)
+    again = bot.select_matches(date=date(2025, 3, 1))
+    assert again[0].html._window.handle == main_window
+    # A reload of the same league within the TTL is read again as well
+    misses = bot.match_cache.misses
+    open_page(driver, LEAGUE_URL)
+    bot.select_matches(date=date(2025, 3, 1))
+    assert bot.match_cache.misses == misses + 1
+
+
+def test_bots_navigate_by_the_sidebar_and_do_not_cache_by_default(replay_bot):
+    bot = replay_bot()
+    cache = PageCache.of(bot._driver)
+    bot.select_matches()
+    bot.select_matches()
+    assert not bot.match_cache.enabled and bot.match_cache.age(bot.league) is None
+    # The sidebar link is clicked even for the open league, the 'url' navigation would skip it
+    version = cache.page_version
+    bot.select_league('bundesliga')
+    assert cache.page_version != version
+    # The package does not patch the driver of the caller
+    assert 'get' not in vars(bot._driver)
@@ -0,0 +1,63 @@
+from datetime import date
+
+from bots.pinnacle.names import AliasTable, MatchIndex, TeamNameIndex, normalize
+
+MATCHES = [
+    {'home': 'Atletico Madrid', 'away': 'Real Madrid'},
+    {'home': 'Real Madrid', 'away': 'FC Barcelona'},
+    {'home': 'Sevilla', 'away': 'Atletico Madrid'},
+    {'home': 'Real Betis', 'away': 'Sevilla'},
+]
+
+
+def test_normalize():
+    assert normalize('Atl. Madrid') == 'atl madrid'
+    assert normalize('FC Köln') == 'koln'
+    assert normalize('FC') == 'fc'
+
+
+def test_lookup_uses_aliases_and_ngrams():
+    index = TeamNameIndex()
+    atletico = index.add('Atletico Madrid')
+    assert index.lookup('Atl. Madrid') == [ (atletico, 1.0) ]
+    assert index.lookup('Atletico Madird')[0][0] == atletico
+    assert index.lookup('Bayern Munich') == []
+
+
+def test_find_and_resolve():
+    index = MatchIndex(MATCHES, aliases=AliasTable(aliases={'Barca': 'Barcelona'}))
+    assert index.find(home='Real Madrid') == [MATCHES[1]]
+    assert index.find(away='Atl. Madrid') == [MATCHES[2]]
+    assert index.find(home='Atletico Madrid', away='Real Madrid') == [MATCHES[0]]
+    assert index.resolve([('Real Madrid', 'Barca'), ('Real Betis', 'Sevilla'), ('Sevilla', 'Real Betis')]) == \
+        [MATCHES[1], MATCHES[3], None]
+
+
+def test_lazy_match_pipeline(replay_bot):
+    bot = replay_bot({'scrape_mode': 'element', 'match_cache_ttl': 60})
+    expected = [ (match.home, match.away, match.date) for match in bot.select_matches(date=date(2025, 3, 2)) ]
+    assert len(expected) == 8
+
+    all_matches = bot._scrape_events().all_matches
+    # Only the rows of the selected date are looked up
+    assert [ rows._rows is not None for _, rows in all_matches ] == [False, True, False]
+
+    limited = bot.select_matches(date=date(2025, 3, 2), limit=3)
+    assert [ (match.home, match.away, match.date) for match in limited ] == expected[:3]
+    first = bot.select_matches(home=expected[1][0], away=expected[1][1], first=True)
+    assert (first.home, first.away) == expected[1][:2]
+    assert bot.select_matches(home="Nobody FC", first=True) is None
+    matches = bot.iter_matches(date=date(2025, 3, 2))
+    assert next(matches).home == expected[0][0]
+
+
+def test_name_index_is_built_once_per_scrape(replay_bot):
+    bot = replay_bot({'match_cache_ttl': 60})
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    bot.select_matches(home=matches[0].home, away=matches[0].away)
+    scraped = bot._scrape_events()
+    index = scraped.indexes[None]
+    bot.select_matches(home=matches[1].home, away=matches[1].away)
+    selections = bot.resolve_fixtures([ (matches[2].home, matches[2].away) ])
+    assert selections[0].home == matches[2].home
+    assert bot._scrape_events() is scraped and scraped.indexes[None] is index
@@ -0,0 +1,57 @@
+from datetime import date
+
+import pytest
+
+from bots.pinnacle.interface import (get_market_buttons, get_markets, get_selected_market, select_market,
+                                     get_league_anchor, open_league, league_paths)
+from bots.pinnacle.pagecache import PageCache
+from bots.pinnacle.replay import ReplayDriver
+from benchmarks.pages import render_league_page
+
+MAIN_URL = "https://www.pinnacle.com/en/"
+
+pytestmark = pytest.mark.usefixtures('fast_waits')
+
+
+@pytest.fixture
+def driver():
+    page = render_league_page(6, logged_in=True, start=date(2025, 3, 1))
+    pages = { MAIN_URL: page }
+    pages.update({ "https://www.pinnacle.com" + url: page for url in league_paths.values() })
+    driver = ReplayDriver(pages)
+    driver.get(MAIN_URL)
+    return driver
+
+
+def test_markets_are_resolved_once_per_page(driver):
+    cache = PageCache.of(driver)
+    markets = get_markets(driver, None)
+    assert get_selected_market(driver, markets) is markets.main_market
+    assert select_market(driver, markets.main_market)
+    assert get_market_buttons(driver)[0].selected
+    assert (cache.misses, cache.hits) == (1, 3)
+
+    # A new page is resolved again
+    driver.get(MAIN_URL)
+    get_market_buttons(driver)
+    assert cache.misses == 2
+
+
+def test_league_anchor_is_cached_until_the_click(driver):
+    cache = PageCache.of(driver)
+    anchor = get_league_anchor(driver, 'laliga')
+    assert anchor.href.endswith(league_paths['laliga'])
+    assert get_league_anchor(driver, 'laliga') is anchor
+    open_league(driver, 'laliga')
+    assert driver.current_url.endswith(league_paths['laliga'])
+    assert get_league_anchor(driver, 'laliga') is not anchor
+    assert (cache.misses, cache.hits) == (2, 2)
+
+
+def test_dom_swap_is_detected(driver):
+    cache = PageCache.of(driver)
+    buttons = get_market_buttons(driver)
+    # The page is replaced behind the back of the cache
+    ReplayDriver.get(driver, MAIN_URL)
+    assert get_market_buttons(driver) is not buttons
+    assert cache.misses == 2
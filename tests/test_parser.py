@@ -0,0 +1,48 @@
+import os
+from datetime import date, datetime
+
+import pytest
+
+from bots.pinnacle.parser import PageParser
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'league_bundesliga.html')
+
+
+def test_parse_markets():
+    page = PageParser.from_file(FIXTURE)
+    markets = page.get_markets()
+    assert markets[0].slug == 'main_market'
+    assert page.get_selected_market().name == 'Main Markets'
+
+
+def test_parse_matches_with_dates():
+    page = PageParser.from_file(FIXTURE)
+    matches = page.get_matches_with_dates()
+    assert [curr_date for curr_date, _ in matches] == [date(2025, 3, 1), date(2025, 3, 2), date(2025, 3, 3)]
+    first = matches[0][1][0]
+    assert first.home == 'Bayern Munich'
+    assert first.away == 'Borussia Dortmund'
+    assert first.time == datetime(2025, 3, 1, 12, 0)
+    assert set(first.odds.keys()) == {'home', 'draw', 'away'}
+    assert first.states['draw'] == 'open'
+
+
+def test_parse_bankroll_and_betslip():
+    page = PageParser.from_file(FIXTURE)
+    assert page.get_bankroll() == 1234.56
+    betslip = page.get_betslip()
+    assert page.num_of_pending_bets() == len(betslip.cards) == betslip.confirmed_bets == 2
+    assert betslip.cards[0].title == 'Bayern Munich - Borussia Dortmund'
+    assert betslip.cards[0].stake == 5.0
+    assert betslip.cards[1].empty
+
+
+def test_lxml_matches_are_read_only(replay_bot):
+    bot = replay_bot({'scrape_mode': 'lxml'})
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    assert len(matches) == 8 and matches[0].odds['home'] > 1.0
+    with pytest.raises(AssertionError, match="read-only"):
+        matches[0].bet_on('home', 5.0)
+    with pytest.raises(AssertionError, match="read-only"):
+        bot.place_bets([ (matches[1], 'away', 5.0) ])
+    assert len(bot.pending_bets) == 0
@@ -0,0 +1,45 @@
+from bots.profiler import DriverProfiler
+from bots.waits import element_present
+
+
+class ProtocolDriver(object):
+    """Sends one protocol command per call, like the remote WebDriver."""
+
+    def __init__(self):
+        self.commands = []
+
+    def execute(self, driver_command, params=None):
+        self.commands.append(driver_command)
+        return {'value': []}
+
+    def find_elements_by_xpath(self, xpath):
+        return self.execute('findElements', {'using': 'xpath', 'value': xpath})['value']
+
+
+def test_profiler_tags_calls():
+    profiler = DriverProfiler()
+    driver = profiler.attach(ProtocolDriver())
+    with profiler.cycle('scan'):
+        for _ in range(3):
+            element_present('//div')(driver)
+    driver.execute('getTitle')
+
+    totals = profiler.totals()
+    # The qualified name is only known on Python 3.11+
+    condition = [ function for function in totals if function.startswith('waits.') ][0]
+    assert condition.endswith('condition')
+    assert totals[condition]['count'] == 3
+    assert totals[condition]['commands'] == {'findElements': 3}
+    assert totals['<external>']['count'] == 1
+    assert list(profiler.totals('scan').keys()) == [condition]
+    assert profiler.collapsed('scan')[0].startswith(condition + ';findElements ')
+    assert len(profiler.slowest()) == 4
+    assert 'findElements:3' in profiler.summary()
+
+
+def test_disabled_profiler():
+    profiler = DriverProfiler(enabled=False)
+    driver = profiler.attach(ProtocolDriver())
+    element_present('//div')(driver)
+    assert driver.commands == ['findElements']
+    assert profiler.totals() == {}
@@ -0,0 +1,81 @@
+from collections import namedtuple
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from bots.pinnacle.recorder import OddsRecorder, match_key
+
+Match = namedtuple('Match', ['home', 'away', 'date', 'odds'])
+
+MATCHES = [
+    Match('Bayern Munich', 'Borussia Dortmund', datetime(2025, 3, 1, 15, 30), {'home': 1.5, 'draw': 4.2, 'away': 5.5}),
+    Match('RB Leipzig', 'FC Augsburg', datetime(2025, 3, 1, 18, 30), {'home': 1.8, 'draw': 3.6, 'away': None}),
+]
+
+
+def test_record_and_history(tmp_path):
+    recorder = OddsRecorder(str(tmp_path), segment_size=4)
+    for timestamp in range(1, 4):
+        assert recorder.record_matches('bundesliga', MATCHES, timestamp=float(timestamp)) == 5
+    assert len(recorder) == 15
+    # 15 records in segments of 4
+    assert [ len(segment) for segment in recorder.segments() ] == [4, 4, 4, 3]
+
+    key = match_key('Bayern Munich', 'Borussia Dortmund', datetime(2025, 3, 1, 15, 30))
+    history = recorder.history(key, selection='draw')
+    assert list(history['timestamp']) == [1.0, 2.0, 3.0]
+    assert np.allclose(history['odds'], 4.2)
+    assert recorder.match_of(history[0]) == key
+    assert recorder.league_of(history[0]) == 'bundesliga'
+    assert len(recorder.history('unknown')) == 0
+    recorder.close()
+
+    # The records and the dictionaries are read back from the files
+    recorder = OddsRecorder(str(tmp_path), segment_size=4)
+    assert len(recorder) == 15
+    assert len(recorder.history(key)) == 9
+    recorder.record('bundesliga', key, 'main_market', 'home', 1.45, timestamp=4.0)
+    assert len(recorder.history(key, selection='home')) == 4
+
+
+def test_counts_and_segment_sizes_survive_reopening(tmp_path):
+    recorder = OddsRecorder(str(tmp_path), segment_size=4)
+    # Records with a zero timestamp are still counted
+    assert recorder.record_matches('bundesliga', MATCHES, timestamp=0.0) == 5
+    recorder.close()
+
+    # A different segment size applies to the new segments only
+    recorder = OddsRecorder(str(tmp_path), segment_size=8)
+    assert len(recorder) == 5
+    assert recorder.record_matches('bundesliga', MATCHES, timestamp=1.0) == 5
+    assert [ len(segment) for segment in recorder.segments() ] == [4, 4, 2]
+    assert [ len(segment) for segment in recorder._segments ] == [4, 4, 8]
+    key = match_key('RB Leipzig', 'FC Augsburg', datetime(2025, 3, 1, 18, 30))
+    assert list(recorder.history(key)['timestamp']) == [0.0, 0.0, 1.0, 1.0]
+    recorder.close()
+
+    recorder = OddsRecorder(str(tmp_path), segment_size=2)
+    assert len(recorder) == 10
+    assert list(recorder.history(key, selection='draw')['odds']) == [3.6, 3.6]
+
+
+def test_records_survive_a_crash_before_the_flush(tmp_path):
+    recorder = OddsRecorder(str(tmp_path), segment_size=4)
+    recorder.record_matches('bundesliga', MATCHES, timestamp=1.0)
+    # Opened again without flush or close
+    reopened = OddsRecorder(str(tmp_path), segment_size=4)
+    assert len(reopened) == 5
+    key = match_key('Bayern Munich', 'Borussia Dortmund', datetime(2025, 3, 1, 15, 30))
+    assert len(reopened.history(key)) == 3
+
+
+def test_league_ids_fit_the_record_field(tmp_path):
+    recorder = OddsRecorder(str(tmp_path), segment_size=4)
+    recorder.record_matches('bundesliga', MATCHES, timestamp=1.0)
+    # As if the dictionary was full
+    recorder._leagues._values.extend([''] * 65536)
+    with pytest.raises(AssertionError, match="Too many leagues"):
+        recorder.record_matches('laliga', MATCHES, timestamp=2.0)
+    assert recorder.record_matches('bundesliga', MATCHES, timestamp=2.0) == 5
+    assert recorder._leagues.encode('laliga', add=False) is None
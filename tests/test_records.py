@@ -0,0 +1,40 @@
+import pickle
+from datetime import date, datetime
+
+from bots.pinnacle.records import MatchRecord, event_key
+
+
+def make_record():
+    return MatchRecord.from_dict({'home': 'Bayern Munich', 'away': 'Werder Bremen', 'time': datetime(2025, 3, 1, 15, 30),
+                                  'href': '/en/soccer/matchup/1604', 'odds': {'home': 1.45, 'away': 6.5}}, 'bundesliga')
+
+
+def test_record_fields():
+    record = make_record()
+    assert record.key == '1604'
+    assert record.odds == {'home': 1.45, 'away': 6.5}
+    assert record.odds_of('draw') is None
+    assert not hasattr(record, '__dict__')
+
+
+def test_event_key_fallbacks():
+    kickoff = datetime(2025, 3, 1, 15, 30)
+    assert event_key(matchup_id=42, href='/en/soccer/matchup/1604') == '42'
+    assert event_key(home='A', away='B', kickoff=kickoff) == 'A|B|2025-03-01T15:30:00'
+
+
+def test_record_pickles():
+    record = make_record()
+    copy = pickle.loads(pickle.dumps(record))
+    assert copy == record and hash(copy) == hash(record)
+    assert (copy.home, copy.away, copy.kickoff, copy.league) == (record.home, record.away, record.kickoff, record.league)
+
+
+def test_records_are_rehydrated(replay_bot):
+    bot = replay_bot({'mode': 'live'})
+    records = bot.select_records(date=date(2025, 3, 1))
+    assert len(records) == 8 and records[2].league == 'bundesliga'
+    match = bot.rehydrate(records[2])
+    assert match.record == records[2]
+    match.bet_on('away', 5.0)
+    assert bot.confirm_bets() == 1
@@ -0,0 +1,37 @@
+from datetime import date
+
+from bots.pinnacle.betslip import get_betslip_checksum
+from bots.pinnacle.interface import league_paths
+
+LEAGUE_URL = "https://www.pinnacle.com" + league_paths['bundesliga']
+
+
+def test_replay_bet_flow(replay_bot):
+    bot = replay_bot({'mode': 'live'})
+    driver = bot._driver
+    assert driver.logged_in and driver.current_url == LEAGUE_URL
+    assert bot.bankroll == 1000.0
+
+    bot.select_league('bundesliga')
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    assert len(matches) == 8
+    matches[0].bet_on('home', 10.0)
+    assert len(bot.pending_bets) == 1
+    assert bot.confirm_bets() == 1
+    assert driver.placed_bets == [ ("%s - %s" % (matches[0].home, matches[0].away), 'home', matches[0].odds['home'], 10.0) ]
+    assert bot.bankroll == 990.0
+    assert len(bot.pending_bets) == 0
+
+
+def test_replay_batch_and_scheduled_changes(replay_bot):
+    bot = replay_bot()
+    driver = bot._driver
+    matches = bot.select_matches(date=date(2025, 3, 2))
+    driver.schedule(0.0, lambda d: d.set_odds(matches[1].href, 'draw', 9.5))
+    stakes = bot.place_bets([ (matches[0], 'home', 5.0), (matches[1], 'draw', 2.0) ])
+    assert stakes == [5.0, 2.0]
+    assert bot.pending_bets[1]['odds'] == 9.5
+    assert bot.betslip.reconcile(get_betslip_checksum(driver))
+    bot.clear_bets()
+    assert len(bot.pending_bets) == 0
+    assert len(driver.find_elements_by_xpath('//div[@data-test-id="Betslip-Card"]')) == 0
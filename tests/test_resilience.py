@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+
+from bots import resilience
+from bots.resilience import (RetryPolicy, CircuitBreaker, CircuitOpenError, LoggedOutError, classify, get_policy,
+                             STALE, TIMEOUT, LOGGED_OUT, CONNECTION, ERROR)
+from bots.utils import retry, async_retry
+from bots.pinnacle.tabs import LeagueTabs
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky(object):
+    """Fails with the given errors, then returns 'ok'."""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self, *args, **kwargs):
+        self.calls += 1
+        if len(self.errors) > 0:
+            raise self.errors.pop(0)
+        return 'ok'
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    resilience.reset_breakers()
+    sleeps = []
+    monkeypatch.setattr(resilience.time, 'sleep', sleeps.append)
+    return sleeps
+
+
+def test_classify():
+    assert classify(StaleElementReferenceException()) == STALE
+    assert classify(TimeoutException()) == TIMEOUT
+    assert classify(LoggedOutError()) == LOGGED_OUT
+    assert classify(ConnectionError()) == CONNECTION
+    assert classify(AssertionError()) == ERROR
+
+
+def test_retries_transient_errors(no_sleep):
+    fnc = Flaky(TimeoutException("slow"), StaleElementReferenceException("gone"))
+    assert RetryPolicy('op', tries=3, delay=1.0, jitter=0.5).run(fnc) == 'ok'
+    assert fnc.calls == 3
+    # The stale element is retried at once, the timeout after a jittered backoff
+    assert len(no_sleep) == 2 and 0.5 <= no_sleep[0] <= 1.5 and no_sleep[1] == 0.0
+
+
+def test_raises_the_last_error_and_not_other_kinds():
+    fnc = Flaky(ConnectionError("first"), ConnectionError("last"))
+    with pytest.raises(ConnectionError, match="last"):
+        RetryPolicy('op', tries=2).run(fnc)
+
+    fnc = Flaky(AssertionError("bug"))
+    with pytest.raises(AssertionError):
+        RetryPolicy('other', tries=3).run(fnc)
+    assert fnc.calls == 1
+
+
+def test_deadline_stops_the_retries():
+    clock = Clock()
+
+    def slow():
+        clock.now += 4.0
+        raise TimeoutException("slow")
+
+    policy = RetryPolicy('op', tries=10, delay=1.0, jitter=0.0, deadline=10.0, clock=clock)
+    with pytest.raises(TimeoutException):
+        policy.run(slow)
+    # 4 s + 1 s pause + 4 s, the next 2 s pause would end after the deadline
+    assert clock.now == 8.0
+
+
+def test_circuit_breaker_opens_and_resets():
+    clock = Clock()
+    breaker = CircuitBreaker('op', failure_threshold=2, reset_timeout=60.0, clock=clock)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+    clock.now = 61.0
+    # One trial call is let through
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_scoped_policies_have_own_breakers():
+    policy = RetryPolicy('scrape', tries=1, failure_threshold=1)
+    with pytest.raises(ConnectionError):
+        policy.scoped('laliga').run(Flaky(ConnectionError()))
+    with pytest.raises(CircuitOpenError):
+        policy.scoped('laliga').run(Flaky())
+    assert policy.scoped('bundesliga').run(Flaky()) == 'ok'
+
+
+def test_run_async(monkeypatch):
+    pauses = []
+
+    async def no_sleep(delay):
+        pauses.append(delay)
+
+    async def run(fnc):
+        return fnc()
+
+    monkeypatch.setattr(asyncio, 'sleep', no_sleep)
+    fnc = Flaky(LoggedOutError(), LoggedOutError())
+    assert asyncio.run(get_policy('select_league').run_async(run, fnc)) == 'ok'
+    assert len(pauses) == 2
+
+
+def test_utils_retry_raises_the_last_error():
+    with pytest.warns(DeprecationWarning):
+        @retry(ValueError, tries=2, delay=0, logger=None)
+        def fail():
+            raise ValueError("last")
+
+    with pytest.raises(ValueError, match="last"):
+        fail()
+
+
+def test_utils_retry_only_retries_the_given_errors():
+    calls = []
+    with pytest.warns(DeprecationWarning):
+        @retry(ValueError, tries=3, delay=0)
+        def fail():
+            calls.append(1)
+            raise KeyError("other")
+
+    with pytest.raises(KeyError):
+        fail()
+    assert len(calls) == 1
+
+
+def test_utils_async_retry():
+    calls = []
+    with pytest.warns(DeprecationWarning):
+        @async_retry(ValueError, tries=3, delay=0)
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise ValueError("again")
+            return "done"
+
+    assert asyncio.run(flaky()) == "done"
+    assert len(calls) == 3
+
+
+class FakeTabs(LeagueTabs):
+
+    def __init__(self, failing):
+        self.failing = failing
+        self.scraped = []
+
+    def open(self, leagues):
+        pass
+
+    def switch_to_main(self):
+        pass
+
+    def _scrape(self, league, scrape_fnc, concurrent, timeout):
+        self.scraped.append(league)
+        if league in self.failing:
+            raise TimeoutException("League page did not load.")
+        return scrape_fnc(league)
+
+
+def test_flaky_league_is_skipped():
+    tabs = FakeTabs(failing=['laliga'])
+    policy = get_policy('league_scrape')
+    leagues = ['laliga', 'bundesliga', 'serie-a']
+    for _ in range(3):
+        results = tabs.scrape(leagues, lambda league: league.upper(), policy=policy)
+        assert results == {'bundesliga': 'BUNDESLIGA', 'serie-a': 'SERIE-A'}
+    # Two tries in each of the first two scans open the breaker, the third scan skips the league
+    assert tabs.scraped.count('laliga') == 4
+    assert tabs.scraped.count('bundesliga') == 3
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta
+
+from bots.pinnacle.matchcache import MatchCache
+from bots.pinnacle.scheduler import Scheduler, scan_interval, match_deadline
+
+START = datetime(2025, 3, 1, 12, 0)
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.now = START
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += timedelta(seconds=seconds)
+
+
+class Match(object):
+
+    def __init__(self, home, away, date, odds):
+        self.home, self.away, self.date, self.odds = home, away, date, odds
+
+
+class FakeBot(object):
+
+    def __init__(self, matches):
+        self.matches = matches
+        self.league = None
+        self.calls = []
+        self.match_cache = MatchCache(ttl=0)
+
+    def select_league(self, league):
+        self.league = league
+        self.calls.append(('select_league', league))
+
+    def select_matches(self):
+        return self.matches.get(self.league, [])
+
+    def place_bets(self, selections):
+        self.calls.append(('place_bets', len(selections)))
+
+    def confirm_bets(self):
+        self.calls.append(('confirm_bets', self.league))
+
+
+def test_intervals():
+    assert scan_interval(10 * 60) == 30
+    assert scan_interval(3 * 3600) == 600
+    assert scan_interval(3 * 86400) == 6 * 3600
+    # 16 minutes before the kickoff the match is scanned again when it enters the last 15 minutes
+    assert match_deadline(16 * 60) == 60
+    assert match_deadline(2 * 3600, backoff=2.0) == 1200
+
+
+def test_backoff_keeps_the_scans_closer_to_the_kickoff():
+    # The closest interval is not stretched for a quiet league
+    assert match_deadline(10 * 60, backoff=4.0) == 30
+    # A stretched interval is at most the next farther one
+    assert match_deadline(30 * 60, backoff=4.0) == 480
+    assert match_deadline(3 * 3600, backoff=4.0) == 1800
+    deadlines = [ match_deadline(minutes * 60, backoff=4.0) for minutes in (5, 30, 180, 720) ]
+    assert deadlines == sorted(deadlines)
+
+
+def test_leagues_are_scanned_by_their_kickoffs():
+    clock = Clock()
+    bot = FakeBot({
+        'laliga': [ Match('A', 'B', START + timedelta(minutes=10), {'home': 2.0}) ],
+        'bundesliga': [ Match('C', 'D', START + timedelta(days=3), {'home': 1.5}) ],
+    })
+    bets = lambda league, matches: [ (match, 'home', 1.0) for match in matches if league == 'laliga' ]
+    scheduler = Scheduler(bot, ['laliga', 'bundesliga', 'serie-a'], strategy=bets, now=clock, sleep=clock.sleep)
+
+    results = []
+    scheduler.run(cycles=3, callback=results.append)
+    due = scheduler.due
+    assert due['laliga'] == START + timedelta(seconds=30)
+    assert due['bundesliga'] == START + timedelta(hours=6)
+    assert due['serie-a'] == START + timedelta(hours=6)
+    assert scheduler.kickoffs('laliga') == [START + timedelta(minutes=10)]
+    assert [ result.error for result in results ] == [None, None, None]
+    # One batch and one confirmation per cycle with bets
+    assert bot.calls.count(('place_bets', 1)) == 1 and bot.calls.count(('confirm_bets', 'laliga')) == 1
+
+    # The close kickoff is scanned again and again, the unchanged odds do not back off in the last 15 minutes
+    scheduler.run(cycles=2)
+    assert clock.now == START + timedelta(seconds=60)
+    assert scheduler.due['laliga'] == clock.now + timedelta(seconds=30)
+    assert [ call[1] for call in bot.calls if call[0] == 'select_league' ][3:] == ['laliga', 'laliga']
+
+
+def test_quiet_league_backs_off():
+    clock = Clock()
+    bot = FakeBot({'laliga': [ Match('A', 'B', START + timedelta(hours=2), {'home': 2.0}) ]})
+    scheduler = Scheduler(bot, ['laliga'], now=clock, sleep=clock.sleep)
+    scheduler.run(cycles=3)
+    # Every 10 minutes 2 hours before the kickoff, 1.5 times longer after every scan without odds changes
+    assert clock.now == START + timedelta(seconds=600 + 900)
+    assert scheduler.due['laliga'] == clock.now + timedelta(seconds=1350)
+
+
+def test_failed_scan_is_retried():
+    clock = Clock()
+
+    class FailingBot(FakeBot):
+        def select_league(self, league):
+            raise ConnectionError("down")
+
+    scheduler = Scheduler(FailingBot({}), ['laliga'], now=clock, sleep=clock.sleep, error_interval=60)
+    result = scheduler.run_once()
+    assert result.error is not None and result.next_scan == START + timedelta(seconds=60)
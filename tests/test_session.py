@@ -0,0 +1,95 @@
+import json
+import os
+import time
+from datetime import date
+
+import pytest
+
+from bots.pinnacle.interface import open_main_page, login, is_logged_in
+from bots.pinnacle.replay import ReplayDriver, SESSION_COOKIE
+from bots.pinnacle.session import SessionCache, LOCAL_STORAGE_LOAD_SCRIPT
+from benchmarks.pages import render_league_page
+
+MAIN_URL = "https://www.pinnacle.com/en/"
+
+
+@pytest.fixture
+def pages():
+    return {MAIN_URL: render_league_page(8, logged_in=True, start=date(2025, 3, 1))}
+
+def logged_in_driver(pages):
+    driver = ReplayDriver(pages)
+    open_main_page(driver, MAIN_URL)
+    login(driver, user="user", password="secret")
+    driver.execute_script(LOCAL_STORAGE_LOAD_SCRIPT, {'token': 'abc'})
+    return driver
+
+def fresh_driver(pages):
+    driver = ReplayDriver(pages)
+    open_main_page(driver, MAIN_URL)
+    return driver
+
+
+def test_save_and_restore(pages, tmp_path):
+    cache = SessionCache(str(tmp_path / 'session.json'))
+    cache.save(logged_in_driver(pages))
+    assert oct(os.stat(cache.path).st_mode & 0o777) == '0o600'
+
+    driver = fresh_driver(pages)
+    assert not is_logged_in(driver)
+    assert cache.restore(driver, MAIN_URL)
+    assert is_logged_in(driver) and driver.logged_in
+    assert driver._local_storage == {'token': 'abc'}
+
+
+def test_expired_session_is_not_restored(pages, tmp_path):
+    cache = SessionCache(str(tmp_path / 'session.json'), max_age=60)
+    cache.save(logged_in_driver(pages))
+    assert cache.load() is not None
+    with open(cache.path, 'r') as f:
+        data = json.load(f)
+    data['saved_at'] = time.time() - 120
+    with open(cache.path, 'w') as f:
+        json.dump(data, f)
+    assert cache.load() is None
+    driver = fresh_driver(pages)
+    assert not cache.restore(driver, MAIN_URL)
+    assert not driver.logged_in
+
+
+def test_rejected_session_is_cleared(pages, tmp_path):
+    cache = SessionCache(str(tmp_path / 'session.json'))
+    driver = fresh_driver(pages)
+    driver.add_cookie({'name': 'stale-session', 'value': '1', 'path': '/'})
+    cache.save(driver)
+
+    driver = fresh_driver(pages)
+    assert not cache.restore(driver, MAIN_URL)
+    assert not os.path.exists(cache.path)
+    assert driver.get_cookies() == []
+    assert not is_logged_in(driver)
+
+
+def test_partly_restored_session_is_discarded(pages, tmp_path):
+    cache = SessionCache(str(tmp_path / 'session.json'))
+    cache.save(logged_in_driver(pages))
+
+    driver = fresh_driver(pages)
+    driver._local_storage['unrelated'] = 'x'
+    execute_script = driver.execute_script
+
+    def failing_load(script, *args):
+        if script == LOCAL_STORAGE_LOAD_SCRIPT:
+            # The cookies are applied already
+            assert driver.logged_in
+            args[0]['half'] = 'done'
+            driver._local_storage.update(args[0])
+            raise RuntimeError("The page navigated away.")
+        return execute_script(script, *args)
+
+    driver.execute_script = failing_load
+    assert not cache.restore(driver, MAIN_URL)
+    assert not os.path.exists(cache.path)
+    assert SESSION_COOKIE not in [ cookie['name'] for cookie in driver.get_cookies() ]
+    assert driver._local_storage == {}
+    assert not is_logged_in(driver)
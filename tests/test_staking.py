@@ -0,0 +1,102 @@
+import time
+from datetime import date
+
+import numpy as np
+import pytest
+
+from bots.pinnacle.staking import StakeLimits, allocate_stakes, kelly_fractions, batch_budget, limit_stake
+
+LIMITS = StakeLimits(min_stake=1.0, max_stake=800.0, max_sum_stake=9999.0, min_bankroll_percent=0.4, max_stake_percent=0.6)
+
+
+def test_kelly_fractions():
+    fractions = kelly_fractions([2.0, 3.0, 1.5, 1.0], [0.6, 0.3, 0.5, 0.9])
+    assert np.allclose(fractions, [0.2, 0.0, 0.0, 0.0])
+
+
+def test_limit_stake():
+    limits = LIMITS._replace(min_stake=5.0, max_stake=100.0, max_stake_percent=0.1)
+    assert limit_stake(50.0, 1000.0, limits) == 50.0
+    assert limit_stake(500.0, 2000.0, limits) == 100.0
+    assert limit_stake(80.0, 300.0, limits) == 30.0
+    # The minimum stake wins over the percentage of a small bankroll
+    assert limit_stake(2.0, 20.0, limits) == 5.0
+
+
+def test_stakes_within_the_batch_budget():
+    limits = LIMITS._replace(max_sum_stake=100.0)
+    # The best bet comes last, it still gets the largest stake
+    odds = np.array([2.0, 2.0, 2.0])
+    probabilities = np.array([0.52, 0.55, 0.7])
+    stakes = allocate_stakes(odds, probabilities, 1000.0, 1000.0, limits, sum_stakes=20.0, kelly_fraction=1.0)
+    assert stakes.sum() <= batch_budget(1000.0, 1000.0, 20.0, limits) < 80.0
+    assert stakes[2] > stakes[1] > stakes[0] > 0.0
+    assert np.allclose(stakes / stakes.sum(), np.array([0.04, 0.1, 0.4]) / 0.54, atol=1e-3)
+
+
+def test_small_stakes_are_dropped_and_the_budget_shared():
+    limits = LIMITS._replace(min_stake=5.0, max_sum_stake=50.0)
+    stakes = allocate_stakes([2.0, 2.0, 2.0], [0.51, 0.9, 0.9], 1000.0, 1000.0, limits, kelly_fraction=1.0)
+    assert stakes[0] == 0.0
+    assert stakes[1] == stakes[2] and stakes.sum() <= 49.99
+
+
+def test_proportional_shares_the_budget_of_dropped_stakes():
+    limits = LIMITS._replace(min_stake=5.0, max_sum_stake=50.01)
+    # The small edge gets less than the minimum stake, the budget of 50 goes to the other two
+    stakes = allocate_stakes([2.0, 2.0, 2.0], [0.51, 0.9, 0.9], 1000.0, 1000.0, limits, method='proportional')
+    assert stakes[0] == 0.0
+    assert stakes[1] == stakes[2] == 25.0
+
+
+def test_bankroll_limits():
+    limits = LIMITS._replace(max_stake=100.0)
+    stakes = allocate_stakes([3.0] * 4, [0.9] * 4, 500.0, 1000.0, limits, kelly_fraction=1.0)
+    # Only 100 can be staked above 40% of the starting bankroll
+    assert stakes.sum() <= 100.0 and np.all(stakes <= 100.0)
+    assert allocate_stakes([3.0], [0.9], 400.0, 1000.0, limits).sum() == 0.0
+    proportional = allocate_stakes([2.0, 2.0], [0.6, 0.8], 1000.0, 1000.0, limits, method='proportional')
+    assert np.all(proportional <= 100.0) and proportional[1] >= proportional[0] > 0.0
+
+
+def test_thousands_of_candidates_are_fast():
+    rng = np.random.default_rng(7)
+    odds = rng.uniform(1.2, 6.0, 5000)
+    probabilities = np.clip(1.0 / odds + rng.normal(0.0, 0.05, 5000), 0.0, 1.0)
+    allocate_stakes(odds, probabilities, 1000.0, 1000.0, LIMITS)
+    start = time.perf_counter()
+    for _ in range(100):
+        stakes = allocate_stakes(odds, probabilities, 1000.0, 1000.0, LIMITS)
+    assert (time.perf_counter() - start) / 100 < 0.005
+    assert stakes.sum() <= batch_budget(1000.0, 1000.0, 0.0, LIMITS)
+
+
+def test_value_bets(replay_bot):
+    bot = replay_bot({'mode': 'live', 'max_sum_stake': 50.0})
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    candidates = [ (match, 'home', min(0.95, 1.3 / match.odds['home'])) for match in matches[:4] ]
+    # An explicit 0 is not replaced by the kelly_fraction of the config
+    assert bot.allocate_stakes(candidates, kelly_fraction=0.0).sum() == 0.0
+    placed = bot.place_value_bets(candidates, kelly_fraction=1.0)
+    assert 0 < len(placed) <= 4
+    assert sum(stake for _, _, stake in placed) < 50.0
+    assert bot.betslip.total_stake == sum(stake for _, _, stake in placed)
+    bot.clear_bets()
+
+
+def test_value_bets_are_placed_with_the_allocated_stakes(replay_bot):
+    bot = replay_bot({'mode': 'live', 'max_stake_percent': 0.02, 'max_sum_stake': 200.0})
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    candidates = [ (match, 'home', 0.95) for match in matches[:3] ]
+    stakes = bot.allocate_stakes(candidates, kelly_fraction=1.0)
+    # The percentage limit of every bet binds, the bets placed one after the other are not clamped again
+    assert np.all(stakes > 0.0) and np.all(stakes <= 0.02 * (1000.0 - stakes.sum()))
+    placed = bot.place_value_bets(candidates, kelly_fraction=1.0)
+    assert [ stake for _, _, stake in placed ] == list(stakes)
+
+
+def test_value_bets_need_odds(replay_bot):
+    bot = replay_bot({'scrape_mode': 'element'})
+    matches = bot.select_matches(date=date(2025, 3, 1))
+    with pytest.raises(AssertionError, match="odds"):
+        bot.place_value_bets([ (match, 'home', 0.9) for match in matches[:2] ])
@@ -0,0 +1,73 @@
+import threading
+from datetime import datetime
+
+from bots.pinnacle.stream import (OddsStream, OddsChange, StateChange, RowAdded, RowRemoved, StreamReset, to_event,
+                                  OBSERVER_INSTALL_SCRIPT, OBSERVER_DRAIN_SCRIPT, OBSERVER_UNINSTALL_SCRIPT)
+
+HREF = '/en/soccer/germany-bundesliga/a-vs-b/1001'
+
+
+class FakeDriver(object):
+    """Answers the observer scripts, every drain returns the next batch of mutations."""
+
+    def __init__(self, batches, lock=None):
+        self.batches = list(batches)
+        self.scripts = []
+        self.lock = lock
+
+    def find_element(self, by=None, value=None):
+        return object()
+
+    def execute_script(self, script, *args):
+        if self.lock is not None:
+            # The calls are made while the lock of the bot is held: another thread cannot take it
+            acquired = []
+            other = threading.Thread(target=lambda: acquired.append(self.lock.acquire(blocking=False)))
+            other.start()
+            other.join()
+            assert acquired == [False]
+        self.scripts.append(script)
+        if script == OBSERVER_INSTALL_SCRIPT:
+            return True
+        if script == OBSERVER_DRAIN_SCRIPT:
+            return self.batches.pop(0) if len(self.batches) > 0 else []
+        return None
+
+
+def test_to_event():
+    assert to_event({'type': 'odds', 'key': HREF, 'designation': 'home', 'value': '2.05', 'ts': 1.0}) == OddsChange(HREF, 'home', 2.05, 1.0)
+    assert to_event({'type': 'state', 'key': HREF, 'designation': 'draw', 'value': 'closed', 'ts': 2.0}) == StateChange(HREF, 'draw', 'closed', 2.0)
+    added = to_event({'type': 'row_added', 'key': HREF, 'date': 'Sat, Mar 01, 2025', 'info': ['A', 'B', '15:30'], 'ts': 3.0})
+    assert added == RowAdded(HREF, 'A', 'B', datetime(2025, 3, 1, 15, 30), 3.0)
+    assert to_event({'type': 'row_added', 'key': HREF, 'date': None, 'info': ['A'], 'ts': 3.0}) == RowAdded(HREF, 'A', None, None, 3.0)
+    assert to_event({'type': 'row_removed', 'key': HREF, 'ts': 4.0}) == RowRemoved(HREF, 4.0)
+    assert to_event({'type': 'unknown', 'ts': 5.0}) is None
+
+
+def test_drain_batches_and_reinstall():
+    driver = FakeDriver([
+        [ {'type': 'odds', 'key': HREF, 'designation': 'home', 'value': '1.90', 'ts': 1.0},
+          {'type': 'unknown', 'ts': 1.0},
+          {'type': 'row_removed', 'key': HREF, 'ts': 1.5} ],
+        # The page was navigated, the buffer is gone
+        None,
+        [ {'type': 'odds', 'key': HREF, 'designation': 'away', 'value': '4.2', 'ts': 2.0} ],
+    ])
+    stream = OddsStream(driver)
+    # The first drain installs the observer
+    assert stream.drain() == []
+    assert stream.drain() == [ OddsChange(HREF, 'home', 1.9, 1.0), RowRemoved(HREF, 1.5) ]
+    reset = stream.drain()
+    assert len(reset) == 1 and isinstance(reset[0], StreamReset)
+    assert stream.drain() == [ OddsChange(HREF, 'away', 4.2, 2.0) ]
+    assert driver.scripts.count(OBSERVER_INSTALL_SCRIPT) == 2
+    stream.uninstall()
+    assert driver.scripts[-1] == OBSERVER_UNINSTALL_SCRIPT
+
+
+def test_events_hold_the_lock():
+    lock = threading.RLock()
+    driver = FakeDriver([ [ {'type': 'odds', 'key': HREF, 'designation': 'home', 'value': '2.0', 'ts': 1.0} ] ], lock=lock)
+    events = list(OddsStream(driver, lock=lock).events(interval=0.0, duration=0.05))
+    assert events[0] == OddsChange(HREF, 'home', 2.0, 1.0)
+    assert driver.scripts[0] == OBSERVER_INSTALL_SCRIPT and driver.scripts[-1] == OBSERVER_UNINSTALL_SCRIPT
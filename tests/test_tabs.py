@@ -0,0 +1,32 @@
+from datetime import date
+
+import pytest
+
+from bots.pinnacle.interface import league_paths
+
+LEAGUES = ["premier-league", "laliga", "bundesliga", "serie-a", "ligue-1"]
+
+
+@pytest.fixture
+def league_pages(pages):
+    page = list(pages.values())[0]
+    return { **pages, **{ "https://www.pinnacle.com" + path: page for path in league_paths.values() } }
+
+
+@pytest.mark.parametrize('concurrent', [True, False])
+def test_scrape_leagues_in_tabs(replay_bot, league_pages, concurrent):
+    bot = replay_bot(pages=league_pages)
+    driver = bot._driver
+    main_window = driver.current_window_handle
+    matches = bot.select_matches_in_leagues(LEAGUES, concurrent=concurrent, date=date(2025, 3, 1))
+    # 8 matches on the day in every league, each read in the tab of its league
+    assert len(matches) == 8 * len(LEAGUES)
+    assert set(match.league for match in matches) == set(LEAGUES)
+    windows = { match.league: match.window for match in matches }
+    assert len(set(windows.values())) == len(LEAGUES) and main_window not in windows.values()
+    assert all(match.window == windows[match.league] for match in matches)
+    # The tabs are kept for the next scan
+    bot.select_matches_in_leagues(LEAGUES[:2], concurrent=concurrent)
+    assert len(driver.window_handles) == len(LEAGUES) + 1
+    bot.close_tabs()
+    assert driver.window_handles == [main_window] and driver.current_window_handle == main_window
@@ -0,0 +1,53 @@
+import pytest
+from selenium.common.exceptions import TimeoutException
+
+from bots.waits import Waiter, element_count_changed
+from bots.pinnacle.interface import waiter
+
+
+class CountingDriver(object):
+    """Returns one more element on every query."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def find_elements_by_xpath(self, xpath):
+        self.calls += 1
+        return [object()] * self.calls
+
+
+def test_wait_records_latencies():
+    waiter = Waiter(poll_frequency=0.01)
+    for _ in range(5):
+        waiter.wait('cards', CountingDriver(), element_count_changed('//div', 1))
+    stats = waiter.stats()['cards']
+    assert stats['count'] == 5
+    assert stats['timeouts'] == 0
+    assert stats['p50'] <= stats['p95'] <= stats['max']
+
+
+def test_wait_timeout():
+    waiter = Waiter(poll_frequency=0.01, timeouts={'never': 0.05})
+    with pytest.raises(TimeoutException):
+        waiter.wait('never', CountingDriver(), lambda driver: False)
+    assert waiter.wait('never', CountingDriver(), lambda driver: False, required=False) is None
+    assert waiter.stats()['never']['timeouts'] == 2
+
+
+def test_adaptive_timeout():
+    waiter = Waiter(adaptive=True, min_samples=3, headroom=2.0, min_timeout=0.5, timeouts={'fast': 10})
+    assert waiter.timeout('fast') == 10
+    for _ in range(3):
+        waiter.wait('fast', CountingDriver(), lambda driver: True)
+    assert waiter.timeout('fast') == 0.5
+
+
+def test_bots_have_their_own_waiters(replay_bot):
+    shared_stats = waiter.stats()
+    slow = replay_bot({'wait_timeouts': {'open_league': 99}, 'adaptive_waits': True})
+    other = replay_bot()
+    assert slow._waiter.timeout('open_league') == 99
+    assert other._waiter.timeout('open_league') == waiter.timeout('open_league') == 15
+    assert 'login' in slow.wait_stats and other.wait_stats['login']['count'] == 1
+    # The shared waiter is only a template, the waits of the bots are not recorded there
+    assert waiter.stats() == shared_stats and not waiter._adaptive